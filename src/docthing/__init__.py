@@ -83,10 +83,19 @@ if the `doc_level` attribute in the configuration file is set to 2
 or higher.
 END FILE DOCUMENTATION '''
 
-from .documentation_content import Document, ResourceReference
-from .documentation_blob import DocumentationBlob, DocumentationNode
-from .plugins.exporter_interface import Exporter
-from .plugins.meta_interpreter_interface import MetaInterpreter
+from importlib import import_module
+
+# Public names and the modules defining them: modules are imported the first
+# time one of their names is accessed (see PEP 562) so that `import docthing`
+# (and the command-line interface) does not load everything at startup.
+_LAZY_EXPORTS = {
+    "Document": ".documentation_content",
+    "ResourceReference": ".documentation_content",
+    "DocumentationBlob": ".documentation_blob",
+    "DocumentationNode": ".documentation_blob",
+    "Exporter": ".plugins.exporter_interface",
+    "MetaInterpreter": ".plugins.meta_interpreter_interface",
+}
 
 __all__ = [
     "Document",
@@ -96,3 +105,15 @@ __all__ = [
     "Exporter",
     "MetaInterpreter"
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
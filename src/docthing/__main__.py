@@ -10,7 +10,34 @@ The script accepts the following command-line arguments:
 - `index_file`: The path to the index file (this is the only positional argument).
 - `-c`, `--config`: The path to the configuration file.
 - `--config-dump`: Dump the default configuration file to stdout and exit.
+- `--version`: Print the version of `docthing` and exit.
 - `-o`, `--outdir`: The path to the output directory.
+- `--rev`: Read the project (index file, configuration file and all the
+documented files) from a git revision instead of the working tree, without
+checking it out.
+- `--archive`: Read the project from a zip or tar archive without extracting it.
+The archive is mapped to the current directory (if all its content is inside a
+single directory, that directory is mapped instead).
+- `--stream`: Stream leaves one by one from extraction to export instead of
+processing the whole documentation phase by phase (uses less memory).
+- `--stream-window`: The maximum number of leaves in memory when streaming.
+- `--atomic`: Write the output of each exporter into a staging directory which
+takes the place of the output directory only once the export is complete, so
+that a crashed or concurrent build never leaves a half-written output behind.
+- `--output-archive`: Write the output of each exporter straight into a `zip` or
+`tar.gz` archive (e.g. `markdown.zip`) instead of a directory. Resources shared
+by more than one leaf are stored once only in `tar.gz` archives.
+- `--precompress`: Write a gzip-compressed copy (`.gz`) next to each text file of
+the output, to be served as is by web servers.
+- `--profile`: Measure the time spent in each stage of the build, print a
+summary table at the end and save a JSON report (to `docthing-profile.json` if
+no path is given).
+- `--trace`: Save a timeline of the build (each leaf extracted, interpreted and
+exported, each resource compiled) in the Chrome trace event format to the given
+path; it can be opened with `chrome://tracing` or Perfetto.
+- `-q`, `--quiet`: Only print errors.
+- `-v`, `--verbose`: Print debugging messages too, including dumps of the
+documentation tree before and after pruning and after interpreting.
 - `-h`, `--help`: Show the help message and exit.
 
 Alternatievly the `index_file` can be a directory containing a
@@ -25,21 +52,27 @@ will be used.
 END FILE DOCUMENTATION '''
 
 import os
+import sys
 import argparse
 
-from docthing.util import mkdir_silent
-from docthing.config import load_config, merge_configs, validate_config, get_as_dot_config
+# Only lightweight modules are imported here: everything else is imported when
+# needed so that `--help`, `--version` and `--config-dump` return quickly.
+from docthing import log
 from docthing.constants import DEFAULT_CONFIG_FILE, DEFAULT_OUTPUT_DIR, DEFAULT_CONFIG
-from docthing.documentation_blob import DocumentationBlob
-from docthing.plugins.manager import PluginManager
-from docthing.plugins.exporter.markdown import MarkdownExporter
-from docthing.plugins.meta_interpreter.nav import MarkdownNAVInterpreter
-from docthing.plugins.meta_interpreter.plantuml import PlantUMLInterpreter
+from docthing.constants import DEFAULT_STREAM_WINDOW, DEFAULT_PROFILE_REPORT
+from docthing.constants import OUTPUT_ARCHIVE_FORMATS
 
 
-# Main function to handle command-line arguments and execute the
-# documentation generation
-def main():
+def _get_version():
+    from importlib.metadata import version, PackageNotFoundError
+
+    try:
+        return version('docthing')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def _parse_args():
     parser = argparse.ArgumentParser(
         description='Generate documentation from project index file.')
     parser.add_argument(
@@ -55,28 +88,150 @@ def main():
         '--config-dump',
         help='Dump the default configuration file to stdout and exit',
         action='store_true')
+    parser.add_argument(
+        '--version',
+        help='Print the version of docthing and exit',
+        action='store_true')
     parser.add_argument(
         '--outdir',
         help='Output directory for documentation',
         default=DEFAULT_OUTPUT_DIR)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        '--rev',
+        help='Read the project sources from this git revision instead of the working tree')
+    source.add_argument(
+        '--archive',
+        help='Read the project sources from this zip or tar archive (mounted in the ' +
+        'current directory) instead of the working tree')
+    parser.add_argument(
+        '--stream',
+        help='Stream leaves from extraction to export keeping few of them in memory',
+        action='store_true')
+    parser.add_argument(
+        '--stream-window',
+        help='Maximum number of leaves in memory when streaming',
+        type=int,
+        default=DEFAULT_STREAM_WINDOW)
+    parser.add_argument(
+        '--atomic',
+        help='Replace the output of each exporter at once when it is complete',
+        action='store_true')
+    parser.add_argument(
+        '--output-archive',
+        help='Write the output of each exporter into an archive instead of a directory',
+        choices=OUTPUT_ARCHIVE_FORMATS)
+    parser.add_argument(
+        '--precompress',
+        help='Write a gzip-compressed copy of each text file of the output too',
+        action='store_true')
+    parser.add_argument(
+        '--profile',
+        help='Print the time spent in each stage and save a JSON report ' +
+        f'(default: {DEFAULT_PROFILE_REPORT})',
+        nargs='?',
+        const=DEFAULT_PROFILE_REPORT,
+        metavar='REPORT')
+    parser.add_argument(
+        '--trace',
+        help='Save a timeline of the build in the Chrome trace event format',
+        metavar='TRACE')
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        '-q', '--quiet',
+        help='Only print errors',
+        action='store_true')
+    verbosity.add_argument(
+        '-v', '--verbose',
+        help='Print debugging messages and documentation tree dumps',
+        action='store_true')
+
+    return parser.parse_args()
+
 
-    args = parser.parse_args()
+# Main function to handle command-line arguments and execute the
+# documentation generation
+def main():
+    args = _parse_args()
+
+    if args.quiet:
+        log.set_level(log.ERROR)
+    elif args.verbose:
+        log.set_level(log.DEBUG)
+
+    if args.version:
+        print(f'docthing {_get_version()}')
+        return
 
     # Dump the default configuration file to stdout if requested
     if args.config_dump:
+        from docthing.config import get_as_dot_config
+
         print(get_as_dot_config(DEFAULT_CONFIG))
         return
 
+    from docthing.instrumentation import PROFILER
+
+    source_fs = _open_source_fs(args)
+
+    if args.profile or args.trace:
+        PROFILER.enable(trace=args.trace is not None)
+
+    with source_fs:
+        generate_documentation(args, source_fs)
+
+    if args.profile:
+        print(PROFILER.summary_table())
+        PROFILER.write_report(args.profile)
+    if args.trace:
+        PROFILER.write_trace(args.trace)
+
+
+def _open_source_fs(args):
+    '''
+    Determine where the project sources are read from.
+    '''
+    if args.rev:
+        from docthing.sourcefs.git import GitRevisionFS
+
+        try:
+            return GitRevisionFS(args.rev, args.index_file)
+        except ValueError as e:
+            log.error(f'{e}.')
+            sys.exit(1)
+    if args.archive:
+        from docthing.sourcefs.archive import ArchiveFS
+
+        return ArchiveFS(args.archive)
+
+    from docthing.sourcefs.local import LOCAL_FS
+
+    return LOCAL_FS
+
+
+def generate_documentation(args, source_fs):
+    '''
+    Generate the documentation reading the project sources from `source_fs`.
+    '''
+    from docthing.config import compile_config
+    from docthing.dependencies import DEPENDENCIES
+    from docthing.documentation_blob import DocumentationBlob
+    from docthing.export_driver import ExportDriver
+    from docthing.output import use_manifest_dir
+    from docthing.pipeline import StreamingPipeline
+    from docthing.plugins.manager import PluginManager
+    from docthing.util import mkdir_silent, get_docthing_cache_dir
+
     # Determine the index file
-    if os.path.isdir(args.index_file):
+    if source_fs.isdir(args.index_file):
         index_file = os.path.join(args.index_file, 'docthing.jsonc')
     else:
         index_file = args.index_file
 
     # Check if the index file exists
-    if not os.path.exists(index_file):
-        print(f'Error: Index file {index_file} does not exist.')
-        return
+    if not source_fs.exists(index_file):
+        log.error(f'Index file {index_file} does not exist.')
+        sys.exit(1)
 
     command_line_config = {
         'main': {
@@ -87,60 +242,70 @@ def main():
         }
     }
 
-    # Load the configuration file
-    config_path = args.config
-    config = DEFAULT_CONFIG.copy()
-    if os.path.isfile(config_path):
-        config = merge_configs(
-            config, load_config(
-                config_path, command_line_config))
-
-    validate_config(config)
+    # Load the configuration file (reusing the compiled configuration of a
+    # previous run if neither the file nor the command line changed)
+    config = compile_config(
+        args.config, command_line_config, source_fs,
+        cache_dir=os.path.join(get_docthing_cache_dir(), 'config'))
 
     # Determine the output directory and create it if needed
     output_dir = args.outdir
     mkdir_silent(output_dir)
 
-    # Initialize the plugin manager for MetaInterpreters
-    interpreter_manager = PluginManager(
-        'meta-interpreter', [PlantUMLInterpreter(), MarkdownNAVInterpreter()])
+    # Share the resolved paths of plugin dependencies between runs
+    DEPENDENCIES.use_cache(
+        os.path.join(get_docthing_cache_dir(), 'dependencies.json'))
+
+    # Remember what was written in each output directory between runs
+    use_manifest_dir(os.path.join(get_docthing_cache_dir(), 'output'))
+
+    # Initialize the plugin manager for MetaInterpreters (only the requested
+    # plugins are imported, see `docthing.plugins.registry`)
+    interpreter_manager = PluginManager('meta-interpreter')
     interpreter_manager.enable_plugins(
         config['main']['meta'] if 'meta' in config['main'] else [],
         configs=config.get('meta', {}))
 
     # Initialize the plugin manager for Exporters
-    exporter_manager = PluginManager(
-        'exporter', [MarkdownExporter()])
+    exporter_manager = PluginManager('exporter')
     exporter_manager.enable_plugins(config['output']['type'],
                                     configs=config.get('type', {}))
+    for exporter in exporter_manager.get_plugins():
+        exporter.atomic = args.atomic
+        exporter.archive = args.output_archive
+        exporter.precompress = args.precompress
 
     # Process the index file and generate the documentation
     blob = DocumentationBlob(
         index_file,
-        config['parser'])
+        config['parser'],
+        source_fs)
 
-    # Print the documentation tree
-    print('pre pruning')
-    print(blob.to_string('|| '))
+    if args.stream:
+        StreamingPipeline(blob,
+                          interpreter_manager.get_plugins(),
+                          exporter_manager.get_plugins(),
+                          config['output']['dir'],
+                          window=args.stream_window).run()
+        return
+
+    # Dump the documentation tree (only if verbose)
+    log.dump_tree('pre pruning', blob, '|| ')
 
     # Prune the documentation blob based on the documentation level
     blob.prune_doc()
 
-    # Print the documentation tree
-    print('post pruning')
-    print(blob.to_string('|| '))
+    log.dump_tree('post pruning', blob, '|| ')
 
     # Apply all meta interpreters
     for interpreter in interpreter_manager.get_plugins():
         interpreter.interpret(blob)
 
-    # Print the documentation tree
-    print('post interpreting')
-    print(blob.to_string('|| '))
+    log.dump_tree('post interpreting', blob, '|| ')
 
-    # Output the documentation
-    for exporter in exporter_manager.get_plugins():
-        exporter.export(blob, config['output']['dir'])
+    # Output the documentation with all the exporters at once
+    ExportDriver(exporter_manager.get_plugins(),
+                 config['output']['dir']).export(blob)
 
 
 if __name__ == '__main__':
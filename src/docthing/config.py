@@ -18,8 +18,8 @@ in the same directory as the `index-file`.
 
 The configuration file follows a standard format that supports the use of variables and
 predefined values. Variables can be referenced using curly braces (`{}`), and sections
-are denoted with square brackets (`[]`). Variables must be defined before being used in
-the configuration file, and the file is divided into sections with specific purposes.
+are denoted with square brackets (`[]`). Variables can be used before the line defining
+them, and the file is divided into sections with specific purposes.
 Some settings can be overridden via command-line options.
 
 ## Predefined Variables
@@ -83,13 +83,14 @@ no limit. Refer to docthing's documentation for further details.
 > `doc_level=1`
 
 - `exts`: Specifies the file extensions that docthing should process. If directories are
-provided in the index file, this list will be used to find files to include in the
-documentation. Multiple extensions can be provided, separated by commas.
+provided in the index file, this list will be used to find files (recursively) to
+include in the documentation. Multiple extensions can be provided, separated by commas.
 > Example:
 > `extensions=js,jsx,ts,tsx`
 
 - `iexts`: Specifies file extensions to ignore when generating documentation. You can
-reference previously declared variables here, such as {extensions}.
+reference previously declared variables here, such as {extensions}. Extensions made of
+more than one part (e.g. `test.ts`) are matched against the end of the file name.
 > Example:
 > `iexts=test.{extensions}`
 
@@ -133,6 +134,17 @@ Variables can be referenced within the same section or across sections. When ref
 variables from the same section, only the variable name is required (e.g., `{var}`). To reference
 variables from other sections, prefix them with the section name (e.g., `{section.var}`).
 
+Each variable is resolved only once, after the variables it refers to (a variable
+referring, directly or not, to itself is an error).
+
+## Compiled configuration
+
+Loading the configuration (parsing the file, resolving its variables, merging it with the
+default configuration and validating it) is done by `compile_config`. The resulting
+configuration is cached (in the `cache` directory of `docthing`) using as key the content
+of the configuration file and the command-line options overriding it: as long as they do
+not change, the following runs reuse the cached configuration.
+
 ## Example Configuration File
 
 ```conf
@@ -173,11 +185,16 @@ This configuration ensures `docthing` processes the right files, generates docum
 multiple formats, and parses documentation blocks correctly.
 END FILE DOCUMENTATION '''
 
+import copy
+import hashlib
+import json
 import os
-from schema import Schema, Or, Optional
+from functools import lru_cache
 from typing import Union, Tuple
 
-from .constants import PREDEFINED_VARIABLES
+from . import log
+from .constants import DEFAULT_CONFIG, PREDEFINED_VARIABLES
+from .sourcefs.local import LOCAL_FS
 from .util import parse_value
 
 
@@ -273,10 +290,10 @@ def _go_into_scope(config: dict,
         sections = sections[:-1]
 
     # Traverse the configuration dictionary
-    current = config.copy()
+    current = config
     for section in sections:
         if section not in current:
-            print(f'Warning: Section {section} not found in config file.')
+            log.warning(f'Section {section} not found in config file.')
             break
         current = current[section]
     return current
@@ -294,6 +311,128 @@ def _get_var_value(config: dict, sections_and_key: Union[list, str]) -> dict:
     return _go_into_scope(config, sections)[key]
 
 
+class _VariableResolver():
+    '''
+    Resolves the variables of a configuration.
+
+    The value of each variable is resolved at most once (memoized) and only
+    after the values of the variables it refers to (dependency order), so
+    variables can be used before the line defining them.
+
+        Args:
+            config (dict): The configuration whose variables to resolve.
+    '''
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.resolved = {}
+        self.resolving = set()
+
+    def resolve(self, var_path: Union[str, list]):
+        '''
+        Returns the value of the variable at `var_path` with all the variables
+        it contains replaced.
+        '''
+        if isinstance(var_path, str):
+            var_path = var_path.split('.')
+        var_path = tuple(var_path)
+
+        if var_path in self.resolved:
+            return self.resolved[var_path]
+        if var_path in self.resolving:
+            raise ValueError(
+                f'Variable {".".join(var_path)} refers to itself in the config file.')
+
+        value = _get_var_value(self.config, list(var_path))
+        if isinstance(value, dict):
+            raise ValueError('Variables cannot be nested in the config file.')
+
+        if isinstance(value, str) and '{' in value:
+            self.resolving.add(var_path)
+            try:
+                value = self._replace(value, list(var_path[:-1]))
+            finally:
+                self.resolving.discard(var_path)
+
+        self.resolved[var_path] = value
+        return value
+
+    def _inject(self, inj_var_name: str, host_var_sections: list):
+        '''
+        Returns whether the variable `inj_var_name` (used in a variable of the
+        section `host_var_sections`) exists and its value.
+        '''
+        inj_var_sections, inj_var_key = _split_sections_key(inj_var_name)
+
+        if inj_var_name in PREDEFINED_VARIABLES:
+            # Injected variable name is a predefined variable
+            return True, PREDEFINED_VARIABLES[inj_var_name](self.config)
+
+        if '.' in inj_var_name:
+            # Injected variable name is an absolute path to a variable
+            inj_var_scope = _go_into_scope(self.config, inj_var_sections)
+
+            if inj_var_key in inj_var_scope:
+                return True, self.resolve(inj_var_sections + [inj_var_key])
+            log.warning(f'key {inj_var_key} not found ' +
+                        f'in {".".join(inj_var_sections)}')
+            return False, None
+
+        # Injected variable name is in the same scope as the host variable
+        host_var_scope = _go_into_scope(self.config, host_var_sections)
+
+        if inj_var_key in host_var_scope:
+            return True, self.resolve(host_var_sections + [inj_var_key])
+        log.warning(f'key {inj_var_key} not found in ' +
+                    f'{".".join(host_var_sections)} nor it is a predefined variable')
+        return False, None
+
+    def _replace(self, host_var_value: str, host_var_sections: list):
+        # Remaining value is the part of the value that has not been handled yet
+        remaining_value = host_var_value
+        res = ''
+
+        # Check if the value contains any variables
+        while '{' in remaining_value and '}' in remaining_value:
+            res = res + remaining_value.split('{')[0]
+
+            # Extract the variable name
+            inj_var_name = remaining_value.split('{')[1].split('}')[0]
+
+            handled, partial_res = self._inject(inj_var_name, host_var_sections)
+
+            # In the case of the source or the variable being a list
+            #   it is necessary to convert the output to a list
+            #   providing all possible combinations
+            if handled:
+                res = _combine_values(res, partial_res)
+            else:
+                log.warning(
+                    f'Variable {inj_var_name} not found in config file.')
+                # fallback to original string
+                res = res + '{' + inj_var_name + '}'
+
+            # Remove the part of the value that has been handled
+            remaining_value = remaining_value.split('}', 1)[1]
+
+        return _combine_values(res, remaining_value)
+
+    def resolve_all(self, config: dict = None, sections: list = None) -> dict:
+        '''
+        Returns a copy of the configuration with all the variables resolved.
+        '''
+        config = self.config if config is None else config
+        sections = [] if sections is None else sections
+
+        res = {}
+        for key, value in config.items():
+            if isinstance(value, dict):
+                res[key] = self.resolve_all(value, sections + [key])
+            else:
+                res[key] = self.resolve(sections + [key])
+        return res
+
+
 def _variable_replace_single(
         config: dict, host_var_path: Union[str, list]) -> Union[str, list]:
     '''
@@ -312,72 +451,7 @@ def _variable_replace_single(
         Returns:
             str: The value with all variables replaced.
     '''
-    host_var_value = _get_var_value(config, host_var_path)
-
-    if isinstance(host_var_value, dict):
-        raise ValueError('Variables cannot be nested in the config file.')
-
-    if not isinstance(host_var_value, str) or '{' not in host_var_value:
-        return host_var_value
-
-    host_var_sections, _ = _split_sections_key(host_var_path)
-
-    # Remaining value is the part of the value that has not been handled yet
-    remaining_value = host_var_value
-    res = ''
-
-    # Check if the value contains any variables
-    while '{' in remaining_value and '}' in remaining_value:
-        handled = False
-        res = res + remaining_value.split('{')[0]
-        partial_res = ''
-
-        # Extract the variable name
-        inj_var_name = remaining_value.split('{')[1].split('}')[0]
-
-        # Preserve key and sections
-        inj_var_sections, inj_var_key = _split_sections_key(inj_var_name)
-
-        if inj_var_name in PREDEFINED_VARIABLES:
-            # Injected variable name is a predefined variable
-            partial_res = PREDEFINED_VARIABLES[inj_var_name](config)
-            handled = True
-        elif '.' in inj_var_name:
-            # Injected variable name is an absolute path to a variable
-            inj_var_scope = _go_into_scope(config, inj_var_sections)
-
-            if inj_var_key in inj_var_scope:
-                partial_res = inj_var_scope[inj_var_key]
-                handled = True
-            else:
-                print(f'Warning: key {inj_var_key} not found ' +
-                      f'in {".".join(inj_var_sections)}')
-        else:
-            # Injected variable name is in the same scope as the host variable
-            host_var_scope = _go_into_scope(config, host_var_sections)
-
-            if inj_var_key in host_var_scope:
-                partial_res = host_var_scope[inj_var_key]
-                handled = True
-            else:
-                print(f'Warning: key {inj_var_key} not found in ' +
-                      f'{".".join(host_var_sections)} nor it is a predefined variable')
-
-        # In the case of the source or the variable being a list
-        #   it is necessary to convert the output to a list
-        #   providing all possible combinations
-        if handled:
-            res = _combine_values(res, partial_res)
-        else:
-            print(
-                f'Warning: Variable {inj_var_name} not found in config file.')
-            # fallback to original string
-            res = res + '{' + inj_var_name + '}'
-
-        # Remove the part of the value that has been handled
-        remaining_value = remaining_value.split('}', 1)[1]
-
-    return _combine_values(res, remaining_value)
+    return _VariableResolver(config).resolve(host_var_path)
 
 
 def merge_configs(config1: dict, config2: dict):
@@ -444,6 +518,7 @@ def _set_in_config(config: dict,
                    override: bool = False):
     '''
     Sets a value in a configuration dictionary, creating nested dictionaries as needed.
+    Variables are resolved later (see `_VariableResolver`).
     '''
     # No subsections
     if not subsections:
@@ -451,8 +526,6 @@ def _set_in_config(config: dict,
             return
 
         config[section][key] = value
-        config[section][key] = _variable_replace_single(
-            config, f'{section}.{key}')
         return
 
     # Single subsection
@@ -461,8 +534,6 @@ def _set_in_config(config: dict,
             return
 
         config[section][subsections][key] = value
-        config[section][subsections][key] = _variable_replace_single(
-            config, f'{section}.{subsections}.{key}')
         return
 
     # Multiple subsections
@@ -470,30 +541,15 @@ def _set_in_config(config: dict,
         _set_in_config(config, section, subsection, key, value)
 
 
-def load_config(config_path: str, command_line_config: dict = {}):
+def _parse_config_lines(lines: list, command_line_config: dict = {}) -> dict:
     '''
-    Loads a configuration from the specified file path.
-
-        Args:
-            config_path (str): The path to the configuration file.
-            command_line_config (dict): The command line configuration
-            to merge with the loaded configuration.
-
-        Returns:
-            dict: The loaded configuration as a dictionary.
+    Parses the lines of a configuration file without resolving variables.
+    Values in `command_line_config` take precedence over the ones in the file.
     '''
-
-    config = command_line_config.copy()
+    config = copy.deepcopy(command_line_config)
     curr_section = 'main'
     curr_subsections = []
 
-    if not os.path.exists(config_path):
-        print(f'Warning: file {config_path} does not exist')
-        return config
-
-    with open(config_path, 'r') as f:
-        lines = f.readlines()
-
     for i_line, line in enumerate(lines):
         line = line.strip()
 
@@ -519,69 +575,192 @@ def load_config(config_path: str, command_line_config: dict = {}):
         if '=' in line:  # Found a key-value pair
             key, value = _parse_key_value_pair(line)
 
+            if curr_section not in config:
+                config[curr_section] = {}
             _set_in_config(config, curr_section, curr_subsections,
                            key, parse_value(value))
             continue
 
         # Found line not part of the syntax
-        print(f'Warning: invalid line ({i_line + 1}) ignored: {line}')
+        log.warning(f'invalid line ({i_line + 1}) ignored: {line}')
         continue
 
     return config
 
 
+def load_config(config_path: str, command_line_config: dict = {},
+                source_fs=None):
+    '''
+    Loads a configuration from the specified file path.
+
+        Args:
+            config_path (str): The path to the configuration file.
+            command_line_config (dict): The command line configuration
+            to merge with the loaded configuration.
+            source_fs (SourceFS, optional): The file system to read the
+            configuration file from. Defaults to the local disk.
+
+        Returns:
+            dict: The loaded configuration as a dictionary.
+    '''
+    source_fs = source_fs or LOCAL_FS
+
+    if not source_fs.exists(config_path):
+        log.warning(f'file {config_path} does not exist')
+        return command_line_config.copy()
+
+    with source_fs.open(config_path) as f:
+        lines = f.readlines()
+
+    config = _parse_config_lines(lines, command_line_config)
+    return _VariableResolver(config).resolve_all()
+
+
+# =======================
+# COMPILED CONFIGURATION
+# =======================
+
+# Bump when the format of the compiled configuration changes
+_COMPILED_CONFIG_VERSION = 1
+
+
+def _compiled_config_key(config_text: Union[str, None],
+                         command_line_config: dict) -> str:
+    '''
+    Returns the key identifying a compiled configuration: a hash of everything
+    the compiled configuration depends on.
+    '''
+    key = json.dumps({
+        'version': _COMPILED_CONFIG_VERSION,
+        'default': DEFAULT_CONFIG,
+        'config': config_text,
+        'command_line': command_line_config,
+        # Predefined variables (e.g. `index-file-dir`) depend on it
+        'cwd': os.getcwd(),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def compile_config(config_path: str, command_line_config: dict = {},
+                   source_fs=None, cache_dir=None) -> dict:
+    '''
+    Loads the configuration file (if it exists), resolves its variables, merges
+    it with the default configuration and validates it.
+
+    If `cache_dir` is provided the result is cached there and reused as long
+    as the content of the configuration file and `command_line_config` do not
+    change (skipping parsing and validation).
+
+        Args:
+            config_path (str): The path to the configuration file.
+            command_line_config (dict): The configuration overrides from the
+                command line.
+            source_fs (SourceFS, optional): The file system to read the
+                configuration file from. Defaults to the local disk.
+            cache_dir (str, optional): The directory of the cache.
+
+        Returns:
+            dict: The validated configuration.
+    '''
+    source_fs = source_fs or LOCAL_FS
+
+    config_text = None
+    if source_fs.isfile(config_path):
+        with source_fs.open(config_path) as f:
+            config_text = f.read()
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(
+            cache_dir, _compiled_config_key(config_text, command_line_config) + '.json')
+        try:
+            with open(cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    config = copy.deepcopy(command_line_config)
+    if config_text is not None:
+        config = _parse_config_lines(config_text.splitlines(), config)
+    config = merge_configs(copy.deepcopy(DEFAULT_CONFIG), config)
+    config = _VariableResolver(config).resolve_all()
+    validate_config(config)
+
+    if cache_path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(config, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # The cache is only an optimization
+            pass
+
+    return config
+
+
 # =======================
 # VALIDATION
 # =======================
 
-# Defining the schema
-config_schema = Schema({
-    # Main section schema
-    'main': {
-        'index_file': str,                       # index_file is required
-        # meta values is a list of string or a string
-        Optional('meta'): Or(str, list)
-    },
-
-    # Output section schema
-    'output': {
-        'dir': str,              # directory as string
-        'type': Or(str, list)    # type is a list of string or a string
-    },
-
-    # Parser section schema
-    'parser': {
-        'begin_doc': str,                      # begin_doc is a string
-        'end_doc': str,                        # end_doc is a string
-        'doc_level': int,                      # doc_level is an int
-        # extensions is a list of string or a string
-        Optional('extensions'): Or(str, list),
-        # ignores extensions is a list of string or a string
-        Optional('iexts'): Or(str, list),
-        # boolean for single-line comments
-        Optional('allow_sl_comments'): bool,
-        Optional('peek_lines'): int,           # peek_lines must be an integer
-        # Dynamic keys (e.g., language-specific configs like 'parser|py')
-        Optional(str): {
-            'begin_ml_comment': str,               # multiline comment start as string
-            'end_ml_comment': str,                 # multiline comment end as string
-            'sl_comment': str,                     # single line comments
-            Optional('allow_sl_comments'): bool,   # boolean for sl comments
-            # peek_lines must be an integer
-            Optional('peek_lines'): int,
-        }
-    },
-
-    # Configuration for meta interpreter plugins
-    Optional('meta'): {
-        Optional(str): dict
-    },
-
-    # Configuration for output plugins
-    Optional('type'): {
-        Optional(str): dict
-    },
-})
+@lru_cache(maxsize=None)
+def _get_config_schema():
+    '''
+    Returns the schema of the configuration.
+
+    The schema is built (and the `schema` module imported) only the first time
+    it is needed so that simple commands such as `--config-dump` start faster.
+    '''
+    from schema import Schema, Or, Optional
+
+    return Schema({
+        # Main section schema
+        'main': {
+            'index_file': str,                       # index_file is required
+            # meta values is a list of string or a string
+            Optional('meta'): Or(str, list)
+        },
+
+        # Output section schema
+        'output': {
+            'dir': str,              # directory as string
+            'type': Or(str, list)    # type is a list of string or a string
+        },
+
+        # Parser section schema
+        'parser': {
+            'begin_doc': str,                      # begin_doc is a string
+            'end_doc': str,                        # end_doc is a string
+            'doc_level': int,                      # doc_level is an int
+            # extensions is a list of string or a string
+            Optional('extensions'): Or(str, list),
+            # ignores extensions is a list of string or a string
+            Optional('iexts'): Or(str, list),
+            # boolean for single-line comments
+            Optional('allow_sl_comments'): bool,
+            Optional('peek_lines'): int,           # peek_lines must be an integer
+            # Dynamic keys (e.g., language-specific configs like 'parser|py')
+            Optional(str): {
+                'begin_ml_comment': str,               # multiline comment start as string
+                'end_ml_comment': str,                 # multiline comment end as string
+                'sl_comment': str,                     # single line comments
+                Optional('allow_sl_comments'): bool,   # boolean for sl comments
+                # peek_lines must be an integer
+                Optional('peek_lines'): int,
+            }
+        },
+
+        # Configuration for meta interpreter plugins
+        Optional('meta'): {
+            Optional(str): dict
+        },
+
+        # Configuration for output plugins
+        Optional('type'): {
+            Optional(str): dict
+        },
+    })
 
 
 def validate_config(config: dict):
@@ -595,7 +774,7 @@ def validate_config(config: dict):
     '''
     verify_plugin_existance(config, 'meta', 'main')
     verify_plugin_existance(config, 'type', 'output')
-    return config_schema.validate(config)
+    return _get_config_schema().validate(config)
 
 
 def _error_str(name, section: str, type: str):
@@ -629,7 +808,7 @@ def verify_plugin_existance(
 
     if warn_only:
         for e in errors:
-            print(f'Warning: {e}')
+            log.warning(e)
     else:
         if errors:
             raise ValueError('invalid configuration:\n- ' +
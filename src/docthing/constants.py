@@ -26,6 +26,8 @@ END FILE DOCUMENTATION '''
 
 import os
 
+from . import log
+
 # C like commented languages extensions
 _c_like_languages_parser_config = {
     'begin_ml_comment': '/*',
@@ -37,6 +39,19 @@ _c_like_languages_parser_config = {
 # Constants for defaults
 DEFAULT_CONFIG_FILE = 'docthing.conf'
 DEFAULT_OUTPUT_DIR = 'documentation'
+DEFAULT_STREAM_WINDOW = 8
+DEFAULT_INDEX_LOADER_WORKERS = 8
+DEFAULT_EXPORT_WORKERS = 4
+
+# Formats of the archives exporters can write their output into
+OUTPUT_ARCHIVE_FORMATS = ['zip', 'tar.gz']
+
+# Precompressed (`.gz`) copies of the output files (see `docthing.output`)
+PRECOMPRESS_EXTENSIONS = ['.md', '.html', '.htm', '.css', '.js', '.json', '.svg', '.txt', '.xml']
+PRECOMPRESS_MIN_SIZE = 1024
+DEFAULT_PRECOMPRESS_WORKERS = 4
+DEFAULT_PROFILE_REPORT = 'docthing-profile.json'
+DEFAULT_IGNORE_FILES = ['.gitignore', '.docthingignore']
 DEFAULT_CONFIG = {
     'main': {
         'meta': 'plantuml'
@@ -48,7 +63,7 @@ DEFAULT_CONFIG = {
     'parser': {
         'begin_doc': 'BEGIN FILE DOCUMENTATION',
         'end_doc': 'END FILE DOCUMENTATION',
-        'doc_level': '1',
+        'doc_level': 1,
         'allow_sl_comments': False,
         'peek_lines': 1,
         'py': {                                    # Python
@@ -115,10 +130,10 @@ def index_file_dir(config):
             str: The absolute path to the directory containing the index file.
     '''
     if 'main' not in config:
-        print('Warning: using variable index-file-dir before defining `main` section in config file')
+        log.warning('using variable index-file-dir before defining `main` section in config file')
         return '{index-file-dir}'
     if 'index_file' not in config['main']:
-        print('Warning: using variable index-file-dir before defining `index_file` in `main` section in config file')
+        log.warning('using variable index-file-dir before defining `index_file` in `main` section in config file')
         return '{index-file-dir}'
     res = os.path.abspath(os.path.dirname(config['main']['index_file']))
     return res if res else os.path.join('.', '')
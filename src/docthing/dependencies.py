@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+Plugins can depend on external programs (e.g. the `plantuml` meta-interpreter
+needs the `plantuml` executable). Looking an executable up means scanning every
+directory of `PATH`, so `docthing` resolves each dependency only once through
+the `DependencyResolver` and hands plugins the absolute path of the executable
+to run (see `PluginInterface.get_dependency_path`).
+
+Resolved paths are stored together with a _fingerprint_ of `PATH` (its value
+and the modification time of each of its directories, which changes when a
+program is installed or removed): as long as the fingerprint does not change the
+resolved paths are reused. When a cache file is set (the command-line interface
+uses the `cache` directory of `docthing`) they are also shared between runs and
+between concurrent processes.
+END FILE DOCUMENTATION '''
+
+import json
+import os
+import shutil
+import threading
+
+
+def path_fingerprint(path=None):
+    '''
+    Returns the fingerprint of the `PATH` environment variable (or of `path`):
+    a list of `[directory, mtime]` pairs.
+    '''
+    if path is None:
+        path = os.environ.get('PATH', os.defpath)
+
+    res = []
+    for directory in path.split(os.pathsep):
+        try:
+            res.append([directory, os.stat(directory).st_mtime_ns])
+        except OSError:
+            res.append([directory, None])
+    return res
+
+
+class DependencyResolver():
+    '''
+    Resolves the names of executables to their absolute paths and memoizes
+    them. Thread-safe.
+
+        Args:
+            cache_path (str, optional): The path of the file the resolved paths
+                are persisted to. If None they are kept in memory only.
+    '''
+
+    def __init__(self, cache_path=None):
+        self.lock = threading.Lock()
+        self.cache_path = cache_path
+        self.path = None
+        self.fingerprint = None
+        self.paths = {}
+
+    def use_cache(self, cache_path):
+        '''
+        Persist the resolved paths to `cache_path` from now on.
+        '''
+        with self.lock:
+            self.cache_path = cache_path
+            self.path = None
+
+    def clear(self):
+        '''
+        Forget all the resolved paths (the cache file is left untouched).
+        '''
+        with self.lock:
+            self.path = None
+            self.paths = {}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('fingerprint') != self.fingerprint:
+            return {}
+        return cache.get('paths', {})
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'fingerprint': self.fingerprint, 'paths': self.paths}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # The cache is only an optimization
+            pass
+
+    def _check_path(self):
+        '''
+        Drop the resolved paths if `PATH` changed since they were resolved.
+
+        The directories of `PATH` are stat'ed only when its value changes (or
+        after `clear`), not on every lookup.
+        '''
+        path = os.environ.get('PATH', os.defpath)
+        if path == self.path:
+            return
+        self.path = path
+        self.fingerprint = path_fingerprint(path)
+        self.paths = self._load_cache() if self.cache_path is not None else {}
+
+    def resolve(self, name):
+        '''
+        Returns the absolute path of the executable `name` or None if it can
+        not be found in `PATH`.
+        '''
+        with self.lock:
+            self._check_path()
+            if name in self.paths:
+                return self.paths[name]
+
+            found = shutil.which(name)
+            self.paths[name] = os.path.abspath(found) if found else None
+            if self.cache_path is not None:
+                self._save_cache()
+            return self.paths[name]
+
+    def resolve_all(self, names):
+        '''
+        Returns a dict mapping each name in `names` to its absolute path (None
+        for the ones that can not be found).
+        '''
+        return {name: self.resolve(name) for name in names}
+
+
+DEPENDENCIES = DependencyResolver()
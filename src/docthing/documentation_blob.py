@@ -31,12 +31,19 @@ Each leaf of the tree represents a documentation piece and its content will be a
 correspondence with an output file. Read more about it in the appropriate documentation section.
 END FILE DOCUMENTATION '''
 
-import pyjson5 as json
 import os
 
+from . import log
 from .documentation_content import Document, ResourceReference
-from .extractor import extract_documentation
+from .extractor import extract_documentation, peek_options
+from .ignore import IgnoreCache
+from .index_loader import IndexLoader
+from .instrumentation import span
+from .sourcefs.local import LOCAL_FS
+from .sourcefs.sourcefs_interface import FILE, DIRECTORY
+from .sourcefs.stat_cache import StatCache
 from .tree import Tree, TreeNode
+from .walker import SuffixMatcher, walk_files
 
 
 # =======================
@@ -58,6 +65,11 @@ class DocumentationNode(TreeNode):
             children (list, optional): A list of child nodes, if the node is a chapter, section,
                 directory, or file list.
             parser_config (dict): The configuration for the parser.
+            source_fs (SourceFS, optional): The file system the content is read from.
+            stat_cache (StatCache, optional): The cache used to check whether the
+                content is a file or a directory.
+            ignore_cache (IgnoreCache, optional): The cache of the ignore rules
+                used when walking a directory.
 
         Raises:
             ValueError: If both `content` and `children` are provided, or if neither is provided.
@@ -69,7 +81,10 @@ class DocumentationNode(TreeNode):
             title,
             content=None,
             children=None,
-            parser_config=None):
+            parser_config=None,
+            source_fs=None,
+            stat_cache=None,
+            ignore_cache=None):
         '''
         Initialize a new DocumentationNode.
 
@@ -79,6 +94,14 @@ class DocumentationNode(TreeNode):
                 children (list, optional): A list of child nodes, if the node is a chapter,
                     section, directory, or file list.
                 parser_config (dict): The configuration for the parser.
+                source_fs (SourceFS, optional): The file system the content is read
+                    from. Defaults to the local disk.
+                stat_cache (StatCache, optional): The cache used to check whether
+                    the content is a file or a directory. If None it is checked on
+                    `source_fs` directly.
+                ignore_cache (IgnoreCache, optional): The cache of the ignore rules
+                    used when walking a directory. If None the one of `source_fs`
+                    is used.
 
             Raises:
                 ValueError: If both `content` and `children` are provided, or if neither is
@@ -100,12 +123,19 @@ class DocumentationNode(TreeNode):
         self.title = title
         self.content = content
         self.parser_config = parser_config
+        self.source_fs = source_fs or LOCAL_FS
+        self.ignore_cache = ignore_cache
 
         self.options = {'level': 0, 'level-only': False}
 
-        self.lazy = isinstance(
-            content, str) and (
-            os.path.isfile(content) or os.path.isdir(content))
+        # Whether the content is a path to a `FILE` or a `DIRECTORY` (checked
+        #   only once, here)
+        self.content_type = None
+        if isinstance(content, str):
+            self.content_type = stat_cache.get_type(content) if stat_cache is not None \
+                else self.source_fs.stat_many([content])[content]
+
+        self.lazy = self.content_type is not None
 
     def is_lazy(self):
         '''
@@ -126,25 +156,26 @@ class DocumentationNode(TreeNode):
         if not self.lazy:
             return
 
-        if os.path.isfile(self.content):
+        with span('extract', leaf=self.title, source=self.content):
+            self._extract_content()
+
+    def _extract_content(self):
+        if self.content_type == FILE:
             self.content, options = extract_documentation(self.content,
-                                                          self.parser_config)
-            for k, v in options.items():
+                                                          self.parser_config,
+                                                          self.source_fs)
+            for k, v in (options or {}).items():
                 self.options[k] = v
-        elif os.path.isdir(self.content):
-            # list all files in the directory with any of the extensions from
-            # self.config['extensions'] but not in self.config['iexts']
-            files = [f for f in os.listdir(self.content)
-                     if os.path.isfile(os.path.join(self.content, f))
-                     and f.split('.')[-1] in self.parser_config['extensions']
-                     and f.split('.')[-1] not in self.parser_config['iexts']]
-            files = [os.path.join(self.content, f) for f in files]
+        elif self.content_type == DIRECTORY:
+            files = self._list_directory_files()
             self.content = []
             for i_f, f in enumerate(files):
-                doc, opts = extract_documentation(f, self.parser_config)
-                self.content.append(doc)
+                doc, opts = extract_documentation(f, self.parser_config,
+                                                  self.source_fs)
+                if doc is not None:
+                    self.content.extend(doc)
                 # Only options from the first file are kept
-                if i_f == 0:
+                if i_f == 0 and opts is not None:
                     self.options = opts
         else:
             raise ValueError(
@@ -153,6 +184,55 @@ class DocumentationNode(TreeNode):
         self.content = Document(self.content)
         self.lazy = False
 
+    def _list_directory_files(self):
+        '''
+        Recursively list all files in the directory of a lazy directory leaf
+        ending with any of the `extensions` but not with any of the `iexts`
+        (see parser configuration and `docthing.walker`) skipping the ones
+        ignored by `.gitignore` or `.docthingignore` files.
+        '''
+        return list(walk_files(
+            self.content, SuffixMatcher.from_parser_config(self.parser_config),
+            ignore_cache=self.ignore_cache or self.source_fs.get_ignore_cache(),
+            source_fs=self.source_fs))
+
+    def peek_options(self):
+        '''
+        Get the options of the node without unlazying it.
+
+        Only the first `peek_lines` lines of the file (or of the first file of the
+        directory) are read; the node stays lazy.
+
+            Returns:
+                dict: The options the node will have once unlazied.
+        '''
+        if not self.lazy:
+            return self.options
+
+        if self.content_type == FILE:
+            path = self.content
+        else:
+            files = self._list_directory_files()
+            if len(files) == 0:
+                return self.options
+            path = files[0]
+
+        options = self.options.copy()
+        peeked = peek_options(path, self.parser_config, self.source_fs)
+        for k, v in (peeked or {}).items():
+            options[k] = v
+        return options
+
+    def release_content(self):
+        '''
+        Drop the content of a leaf once it is no longer needed (e.g. after it
+        was exported) to free memory. The node will not be lazy anymore and
+        its content will be None.
+        '''
+        if self.is_leaf():
+            self.content = None
+            self.lazy = False
+
     def unlazy(self):
         '''
         Unlazy the node.
@@ -213,14 +293,56 @@ class DocumentationNode(TreeNode):
             self.content.replace_resources_with_imports(
                 self.get_title(), import_function)
 
+    def with_resources_replaced(self, import_function):
+        '''
+        Returns a view of the node whose content has resources replaced with
+        imports, leaving the node untouched (see `DocumentationNodeView`).
+        '''
+        content = self.content
+        if isinstance(content, Document):
+            content = content.with_resources_replaced(
+                self.get_title(), import_function)
+        return DocumentationNodeView(self, content)
+
     def __str__(self) -> str:
-        if not self.lazy and self.is_leaf():
-            return __class__.__name__ + \
-                '(' + self.title + ', ' + str(self.content) + ')'
+        if not self.lazy and self.is_leaf() and self.content is not None:
+            # A summary: the content can be large and nodes are dumped often
+            lines = list(self.content)
+            resources = sum(1 for line in lines if isinstance(line, ResourceReference))
+            return __class__.__name__ + '(' + self.title + ', ' + \
+                f'{len(lines) - resources} lines, {resources} resources)'
         else:
             return __class__.__name__ + '(' + self.title + ')'
 
 
+class DocumentationNodeView():
+    '''
+    A view of a `DocumentationNode` with its own content: everything else (title,
+    options, path in the tree, ...) is the one of the node.
+
+    Exporters export views (see `DocumentationNode.with_resources_replaced`) so
+    that each of them can replace the resources of a leaf in its own way while
+    sharing the same (interpreted) tree with the others.
+
+        Args:
+            node (DocumentationNode): The viewed node.
+            content (Document): The content of the view.
+    '''
+
+    def __init__(self, node, content):
+        self.node = node
+        self.content = content
+
+    def get_content(self, unlazy=False):
+        return self.content
+
+    def __getattr__(self, name):
+        return getattr(self.node, name)
+
+    def __str__(self) -> str:
+        return __class__.__name__ + '(' + self.node.get_title() + ')'
+
+
 # =======================
 # DOCUMENTATION BLOB
 # =======================
@@ -232,21 +354,66 @@ class DocumentationBlob(Tree):
         It can be used to generate documentation in various formats.
     '''
 
-    def __init__(self, index_file, parser_config):
+    def __init__(self, index_file, parser_config, source_fs=None):
         self.parser_config = parser_config
         self.index_file_path = index_file
-
-        super().__init__(self._generate_tree_from_index())
+        self.source_fs = source_fs or LOCAL_FS
+        self.index_loader = IndexLoader(self.source_fs)
+        self.stat_cache = StatCache(self.source_fs)
+        # Outside of repositories ignore files above the index file do not apply
+        self.ignore_cache = IgnoreCache(
+            source_fs=self.source_fs,
+            root=os.path.dirname(os.path.abspath(index_file)))
+
+        with span('blob.build'):
+            super().__init__(self._generate_tree_from_index())
+
+    @classmethod
+    def from_root(cls, root, parser_config, source_fs=None):
+        '''
+        Returns a documentation blob made of an already built tree of
+        `DocumentationNode`s instead of one built from an index file (e.g. the
+        one read back from the output of the `jsonl` exporter).
+        '''
+        blob = cls.__new__(cls)
+        blob.parser_config = parser_config
+        blob.index_file_path = None
+        blob.source_fs = source_fs or LOCAL_FS
+        blob.index_loader = None
+        blob.stat_cache = None
+        blob.ignore_cache = None
+        Tree.__init__(blob, root)
+        return blob
 
     def _generate_tree_from_index(self):
+        # Parse the index file and all the index files it includes up front
+        self.index_loader.load(self.index_file_path)
+        # Check the type of all the leaves in a single batch
+        self.stat_cache.prefetch(self._get_leaf_paths())
         return self._generate_node_from_index(None, self.index_file_path)
 
-    def _generate_node_from_index(self, parent, index_file_json):
+    def _get_leaf_paths(self):
+        '''
+        Returns the paths the leaves of the tree will point to.
+        '''
+        res = []
+        stack = [{k: v for k, v in index.items() if k != 'main-title'}
+                 for index in self.index_loader.indexes.values()]
+        while stack:
+            node = stack.pop()
+            items = node.items() if isinstance(node, dict) else enumerate(node)
+            for k, v in items:
+                if isinstance(v, str) and k != '__index__':
+                    res.append(v)
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+        return res
+
+    def _generate_node_from_index(self, parent, index_file_path):
         '''
         Generate the root node of the tree.
         '''
-        with open(index_file_json, 'r') as f:
-            index_file_json = json.load(f)
+        index_file_json = self.index_loader.get(index_file_path)
 
         # Main title
         if 'main-title' not in index_file_json:
@@ -256,8 +423,8 @@ class DocumentationBlob(Tree):
 
         # Quick Start
         if 'quick' not in index_file_json:
-            print('Warning: index file does not contain \'quick\': this is discouraged: it is ' +
-                  'important to give the user a grasp of the usage of the project')
+            log.warning('index file does not contain \'quick\': this is discouraged: it is ' +
+                        'important to give the user a grasp of the usage of the project')
         else:
             res.add_child(
                 self._generate_leaf(
@@ -267,8 +434,8 @@ class DocumentationBlob(Tree):
 
         # Introduction
         if 'intro' not in index_file_json:
-            print('Warning: index file does not contain \'intro\': this is discouraged: it is ' +
-                  'important to give the user a brief introduction to the project')
+            log.warning('index file does not contain \'intro\': this is discouraged: it is ' +
+                        'important to give the user a brief introduction to the project')
         else:
             res.add_child(
                 self._generate_leaf(
@@ -306,7 +473,10 @@ class DocumentationBlob(Tree):
             title,
             content_file_path,
             None,
-            self.parser_config)
+            self.parser_config,
+            self.source_fs,
+            self.stat_cache,
+            self.ignore_cache)
 
     def _generate_node(self, parent, title, node):
         '''
@@ -326,7 +496,8 @@ class DocumentationBlob(Tree):
         '''
         Unlazy the tree.
         '''
-        self.root.unlazy()
+        with span('blob.unlazy'):
+            self.root.unlazy()
 
     def is_lazy(self):
         '''
@@ -337,7 +508,7 @@ class DocumentationBlob(Tree):
                 return True
         return False
 
-    def prune_doc(self):
+    def prune_doc(self, peek_only=False):
         '''
         Prunes the documentation level of the documentation blob based on the
         provided level.
@@ -347,8 +518,12 @@ class DocumentationBlob(Tree):
 
         If a node has the option `level-only` enabled this will be kept only if the
         level is exactly the specified level.
+
+        If `peek_only` is True the blob is not unlazied: the options of each leaf
+        are read peeking only the beginning of its file(s) (see
+        `DocumentationNode.peek_options`) so the content can be streamed later.
         '''
-        if self.is_lazy():
+        if not peek_only and self.is_lazy():
             self.unlazy()
 
         level = self.parser_config['doc_level']
@@ -366,8 +541,9 @@ class DocumentationBlob(Tree):
                 #   internal node left with no child
                 return True
 
-            node_level = node.get_options().get('level', 0)
-            is_level_only = node.get_options().get('level-only', False)
+            options = node.peek_options() if peek_only else node.get_options()
+            node_level = options.get('level', 0)
+            is_level_only = options.get('level-only', False)
             if node_level > level:
                 # Always prune if node level is greater
                 return True
@@ -379,4 +555,5 @@ class DocumentationBlob(Tree):
                 #   and the node level is lower
                 return is_level_only
 
-        self.prune(_prune_function, prune_again_after_children=True)
+        with span('blob.prune'):
+            self.prune(_prune_function, prune_again_after_children=True)
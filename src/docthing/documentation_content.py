@@ -13,14 +13,24 @@ plugin and the format of the output resource format.
 For example, if the `ResourceReference` is an image, and the `Exporter` plugin will export
 the documentation to LaTeX, the `ResourceReference` will be compiled to a LaTeX
 `\\includegraphics` command.
+
+Since more than one exporter can export the same `Document`, exporters do not modify it:
+`Document.with_resources_replaced` returns a new `Document` sharing all the lines that are
+not resources with the original one (or the original itself if it has no resources).
 END FILE DOCUMENTATION '''
 
 import re
+import threading
 from abc import ABC, abstractmethod
 from typing import Union
 
+from .instrumentation import count, span
 from .util import sha256sum
 
+# Value of `ResourceReference.compiled` before the resource is compiled (None is
+#   a valid result of the compilation)
+_NOT_COMPILED = object()
+
 
 class ResourceReference(ABC):
     '''
@@ -48,7 +58,9 @@ class ResourceReference(ABC):
     def __init__(self, source, type, use_hash=True):
         self.source = source
         self.type = type
-        self.compiled = None
+        self.compiled = _NOT_COMPILED
+        # The same resource can be written by more than one exporter at once
+        self.lock = threading.Lock()
         if isinstance(use_hash, bool):
             self.hash = sha256sum(''.join(source)) if use_hash else None
         elif isinstance(use_hash, str):
@@ -124,21 +136,40 @@ class ResourceReference(ABC):
         '''
         pass
 
-    def write(self, output_prefix):
-        if self.compiled is None:
-            self.compiled = self.compile()
-
-        if self.compiled is None:
+    def get_compiled(self):
+        '''
+        Compiles the resource (only the first time it is called) and returns
+        the compiled resource (None if the resource does not produce any data).
+        '''
+        with self.lock:
+            if self.compiled is _NOT_COMPILED:
+                with span('compile.' + type(self).__name__):
+                    self.compiled = self.compile()
+                count('resources.compiled')
+            return self.compiled
+
+    def write(self, output_prefix, output_writer=None):
+        '''
+        Compiles the resource (once) and writes it next to `output_prefix`.
+        If an `OutputWriter` is provided the file is written only if its
+        content changed (see `docthing.output`).
+        '''
+        compiled = self.get_compiled()
+        if compiled is None:
             # This is the case where the resource reference does not
             #    produce any data.
             return
 
+        if output_writer is not None:
+            output_writer.write(output_prefix + self.get_path(), compiled)
+            return
+
         mode = 'w+'
-        if isinstance(self.compiled, bytes):
+        if isinstance(compiled, bytes):
             mode = 'wb+'
 
         with open(output_prefix + self.get_path(), mode) as f:
-            f.write(self.compiled)
+            f.write(compiled)
 
     def __str__(self):
         return f'@ref({self.get_type()})-->[{self.get_path()}]\n'
@@ -227,6 +258,23 @@ class Document():
                     ResourceReference) or ResourceReference.search(el):
                 self.content[i] = import_function(title, el)
 
+    def with_resources_replaced(self, title, import_function):
+        """
+        Returns a copy of the document with all resource references replaced
+        with imports, leaving this one untouched. Lines are shared with this
+        document and if there is nothing to replace the document itself is
+        returned.
+        """
+        content = None
+        for i, el in enumerate(self.content):
+            if isinstance(
+                    el,
+                    ResourceReference) or ResourceReference.search(el):
+                if content is None:
+                    content = list(self.content)
+                content[i] = import_function(title, el)
+        return self if content is None else Document(content)
+
     def prepend_resource(self, resource):
         """
         Prepends a resource to the document.
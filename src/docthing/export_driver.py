@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+When more than one exporter is enabled (e.g. `type=markdown,html`) the
+`ExportDriver` exports the (interpreted) [`DocumentationBlob`](@DocumentationBlob)
+with all of them at once instead of one after the other:
+
+- the leaves are walked only once and the output path of each leaf (relative to
+  the output directory of an exporter) is computed only once;
+- each leaf is handed to all the exporters (the _sinks_) on a pool of threads.
+
+Exporters declaring to be thread-safe (see `Exporter.is_thread_safe`) can export
+more than one leaf at once, the others export one leaf at a time, in tree order
+(e.g. the `bundle` exporter appends each leaf to a single file). Leaves are
+shared by all the exporters, which export copy-on-write views of them (see
+`DocumentationNode.with_resources_replaced`).
+END FILE DOCUMENTATION '''
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import log
+from .constants import DEFAULT_EXPORT_WORKERS
+from .instrumentation import span
+from .plugins.exporter_interface import Exporter
+
+
+class ExportDriver():
+    '''
+    Exports leaves with several exporters in a single walk of the tree.
+
+        Args:
+            exporters (list): The enabled `Exporter`s.
+            output_dir (str): The output directory passed to each exporter.
+            workers (int, optional): The number of threads exporting leaves.
+    '''
+
+    def __init__(self, exporters, output_dir, workers=DEFAULT_EXPORT_WORKERS):
+        if workers < 1:
+            raise ValueError('workers must be a positive integer')
+
+        self.exporters = exporters
+        self.output_dir = output_dir
+        self.workers = workers
+        self.out_dirs = []
+        self.relative_paths = {}
+        # Exporters that are not thread-safe export one leaf at a time
+        self.locks = [None if exporter.is_thread_safe() else threading.Lock()
+                      for exporter in exporters]
+
+    def prepare(self, leaves):
+        '''
+        Prepares all the exporters to export the given leaves.
+        '''
+        self.relative_paths = {leaf: Exporter.get_leaf_relative_path(leaf)
+                               for leaf in leaves}
+        relative_paths = list(self.relative_paths.values())
+        self.out_dirs = []
+        for exporter in self.exporters:
+            plugin_out_dir = exporter.prepare_export(self.output_dir)
+            exporter.prepare_directories(leaves, plugin_out_dir, relative_paths)
+            self.out_dirs.append(plugin_out_dir)
+
+    def _export_to(self, i, leaf, relative_path):
+        exporter = self.exporters[i]
+        lock = self.locks[i]
+        with span('export_leaf.' + exporter.get_name(), leaf=leaf.get_title()):
+            if lock is None:
+                exporter.export_leaf(leaf, self.out_dirs[i], relative_path)
+            else:
+                with lock:
+                    exporter.export_leaf(leaf, self.out_dirs[i], relative_path)
+
+    def _tasks(self, leaf):
+        relative_path = self.relative_paths.get(leaf)
+        if relative_path is None:
+            relative_path = Exporter.get_leaf_relative_path(leaf)
+        return [(i, leaf, relative_path) for i in range(len(self.exporters))]
+
+    def export_leaf(self, leaf, pool=None):
+        '''
+        Exports a single leaf with all the exporters (on `pool` if provided)
+        and returns once all of them are done.
+        '''
+        tasks = self._tasks(leaf)
+        if pool is None or len(tasks) == 1:
+            for task in tasks:
+                self._export_to(*task)
+            return
+        for future in [pool.submit(self._export_to, *task) for task in tasks]:
+            future.result()
+
+    def finish(self):
+        '''
+        Finalizes the output of all the exporters.
+        '''
+        for exporter in self.exporters:
+            exporter.finish_export()
+
+    def abort(self):
+        '''
+        Discards the partial output of all the exporters after a failure.
+        '''
+        for exporter in self.exporters:
+            try:
+                exporter.abort_export()
+            except Exception as e:
+                log.warning(f'{exporter.get_name()}: partial output not discarded: {e}')
+
+    def export(self, documentation_blob):
+        '''
+        Exports the whole documentation blob with all the exporters.
+        '''
+        if documentation_blob.is_lazy():
+            log.warning(
+                'Documentation is lazy. This means that no `meta` ' +
+                'plugin was used on it before exporting.')
+            documentation_blob.unlazy()
+
+        with span('export'):
+            leaves = documentation_blob.get_leaves()
+            self.prepare(leaves)
+            try:
+                self._export_all(leaves)
+            except BaseException:
+                self.abort()
+                raise
+            self.finish()
+
+    def _export_all(self, leaves):
+        with ThreadPoolExecutor(self.workers, 'docthing-exporter') as pool:
+            futures = []
+            for i, lock in enumerate(self.locks):
+                if lock is None:
+                    futures += [pool.submit(self._export_to, i, leaf,
+                                            self.relative_paths[leaf])
+                                for leaf in leaves]
+                else:
+                    # One leaf after the other, in tree order
+                    futures.append(pool.submit(self._export_all_to, i, leaves))
+            for future in futures:
+                future.result()
+
+    def _export_all_to(self, i, leaves):
+        for leaf in leaves:
+            self._export_to(i, leaf, self.relative_paths[leaf])
@@ -21,6 +21,9 @@ END FILE DOCUMENTATION '''
 
 import re
 import os
+from . import log
+from .instrumentation import count
+from .sourcefs.local import LOCAL_FS
 from .util import parse_value
 
 
@@ -28,7 +31,7 @@ from .util import parse_value
 # PUBLIC
 # =======================
 
-def extract_documentation(path_to_file, parser_config):
+def extract_documentation(path_to_file, parser_config, source_fs=None):
     '''
     Extracts the documentation from the specified file path using the provided parser
     configuration.
@@ -37,6 +40,8 @@ def extract_documentation(path_to_file, parser_config):
             path_to_file (str): The path to the file to extract documentation from.
             parser_config (dict): The parser configuration dictionary to use for
             extracting the documentation.
+            source_fs (SourceFS, optional): The file system to read the file from.
+            Defaults to the local disk.
 
         Returns a tuple:
             first element is a str or None: The extracted documentation, or None if no
@@ -44,20 +49,59 @@ def extract_documentation(path_to_file, parser_config):
             second element is a dict or None: The extracted options, or None if no
             documentation was found.
     '''
+    source_fs = source_fs or LOCAL_FS
+
     if path_to_file.endswith('.md'):
-        with open(path_to_file, 'r') as f:
-            return f.readlines(), {}
+        with source_fs.open(path_to_file) as f:
+            lines = f.readlines()
+        count('files.read')
+        count('lines.scanned', len(lines))
+        count('bytes.read', sum(len(line) for line in lines))
+        return lines, {}
 
-    res, options = _peek_n_read_if_match(path_to_file, parser_config)
+    res, options = _peek_n_read_if_match(path_to_file, parser_config, source_fs)
 
     if res is None:
-        print(
-            'Warning: no documentation found correspondig to path ' +
+        log.warning(
+            'no documentation found correspondig to path ' +
             path_to_file)
 
     return res, options
 
 
+def peek_options(path_to_file, parser_config, source_fs=None):
+    '''
+    Reads only the first `peek_lines` lines of the specified file and returns the
+    options of its documentation block without reading the rest of the file.
+
+    This is useful to know in advance whether a file will be kept or pruned
+    (see `DocumentationBlob.prune_doc`) without extracting its documentation.
+
+        Args:
+            path_to_file (str): The path to the file to peek.
+            parser_config (dict): The parser configuration dictionary.
+            source_fs (SourceFS, optional): The file system to read the file from.
+
+        Returns:
+            dict or None: The options of the documentation block, or None if no
+            documentation was found in the peeked lines.
+    '''
+    if path_to_file.endswith('.md'):
+        return {}
+
+    current_config = _config_for_file(path_to_file, parser_config)
+    begin_regex_ml, begin_regex_sl = _regex_begin_documentation(current_config)
+
+    is_sl = None
+    with (source_fs or LOCAL_FS).open(path_to_file) as input_file:
+        for _, line in zip(range(current_config['peek_lines']), input_file):
+            found, is_sl = is_begin(line, begin_regex_ml, begin_regex_sl, is_sl)
+            if found:
+                return _parse_options(line)
+
+    return None
+
+
 # =======================
 # REGULAR EXPRESSIONS
 # =======================
@@ -232,7 +276,22 @@ def is_end(line, regex_ml, regex_sl, is_sl):
 # IO
 # =======================
 
-def _peek_n_read_if_match(path_to_file, parser_config):
+def _config_for_file(path_to_file, parser_config):
+    '''
+    Generates a parser configuration specific to the extension of the given file
+    by overriding the generic values with the ones in the extension subsection.
+    '''
+    ext = os.path.splitext(path_to_file)[1].replace('.', '')
+
+    current_config = parser_config.copy()
+    if ext in parser_config:
+        for k, v in current_config[ext].items():
+            current_config[k] = v
+
+    return current_config
+
+
+def _peek_n_read_if_match(path_to_file, parser_config, source_fs=LOCAL_FS):
     '''
     Peeks the source code file to check for the presence of a documentation string
     and reads until the end of the documentation if found.
@@ -240,19 +299,14 @@ def _peek_n_read_if_match(path_to_file, parser_config):
         Args:
             path_to_file (str): The path to the file to be processed.
             parser_config (dict): The parser configuration dictionary.
+            source_fs (SourceFS): The file system to read the file from.
 
         Returns:
             (list[str], options) or None: A list of strings containing the lines of
             the documentation block and extracted options in a tuple, or None if no
             documentation block is found.
     '''
-    ext = os.path.splitext(path_to_file)[1].replace('.', '')
-
-    # generate a parser_config specific to the current file extension
-    current_config = parser_config.copy()
-    if ext in parser_config:
-        for k, v in current_config[ext].items():
-            current_config[k] = v
+    current_config = _config_for_file(path_to_file, parser_config)
 
     begin_regex_ml, begin_regex_sl = _regex_begin_documentation(current_config)
     end_regex_ml, end_regex_sl = _regex_end_documentation(current_config)
@@ -269,7 +323,9 @@ def _peek_n_read_if_match(path_to_file, parser_config):
         res, is_sl = is_end(line, end_regex_ml, end_regex_sl, is_sl)
         return res
 
-    with open(path_to_file) as input_file:
+    count('files.read')
+
+    with source_fs.open(path_to_file) as input_file:
         # Peek the first `line_number` lines
         document_lines = [next(input_file)
                           for _ in range(current_config['peek_lines'])]
@@ -279,6 +335,7 @@ def _peek_n_read_if_match(path_to_file, parser_config):
 
         # If none of the lines match the begin_regex, return None
         if len(first_line_index) == 0:
+            count('lines.scanned', len(document_lines))
             return None, None
 
         first_line_index = first_line_index[0]
@@ -297,10 +354,12 @@ def _peek_n_read_if_match(path_to_file, parser_config):
                     break
                 last_line_index += 1
             except StopIteration:
-                print(
-                    'Warning: reached end of file before end of documentation: ' +
+                log.warning(
+                    'reached end of file before end of documentation: ' +
                     'this usually means that the documentation is not properly ' +
                     'closed or the entire file contains only documentation')
                 break
 
+        count('lines.scanned', len(document_lines))
+        count('bytes.read', sum(len(line) for line in document_lines))
         return document_lines[first_line_index:last_line_index + 1], options
@@ -0,0 +1,295 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+Directory leaves skip every file and directory ignored by a `.gitignore` or a
+`.docthingignore` file. Both files follow the
+[`gitignore`](https://git-scm.com/docs/gitignore) syntax:
+
+- blank lines and lines starting with `#` are ignored;
+- a leading `!` negates the pattern (re-including what a previous pattern
+  excluded);
+- a trailing `/` matches only directories;
+- a pattern containing a `/` (other than the trailing one) is relative to the
+  directory of the ignore file, otherwise it matches at any depth;
+- `*`, `?`, `[...]` and `**` have the usual glob meaning.
+
+The rules of a directory are the ones found in its ignore files plus the ones of
+its parent directories up to the root of the repository (the first directory
+containing `.git`) or, when the project is not in a repository, up to the
+directory of the index file: ignore files in unrelated ancestors (e.g. the home
+directory) are never applied. As in `git`, when several patterns match the last one wins
+and a file cannot be re-included if one of its parent directories is ignored:
+ignored directories are never walked into.
+
+The patterns of each ignore file are compiled once into a few regular
+expressions (one for each run of consecutive patterns of the same kind) and the
+rules of each directory are cached by an `IgnoreCache`.
+END FILE DOCUMENTATION '''
+
+import os
+import re
+
+from .constants import DEFAULT_IGNORE_FILES
+from .instrumentation import count
+from .sourcefs.local import LOCAL_FS
+
+
+# =======================
+# PATTERNS
+# =======================
+
+def _translate_glob(pattern):
+    '''
+    Translates the body of a gitignore pattern into a regular expression.
+    '''
+    res = ''
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+            res += '(?:.*/)?'
+            i += 3
+            continue
+        if pattern.startswith('**', i) and i + 2 == n and \
+                (i == 0 or pattern[i - 1] == '/'):
+            res += '.*'
+            i += 2
+            continue
+        if c == '*':
+            res += '[^/]*'
+        elif c == '?':
+            res += '[^/]'
+        elif c == '[':
+            j = pattern.find(']', i + 2)
+            if j == -1:
+                res += '\\['
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                res += '[' + body.replace('\\', '\\\\') + ']'
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            res += re.escape(pattern[i])
+        else:
+            res += re.escape(c)
+        i += 1
+    return res
+
+
+def _parse_pattern(line):
+    '''
+    Parses a single line of an ignore file.
+
+        Returns:
+            tuple or None: `(regex, negated, dir_only)` or None if the line does
+            not contain a pattern.
+    '''
+    line = line.rstrip('\n').rstrip('\r')
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped += ' '
+    line = stripped
+
+    if not line or line.startswith('#'):
+        return None
+
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    elif line.startswith('\\!') or line.startswith('\\#'):
+        line = line[1:]
+
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    anchored = '/' in line
+    line = line.lstrip('/')
+
+    regex = _translate_glob(line)
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    return regex, negated, dir_only
+
+
+class IgnorePatterns():
+    '''
+    The compiled patterns of a single ignore file.
+
+    Consecutive patterns with the same negation and directory-only flags are
+    joined into a single regular expression; groups are evaluated from the last
+    to the first so the last matching pattern wins as in `git`.
+
+        Args:
+            base_dir (str): The absolute path of the directory of the ignore file.
+            lines (iterable of str): The lines of the ignore file.
+    '''
+
+    def __init__(self, base_dir, lines):
+        self.base_dir = base_dir
+        self.groups = []
+
+        current = None
+        for line in lines:
+            parsed = _parse_pattern(line)
+            if parsed is None:
+                continue
+            regex, negated, dir_only = parsed
+            if current is None or current[1:] != (negated, dir_only):
+                current = [[], negated, dir_only]
+                self.groups.append(current)
+            current[0].append(regex)
+
+        self.groups = [(re.compile('^(?:' + '|'.join(regexes) + ')$'),
+                        negated, dir_only)
+                       for regexes, negated, dir_only in reversed(self.groups)]
+
+    @staticmethod
+    def from_file(path, source_fs=None):
+        '''
+        Compiles the ignore file at the specified path.
+        '''
+        with (source_fs or LOCAL_FS).open(path) as f:
+            return IgnorePatterns(os.path.dirname(path), f.readlines())
+
+    def is_empty(self):
+        return len(self.groups) == 0
+
+    def match(self, relative_path, is_dir=False):
+        '''
+        Matches a `/`-separated path relative to `base_dir`.
+
+            Returns:
+                bool or None: True if the path is ignored, False if it is
+                explicitly re-included, None if no pattern matches it.
+        '''
+        for regex, negated, dir_only in self.groups:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative_path):
+                return not negated
+        return None
+
+
+# =======================
+# MATCHER
+# =======================
+
+class IgnoreMatcher():
+    '''
+    The ignore rules that apply inside a directory: its own ignore files plus
+    the rules of its parent directory.
+    '''
+
+    def __init__(self, directory, patterns, parent=None):
+        self.directory = directory
+        self.patterns = [p for p in patterns if not p.is_empty()]
+        self.parent = parent
+        # Nothing to check if neither this nor any parent has patterns
+        self.empty = len(self.patterns) == 0 and \
+            (parent is None or parent.empty)
+
+    def is_ignored(self, path, is_dir=False):
+        '''
+        Returns whether the absolute `path` (inside `directory`) is ignored.
+        '''
+        if self.empty:
+            return False
+
+        matcher = self
+        while matcher is not None:
+            for patterns in reversed(matcher.patterns):
+                relative_path = path[len(patterns.base_dir):].lstrip(os.sep)
+                if os.sep != '/':
+                    relative_path = relative_path.replace(os.sep, '/')
+                res = patterns.match(relative_path, is_dir)
+                if res is not None:
+                    return res
+            matcher = matcher.parent
+        return False
+
+
+class IgnoreCache():
+    '''
+    Caches the `IgnoreMatcher` of each directory so that each ignore file is
+    read and compiled only once.
+
+        Args:
+            ignore_files (list): The names of the ignore files to look for.
+            source_fs (SourceFS, optional): The file system the ignore files are
+                read from. Defaults to the local disk.
+            root (str, optional): The root of the project (the directory of the
+                index file). If it is not in a repository the ignore files above
+                it are not looked for.
+    '''
+
+    def __init__(self, ignore_files=DEFAULT_IGNORE_FILES, source_fs=None,
+                 root=None):
+        self.ignore_files = list(ignore_files)
+        self.source_fs = source_fs or LOCAL_FS
+        self.root = os.path.abspath(root) if root is not None else None
+        self.root_in_repository = None
+        self.matchers = {}
+
+    def _is_top(self, directory, entry_names):
+        '''
+        Returns whether the rules of the parents of `directory` do not apply.
+        '''
+        if self.source_fs.is_repository_root(directory, entry_names):
+            return True
+        if directory != self.root:
+            return False
+        if self.root_in_repository is None:
+            parent = os.path.dirname(directory)
+            while not self.source_fs.is_repository_root(parent) and \
+                    os.path.dirname(parent) != parent:
+                parent = os.path.dirname(parent)
+            self.root_in_repository = \
+                self.source_fs.is_repository_root(parent)
+        return not self.root_in_repository
+
+    def for_directory(self, directory, entry_names=None):
+        '''
+        Returns the matcher for the specified directory.
+
+            Args:
+                directory (str): The directory.
+                entry_names (set, optional): The names of the entries of the
+                    directory if already known (avoids a `stat` for each of the
+                    ignore files).
+        '''
+        directory = os.path.abspath(directory)
+        if directory in self.matchers:
+            count('cache.hits')
+            return self.matchers[directory]
+        count('cache.misses')
+
+        def _exists(name):
+            if entry_names is not None:
+                return name in entry_names
+            return self.source_fs.isfile(os.path.join(directory, name))
+
+        parent = None
+        parent_directory = os.path.dirname(directory)
+        if parent_directory != directory and \
+                not self._is_top(directory, entry_names):
+            parent = self.for_directory(parent_directory)
+
+        patterns = [IgnorePatterns.from_file(os.path.join(directory, name),
+                                             self.source_fs)
+                    for name in self.ignore_files
+                    if _exists(name)]
+
+        matcher = IgnoreMatcher(directory, patterns, parent)
+        self.matchers[directory] = matcher
+        return matcher
+
+    def clear(self):
+        '''
+        Forget all the cached matchers.
+        '''
+        self.matchers = {}
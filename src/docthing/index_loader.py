@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+An _index file_ can include other index files using the `__index__` key (e.g.
+each project of a monorepo can have its own index file included by the index
+file of the monorepo). Before the [`DocumentationBlob`](@DocumentationBlob) is
+built, the `IndexLoader` resolves the whole graph of the index files:
+
+- index files are parsed concurrently by a pool of threads, each one as soon
+  as the index file including it has been parsed;
+- each index file is parsed only once, even if it is included more than once
+  (also through different paths), since parsed index files are cached by
+  their canonical path (see `SourceFS.realpath`);
+- an index file including itself (directly or not) is reported as an error
+  instead of being followed forever.
+
+The tree is then built from the parsed index files without touching the
+files again.
+END FILE DOCUMENTATION '''
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from . import jsonc
+from .constants import DEFAULT_INDEX_LOADER_WORKERS
+from .instrumentation import span
+from .sourcefs.local import LOCAL_FS
+
+
+def find_included_indexes(index):
+    '''
+    Returns the paths of the index files included (using the `__index__` key)
+    in a parsed index file, in order of appearance.
+    '''
+    res = []
+    stack = [index]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            children = []
+            for k, v in node.items():
+                if k == '__index__' and isinstance(v, str):
+                    res.append(v)
+                elif isinstance(v, (dict, list)):
+                    children.append(v)
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            stack.extend(reversed([v for v in node if isinstance(v, (dict, list))]))
+    return res
+
+
+class IndexLoader():
+    '''
+    Loads an index file and all the index files it includes.
+
+        Args:
+            source_fs (SourceFS, optional): The file system the index files are
+                read from. Defaults to the local disk.
+            workers (int, optional): The number of threads parsing index files.
+    '''
+
+    def __init__(self, source_fs=None, workers=DEFAULT_INDEX_LOADER_WORKERS):
+        if workers < 1:
+            raise ValueError('workers must be a positive integer')
+
+        self.source_fs = source_fs or LOCAL_FS
+        self.workers = workers
+        # canonical path -> parsed index file
+        self.indexes = {}
+        # canonical path -> canonical paths of the included index files
+        self.includes = {}
+
+    def _parse(self, realpath):
+        with span('index.parse', index=realpath):
+            with self.source_fs.open(realpath) as f:
+                return jsonc.load(f, realpath)
+
+    def load(self, index_file):
+        '''
+        Parses `index_file` and all the index files it includes (recursively).
+
+            Returns:
+                str: The canonical path of `index_file`.
+
+            Raises:
+                ValueError: If an index file includes itself (directly or not).
+        '''
+        root = self.source_fs.realpath(index_file)
+        if root in self.indexes:
+            return root
+
+        with ThreadPoolExecutor(self.workers, 'docthing-index') as pool:
+            pending = {pool.submit(self._parse, root): root}
+            scheduled = {root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    realpath = pending.pop(future)
+                    index = future.result()
+                    self.indexes[realpath] = index
+                    self.includes[realpath] = [
+                        self.source_fs.realpath(path)
+                        for path in find_included_indexes(index)]
+
+                    for included in self.includes[realpath]:
+                        if included not in scheduled and included not in self.indexes:
+                            scheduled.add(included)
+                            pending[pool.submit(self._parse, included)] = included
+
+        self._check_cycles(root)
+        return root
+
+    def _check_cycles(self, root):
+        '''
+        Raises a ValueError if an index file reachable from `root` includes
+        itself (directly or not).
+        '''
+        visited = set()
+        chain = [root]
+        stack = [iter(self.includes[root])]
+        while stack:
+            included = next(stack[-1], None)
+            if included is None:
+                visited.add(chain.pop())
+                stack.pop()
+            elif included in chain:
+                cycle = chain[chain.index(included):] + [included]
+                raise ValueError('Circular inclusion of index files: ' +
+                                 ' -> '.join(cycle))
+            elif included not in visited:
+                chain.append(included)
+                stack.append(iter(self.includes[included]))
+
+    def get(self, index_file):
+        '''
+        Returns the parsed content of an index file loaded by `load`.
+        '''
+        return self.indexes[self.source_fs.realpath(index_file)]
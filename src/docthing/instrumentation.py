@@ -0,0 +1,261 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+To understand where the time of a build goes `docthing` can be run with the
+`--profile` command-line option: each stage of the build is measured and a
+summary table is printed at the end (and saved as a JSON report).
+
+Stages are measured wrapping them in a _span_:
+
+```python
+from docthing.instrumentation import span, count
+
+with span('export.markdown'):
+    ...
+count('files.read')
+```
+
+Spans with the same name are aggregated (number of calls, total and maximum
+time) and counters are summed. The following are used by `docthing` itself:
+
+| span                     | measures                                       |
+|--------------------------|------------------------------------------------|
+| `blob.build`             | `DocumentationBlob` construction               |
+| `index.parse`            | parsing of a single index file                 |
+| `blob.unlazy`            | extraction of the whole blob                   |
+| `blob.prune`             | `DocumentationBlob.prune_doc`                  |
+| `extract`                | extraction of a single leaf                    |
+| `interpret.<plugin>`     | `MetaInterpreter.interpret`                    |
+| `interpret_leaf.<plugin>`| a meta-interpreter processing a single leaf    |
+| `export`                 | `ExportDriver.export` (all the exporters)      |
+| `export.<plugin>`        | `Exporter.export`                              |
+| `export_leaf.<plugin>`   | an exporter writing a single leaf              |
+| `compile.<resource>`     | `ResourceReference.compile`                    |
+| `subprocess.<program>`   | an external program run to compile a resource  |
+
+| counter               | counts                                             |
+|-----------------------|----------------------------------------------------|
+| `files.read`          | source files read by the extractor                 |
+| `bytes.read`          | characters read by the extractor                   |
+| `lines.scanned`       | lines read by the extractor                        |
+| `cache.hits`          | lookups answered by a cache (ignore files, git)    |
+| `cache.misses`        | lookups that missed a cache                        |
+| `resources.compiled`  | compiled `ResourceReference`s                      |
+| `output.written`      | output files written by exporters                  |
+| `output.skipped`      | output files left untouched since unchanged        |
+
+When profiling is not enabled spans and counters cost close to nothing.
+
+## Timeline traces
+
+With the `--trace` command-line option every single span is also recorded as a
+Chrome trace event (with the id of the thread that run it and, for per-leaf
+spans, the title of the leaf) and saved to a JSON file that can be opened with
+`chrome://tracing` or [Perfetto](https://ui.perfetto.dev) to look for
+stragglers and serialization points (e.g. a single slow diagram blocking the
+exporter).
+
+Extra details can be attached to a span as keyword arguments:
+
+```python
+with span('extract', leaf=title):
+    ...
+```
+END FILE DOCUMENTATION '''
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span():
+    '''
+    A context manager measuring the time spent inside it.
+    '''
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.begin = None
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.profiler.record(self.name, time.perf_counter() - self.begin,
+                             self.begin, self.args)
+
+
+class Profiler():
+    '''
+    Collects the timings of the spans and the values of the counters of a
+    build and, if tracing, the trace events of each span. Thread-safe.
+    '''
+
+    def __init__(self):
+        self.enabled = False
+        self.tracing = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        '''
+        Forget all the collected data.
+        '''
+        with self.lock:
+            self.spans = {}
+            self.counters = {}
+            self.events = []
+            self.threads = {}
+            self.started = time.perf_counter()
+
+    def enable(self, trace=False):
+        '''
+        Start collecting data.
+
+            Args:
+                trace (bool): Whether to also record a trace event for each span.
+        '''
+        self.reset()
+        self.tracing = trace
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.tracing = False
+
+    def span(self, name, **args):
+        '''
+        Return a context manager measuring the time spent inside it. The
+        keyword arguments are attached to the trace event of the span.
+        '''
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name, duration, begin=None, args=None):
+        '''
+        Record a call of the span `name` lasting `duration` seconds. If tracing
+        and the `begin` time (as returned by `time.perf_counter`) is known, a
+        trace event is recorded too.
+        '''
+        with self.lock:
+            stats = self.spans.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+
+            if self.tracing and begin is not None:
+                thread = threading.current_thread()
+                tid = threading.get_native_id()
+                self.threads[tid] = thread.name
+                self.events.append({
+                    'name': name,
+                    'cat': name.split('.')[0],
+                    'ph': 'X',
+                    'ts': (begin - self.started) * 1e6,
+                    'dur': duration * 1e6,
+                    'pid': os.getpid(),
+                    'tid': tid,
+                    'args': args or {},
+                })
+
+    def count(self, name, value=1):
+        '''
+        Increment the counter `name` by `value`.
+        '''
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        '''
+        Return the collected data as a JSON serializable dict.
+        '''
+        with self.lock:
+            return {
+                'wall_time': time.perf_counter() - self.started,
+                'spans': {name: {'calls': calls, 'total': total, 'max': longest}
+                          for name, (calls, total, longest) in self.spans.items()},
+                'counters': dict(self.counters),
+            }
+
+    def write_report(self, path):
+        '''
+        Write the JSON report to `path`.
+        '''
+        with open(path, 'w+') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def trace(self):
+        '''
+        Return the recorded trace events in the Chrome trace event format.
+        '''
+        pid = os.getpid()
+        with self.lock:
+            metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid,
+                         'args': {'name': 'docthing'}}]
+            metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': pid,
+                          'tid': tid, 'args': {'name': name}}
+                         for tid, name in self.threads.items()]
+            return {
+                'traceEvents': metadata + self.events,
+                'displayTimeUnit': 'ms',
+            }
+
+    def write_trace(self, path):
+        '''
+        Write the trace events to `path`.
+        '''
+        with open(path, 'w+') as f:
+            json.dump(self.trace(), f)
+
+    def summary_table(self):
+        '''
+        Return a human readable summary of the collected data.
+        '''
+        report = self.report()
+        width = max([len(n) for n in report['spans']] +
+                    [len(n) for n in report['counters']] + [len('counter')])
+
+        res = f'{"span":<{width}}  {"calls":>8}  {"total (s)":>10}  ' +\
+            f'{"mean (ms)":>10}  {"max (ms)":>10}\n'
+        spans = sorted(report['spans'].items(),
+                       key=lambda item: item[1]['total'], reverse=True)
+        for name, stats in spans:
+            res += f'{name:<{width}}  {stats["calls"]:>8}  ' +\
+                f'{stats["total"]:>10.3f}  ' +\
+                f'{1000 * stats["total"] / stats["calls"]:>10.3f}  ' +\
+                f'{1000 * stats["max"]:>10.3f}\n'
+
+        res += f'\n{"counter":<{width}}  {"value":>8}\n'
+        for name, value in sorted(report['counters'].items()):
+            res += f'{name:<{width}}  {value:>8}\n'
+
+        res += f'\nwall time: {report["wall_time"]:.3f} s\n'
+        return res
+
+
+PROFILER = Profiler()
+
+
+def span(name, **args):
+    '''
+    Return a context manager measuring the time spent inside it with the
+    global profiler.
+    '''
+    return PROFILER.span(name, **args)
+
+
+def count(name, value=1):
+    '''
+    Increment the counter `name` of the global profiler by `value`.
+    '''
+    PROFILER.count(name, value)
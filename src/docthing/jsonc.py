@@ -0,0 +1,249 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+Index files are written in _JSON with comments_ (JSONC): plain JSON where
+
+- `// ...` and `/* ... */` comments are allowed wherever whitespace is;
+- a trailing comma is allowed after the last element of an object or array.
+
+`docthing.jsonc` parses them in a single pass over the text: comments and
+trailing commas are skipped while tokenizing, no comment-free copy of the file
+is made first. Objects and arrays containing neither comments nor trailing commas
+are handed as a whole to the (C accelerated) scanner of the standard `json`
+module, so large generated index files are parsed almost as fast as plain JSON.
+Object keys keep their order.
+
+Errors report the line and the column where they are found:
+
+```
+docthing.jsonc:12:5: Expecting ':' delimiter
+```
+END FILE DOCUMENTATION '''
+
+import re
+from json.decoder import JSONDecoder, scanstring
+from json.scanner import NUMBER_RE, make_scanner
+
+# Whitespace and comments
+_SKIP_RE = re.compile(r'(?:[ \t\n\r]+|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+_SKIP_START = ' \t\n\r/'
+
+# Parses plain JSON values (no comments nor trailing commas) in C if possible
+_scan_json = make_scanner(JSONDecoder())
+# Where the plain JSON scanner would fail (may match inside strings too)
+_JSONC_ONLY = [
+    re.compile(r'/[/*]'),                   # comments
+    re.compile(r',[ \t\n\r]*[}\]]'),        # trailing commas
+]
+# Up to this many characters are copied to scan a value as plain JSON
+_PLAIN_SLICE = 1 << 16
+
+_CONSTANTS = {
+    'true': True,
+    'false': False,
+    'null': None,
+}
+
+
+class JSONCDecodeError(ValueError):
+    '''
+    Error raised when a document is not valid JSONC.
+
+        Args:
+            msg (str): The description of the error.
+            doc (str): The document being parsed.
+            pos (int): The index in `doc` where the error was found.
+            name (str, optional): The name of the document (e.g. its path).
+    '''
+
+    def __init__(self, msg, doc, pos, name=None):
+        self.msg = msg
+        self.pos = pos
+        self.lineno = doc.count('\n', 0, pos) + 1
+        self.colno = pos - doc.rfind('\n', 0, pos)
+        self.name = name
+        location = f'{self.lineno}:{self.colno}'
+        if name is not None:
+            location = f'{name}:{location}'
+        super().__init__(f'{location}: {msg}')
+
+
+class _Parser():
+    '''
+    A recursive descent parser over a JSONC string.
+    '''
+
+    def __init__(self, doc, name):
+        self.doc = doc
+        self.name = name
+        # Next match of each of the regular expressions in `_JSONC_ONLY`
+        self.jsonc_only = [-1] * len(_JSONC_ONLY)
+
+    def error(self, msg, pos):
+        return JSONCDecodeError(msg, self.doc, pos, self.name)
+
+    def skip(self, idx):
+        '''
+        Returns the index of the first character after `idx` that is neither
+        whitespace nor part of a comment.
+        '''
+        doc = self.doc
+        if idx < len(doc) and doc[idx] in _SKIP_START:
+            idx = _SKIP_RE.match(doc, idx).end()
+            if doc.startswith('/*', idx):
+                raise self.error('Unterminated comment', idx)
+        return idx
+
+    def parse(self):
+        idx = self.skip(0)
+        value, idx = self.value(idx)
+        idx = self.skip(idx)
+        if idx != len(self.doc):
+            raise self.error('Extra data', idx)
+        return value
+
+    def value(self, idx):
+        doc = self.doc
+        try:
+            char = doc[idx]
+        except IndexError:
+            raise self.error('Expecting value', idx) from None
+
+        if char == '"':
+            return self.string(idx)
+        if char in '{[':
+            res = self.plain(idx)
+            if res is not None:
+                return res
+        if char == '{':
+            return self.object(idx + 1)
+        if char == '[':
+            return self.array(idx + 1)
+        return self.scalar(idx)
+
+    def scalar(self, idx):
+        doc = self.doc
+        match = NUMBER_RE.match(doc, idx)
+        if match is not None:
+            integer, fraction, exponent = match.groups()
+            if fraction or exponent:
+                return float(integer + (fraction or '') + (exponent or '')), match.end()
+            return int(integer), match.end()
+
+        for literal, constant in _CONSTANTS.items():
+            if doc.startswith(literal, idx):
+                return constant, idx + len(literal)
+
+        raise self.error('Expecting value', idx)
+
+    def _next_jsonc_only(self, idx):
+        '''
+        Returns the index of the first comment or trailing comma after `idx`.
+        '''
+        for i, regex in enumerate(_JSONC_ONLY):
+            if self.jsonc_only[i] < idx:
+                match = regex.search(self.doc, idx)
+                self.jsonc_only[i] = match.start() if match is not None else len(self.doc)
+        return min(self.jsonc_only)
+
+    def plain(self, idx):
+        '''
+        Most objects and arrays (e.g. the ones of generated index files) contain
+        no comment nor trailing comma: parse them as plain JSON. Returns None if
+        the one at `idx` can not be parsed this way.
+        '''
+        doc = self.doc
+        jsonc_only = self._next_jsonc_only(idx)
+        try:
+            if jsonc_only - idx > _PLAIN_SLICE:
+                return _scan_json(doc, idx)
+            # Only the text before the next comment (or trailing comma) can be
+            #   plain JSON: scanning a copy of just that keeps failures cheap
+            value, end = _scan_json(doc[idx:jsonc_only], 0)
+            return value, idx + end
+        except (ValueError, StopIteration):
+            return None
+
+    def string(self, idx):
+        try:
+            return scanstring(self.doc, idx + 1)
+        except ValueError as e:
+            raise self.error(e.msg, e.pos) from None
+
+    def object(self, idx):
+        doc = self.doc
+        res = {}
+        idx = self.skip(idx)
+        if doc.startswith('}', idx):
+            return res, idx + 1
+
+        while True:
+            if not doc.startswith('"', idx):
+                raise self.error(
+                    'Expecting property name enclosed in double quotes', idx)
+            key, idx = self.string(idx)
+
+            idx = self.skip(idx)
+            if not doc.startswith(':', idx):
+                raise self.error("Expecting ':' delimiter", idx)
+            idx = self.skip(idx + 1)
+
+            res[key], idx = self.value(idx)
+
+            idx = self.skip(idx)
+            if doc.startswith(',', idx):
+                idx = self.skip(idx + 1)
+                if doc.startswith('}', idx):
+                    # Trailing comma
+                    return res, idx + 1
+            elif doc.startswith('}', idx):
+                return res, idx + 1
+            else:
+                raise self.error("Expecting ',' delimiter", idx)
+
+    def array(self, idx):
+        doc = self.doc
+        res = []
+        idx = self.skip(idx)
+        if doc.startswith(']', idx):
+            return res, idx + 1
+
+        while True:
+            value, idx = self.value(idx)
+            res.append(value)
+
+            idx = self.skip(idx)
+            if doc.startswith(',', idx):
+                idx = self.skip(idx + 1)
+                if doc.startswith(']', idx):
+                    # Trailing comma
+                    return res, idx + 1
+            elif doc.startswith(']', idx):
+                return res, idx + 1
+            else:
+                raise self.error("Expecting ',' delimiter", idx)
+
+
+def loads(doc, name=None):
+    '''
+    Parses a JSONC document.
+
+        Args:
+            doc (str): The document.
+            name (str, optional): The name of the document used in errors.
+
+        Returns:
+            The parsed value (objects are returned as dicts keeping the order
+            of their keys).
+
+        Raises:
+            JSONCDecodeError: If the document is not valid JSONC.
+    '''
+    return _Parser(doc, name).parse()
+
+
+def load(fp, name=None):
+    '''
+    Parses a JSONC document read from the file object `fp` (see `loads`).
+    The name used in errors defaults to the name of the file.
+    '''
+    return loads(fp.read(), name if name is not None else getattr(fp, 'name', None))
@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+Messages printed by `docthing` go through this module so that their amount can
+be controlled with the `--quiet` and `--verbose` command-line options.
+
+| level     | printed messages                                       | option      |
+|-----------|--------------------------------------------------------|-------------|
+| `ERROR`   | errors only                                            | `--quiet`   |
+| `WARNING` | errors and warnings                                    |             |
+| `INFO`    | errors, warnings and progress (e.g. enabled plugins)   | _(default)_ |
+| `DEBUG`   | everything, including dumps of the documentation tree  | `--verbose` |
+
+Dumps of the documentation tree are written line by line to the output (see
+`TreeNode.write`) only when the `DEBUG` level is enabled, so they cost nothing
+otherwise.
+END FILE DOCUMENTATION '''
+
+import sys
+
+ERROR = 0
+WARNING = 1
+INFO = 2
+DEBUG = 3
+
+_level = INFO
+
+
+def set_level(level):
+    '''
+    Set the level of the messages to print.
+
+        Args:
+            level (int): One of `ERROR`, `WARNING`, `INFO` or `DEBUG`.
+    '''
+    global _level
+    if level not in (ERROR, WARNING, INFO, DEBUG):
+        raise ValueError(f'Invalid log level: {level}')
+    _level = level
+
+
+def get_level():
+    '''
+    Return the level of the messages printed.
+    '''
+    return _level
+
+
+def is_enabled(level):
+    '''
+    Return whether the messages of the specified level are printed.
+    '''
+    return level <= _level
+
+
+def error(message):
+    print('Error: ' + message, file=sys.stderr)
+
+
+def warning(message):
+    if is_enabled(WARNING):
+        print('Warning: ' + message, file=sys.stderr)
+
+
+def info(message):
+    if is_enabled(INFO):
+        print(message)
+
+
+def debug(message):
+    if is_enabled(DEBUG):
+        print(message)
+
+
+def dump_tree(title, tree, prefix=''):
+    '''
+    Write a dump of `tree` preceded by `title` to the standard output, one line
+    at a time, if the `DEBUG` level is enabled.
+    '''
+    if not is_enabled(DEBUG):
+        return
+    print(title)
+    tree.write(sys.stdout, prefix)
+    sys.stdout.flush()
@@ -0,0 +1,716 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+Exporters write their files through an `OutputWriter` which touches only the
+files whose bytes changed since the previous build: unchanged files keep their
+modification time, so static-site generators and `rsync`-based deploys do not
+see them as modified.
+
+To know whether a file changed without reading it back, the writer keeps a
+_manifest_ with the hash, the size and the modification time of each file it
+wrote. Manifests are kept in the docthing cache directory (one for each output
+directory, named after the hash of its absolute path) so that nothing but the
+documentation is written into the output. If a file was touched by someone else
+since (its size or modification time do not match the manifest), or there is no
+manifest, the new content is compared with the one on disk instead: first the
+sizes and then the bytes, a block at a time.
+
+At the end of each export the number of files written and skipped is reported
+(they are also counted as `output.written` and `output.skipped` when profiling,
+see `docthing.instrumentation`).
+
+## Staging
+
+With the `--atomic` command-line option a crashed (or concurrent) build never
+leaves a half-written output directory behind. Each exporter writes into a
+_staging_ directory next to its output directory (`.<exporter>.staging-<pid>`);
+unchanged files are hard links to the ones of the previous build, so they are
+not written at all. Once the export is complete the staged files are synced to
+disk in a single batch and the staging directory takes the place of the output
+directory: on Linux the two are swapped atomically (`renameat2` with
+`RENAME_EXCHANGE`) and the old output is then removed. Elsewhere (or on file
+systems not supporting it) two renames are needed: the old output directory is
+moved aside (`.<exporter>.old-<pid>`) and then removed. If a build crashes
+between the two renames the next one moves the old output directory back in
+place.
+
+## Precompressed files
+
+With the `--precompress` command-line option a gzip-compressed copy of each
+text file (Markdown, HTML, CSS, JavaScript, JSON, SVG, ...) is written next to
+it (`page.md.gz` next to `page.md`), ready to be served as is (e.g. by nginx
+with `gzip_static on`). Files are compressed on a pool of threads while the
+export goes on; files smaller than 1 KiB are not compressed (they would not get
+much smaller) and neither are the ones that did not change since the previous
+build, whose compressed copy is kept as it is.
+
+## Archives
+
+With the `--output-archive` command-line option (`zip` or `tar.gz`) each
+exporter writes its output straight into an archive (e.g. `markdown.zip` in the
+output directory) instead of a directory tree: files are compressed and appended
+to the archive as they are produced and nothing else is written to disk. In tar
+archives files with the same content (e.g. a resource shared by many leaves) are
+stored only once: their other copies are hard links to the first one. Zip
+archives have no links most tools can extract, so each copy is stored (it
+compresses well anyway). The archive is written to a temporary file which takes
+the place of the previous one once the export is complete (or is removed if the
+export fails).
+END FILE DOCUMENTATION '''
+
+import ctypes
+import errno
+import filecmp
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import stat
+import sys
+import tarfile
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from .constants import DEFAULT_PRECOMPRESS_WORKERS, OUTPUT_ARCHIVE_FORMATS
+from .constants import PRECOMPRESS_EXTENSIONS, PRECOMPRESS_MIN_SIZE
+from .instrumentation import count
+
+_MANIFEST_VERSION = 1
+_BLOCK_SIZE = 1 << 16
+
+# Directory containing the manifests (None to keep no manifest)
+_manifest_dir = None
+
+
+def use_manifest_dir(directory):
+    '''
+    Keeps the manifests of the output directories in `directory` from now on
+    (None to keep none).
+    '''
+    global _manifest_dir
+    _manifest_dir = directory
+
+
+def manifest_path(output_dir):
+    '''
+    Returns the path of the manifest of `output_dir`, or None if manifests are
+    not kept.
+    '''
+    if _manifest_dir is None:
+        return None
+    key = hashlib.sha256(os.path.abspath(output_dir).encode()).hexdigest()
+    return os.path.join(_manifest_dir, key + '.json')
+
+
+def same_content(path, data):
+    '''
+    Returns whether the file at `path` contains exactly `data` (bytes) reading
+    it a block at a time.
+    '''
+    with open(path, 'rb') as f:
+        offset = 0
+        while True:
+            block = f.read(_BLOCK_SIZE)
+            if not block:
+                return offset == len(data)
+            if block != data[offset:offset + len(block)]:
+                return False
+            offset += len(block)
+
+
+def file_digest(path):
+    '''
+    Returns the sha256 (hex) digest and the size of the file at `path` reading
+    it a block at a time.
+    '''
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(_BLOCK_SIZE)
+            if not block:
+                return digest.hexdigest(), size
+            digest.update(block)
+            size += len(block)
+
+
+def _fsync(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Some platforms can not open directories
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some file systems can not sync directories
+        pass
+    finally:
+        os.close(fd)
+
+
+def _file_mode():
+    '''
+    Returns the mode of the files created by the process (0666 without the
+    bits of its umask).
+    '''
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _link_or_copy(source, destination):
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+class OutputWriter():
+    '''
+    Writes files inside `root` only if their content changed. Thread-safe.
+
+        Args:
+            root (str): The output directory of an exporter.
+            reference_root (str, optional): The directory containing the output
+                of the previous build if it is not `root` (i.e. when `root` is a
+                staging directory).
+            precompress (bool, optional): Whether to write a `.gz` copy of each
+                text file too.
+    '''
+
+    def __init__(self, root, reference_root=None, precompress=False):
+        self.root = root
+        self.reference_root = reference_root or root
+        # Staging directories share the manifest of the directory they replace
+        self.manifest_path = manifest_path(self.reference_root)
+        self.lock = threading.Lock()
+        self.previous = self._load_manifest(self.manifest_path)
+        self.manifest = {}
+        self.written = 0
+        self.skipped = 0
+        # Files written but not synced to disk yet (only when staging)
+        self.unsynced = []
+        self.precompress = precompress
+        # Created when the first file is compressed
+        self.compressor = None
+        self.compressions = []
+
+    def is_staging(self):
+        return self.reference_root != self.root
+
+    def _load_manifest(self, manifest_path):
+        if manifest_path is None:
+            return {}
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != _MANIFEST_VERSION:
+            return {}
+        return manifest.get('files', {})
+
+    def _is_unchanged(self, reference, key, digest, size, same):
+        try:
+            stat = os.stat(reference)
+        except OSError:
+            return False
+
+        entry = self.previous.get(key)
+        if entry is not None and entry['size'] == stat.st_size and \
+                entry['mtime'] == stat.st_mtime_ns:
+            # The file is the one written by the previous build
+            return entry['sha256'] == digest
+
+        return stat.st_size == size and same()
+
+    def _key(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def _record(self, path, key, digest, unchanged):
+        stat = os.stat(path)
+        with self.lock:
+            if not unchanged and self.is_staging():
+                self.unsynced.append(path)
+            self.manifest[key] = {'sha256': digest, 'size': stat.st_size,
+                                  'mtime': stat.st_mtime_ns}
+            if unchanged:
+                self.skipped += 1
+            else:
+                self.written += 1
+        count('output.skipped' if unchanged else 'output.written')
+
+    def write(self, path, data):
+        '''
+        Writes `data` (str or bytes) to the file at `path` (inside `root`)
+        unless it already contains exactly that.
+
+            Returns:
+                bool: Whether the file was written.
+        '''
+        if isinstance(data, str):
+            data = data.encode()
+        digest = hashlib.sha256(data).hexdigest()
+        key = self._key(path)
+
+        reference = os.path.join(self.reference_root, key)
+
+        unchanged = self._is_unchanged(reference, key, digest, len(data),
+                                       lambda: same_content(reference, data))
+        if unchanged and reference != path:
+            _link_or_copy(reference, path)
+        elif not unchanged:
+            with open(path, 'wb') as f:
+                f.write(data)
+
+        self._record(path, key, digest, unchanged)
+        self._precompress(path, unchanged, len(data), data)
+        return not unchanged
+
+    def write_file(self, path, tmp_path):
+        '''
+        Moves the (complete) file at `tmp_path` to `path` (inside `root`) unless
+        `path` already has the same content, in which case `tmp_path` is removed.
+        Used by exporters streaming large files to disk instead of building
+        their content in memory.
+
+            Returns:
+                bool: Whether the file was written.
+        '''
+        digest, size = file_digest(tmp_path)
+        key = self._key(path)
+
+        reference = os.path.join(self.reference_root, key)
+
+        unchanged = self._is_unchanged(
+            reference, key, digest, size,
+            lambda: filecmp.cmp(reference, tmp_path, shallow=False))
+        if unchanged:
+            os.remove(tmp_path)
+            if reference != path:
+                _link_or_copy(reference, path)
+        else:
+            os.replace(tmp_path, path)
+
+        self._record(path, key, digest, unchanged)
+        self._precompress(path, unchanged, size)
+        return not unchanged
+
+    # =======================
+    # PRECOMPRESSION
+    # =======================
+
+    def _keep(self, path):
+        '''
+        Keeps the file at `path` written by the previous build if it was not
+        touched since. Returns whether it was kept.
+        '''
+        key = self._key(path)
+        reference = os.path.join(self.reference_root, key)
+        entry = self.previous.get(key)
+        try:
+            stat = os.stat(reference)
+        except OSError:
+            return False
+        if entry is None or entry['size'] != stat.st_size or \
+                entry['mtime'] != stat.st_mtime_ns:
+            return False
+        if reference != path:
+            _link_or_copy(reference, path)
+        self._record(path, key, entry['sha256'], True)
+        return True
+
+    def _compress(self, path, data):
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        self.write(path + '.gz', gzip.compress(data, mtime=0))
+
+    def _remove_compressed(self, path):
+        '''
+        Removes the compressed copy of the file at `path` written by a previous
+        build, so that it is not served instead of the new content.
+        '''
+        compressed = path + '.gz'
+        key = self._key(compressed)
+        with self.lock:
+            self.manifest.pop(key, None)
+        if self.is_staging() or not (self.precompress or key in self.previous):
+            # Staging directories start empty
+            return
+        try:
+            os.remove(compressed)
+        except FileNotFoundError:
+            pass
+
+    def _precompress(self, path, unchanged, size, data=None):
+        '''
+        Writes the compressed copy of the (text) file at `path` in the
+        background unless it is too small or did not change. If no compressed
+        copy is needed the one of the previous build is removed.
+        '''
+        if not self.precompress or size < PRECOMPRESS_MIN_SIZE or \
+                os.path.splitext(path)[1] not in PRECOMPRESS_EXTENSIONS:
+            self._remove_compressed(path)
+            return
+        if unchanged and self._keep(path + '.gz'):
+            return
+        with self.lock:
+            if self.compressor is None:
+                self.compressor = ThreadPoolExecutor(DEFAULT_PRECOMPRESS_WORKERS,
+                                                     'docthing-compressor')
+            self.compressions.append(self.compressor.submit(self._compress, path, data))
+
+    def wait(self):
+        '''
+        Waits for the files being compressed in the background.
+        '''
+        with self.lock:
+            compressor, self.compressor = self.compressor, None
+            compressions, self.compressions = self.compressions, []
+        if compressor is None:
+            return
+        compressor.shutdown()
+        for compression in compressions:
+            compression.result()
+
+    def discard(self):
+        '''
+        Stops writing after a failed export: waits for the files being
+        compressed and removes the staging directory, if any (the output of the
+        previous build is left untouched).
+        '''
+        try:
+            self.wait()
+        finally:
+            if self.is_staging():
+                shutil.rmtree(self.root, ignore_errors=True)
+
+    def save(self):
+        '''
+        Persists the manifest of the files written (or skipped) so far.
+        '''
+        self.wait()
+        os.makedirs(self.root, exist_ok=True)
+        if self.manifest_path is None:
+            return
+        with self.lock:
+            manifest = {'version': _MANIFEST_VERSION, 'files': self.manifest}
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            tmp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            # The manifest is only an optimization
+            pass
+
+    def sync(self):
+        '''
+        Syncs to disk, in a single batch, the files written so far and every
+        directory of `root`.
+        '''
+        with self.lock:
+            paths, self.unsynced = self.unsynced, []
+        for path in paths:
+            _fsync(path)
+        for directory, _, _ in os.walk(self.root):
+            _fsync(directory)
+
+    def temporary_path(self, path):
+        '''
+        Returns the path of a temporary file to stream the content of `path`
+        to before calling `write_file`.
+        '''
+        directory, name = os.path.split(path)
+        return os.path.join(directory, f'.{name}.{os.getpid()}.tmp')
+
+    def summary(self):
+        return f'{self.written} files written, {self.skipped} unchanged'
+
+
+# =======================
+# STAGING
+# =======================
+
+def _sibling(final_dir, kind):
+    parent, name = os.path.split(os.path.normpath(final_dir))
+    return os.path.join(parent, f'.{name}.{kind}-{os.getpid()}')
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # E.g. the process exists but belongs to someone else
+        return True
+    return True
+
+
+def remove_stale_staging(final_dir):
+    '''
+    Removes the staging (and old) directories of `final_dir` left behind by
+    builds that are not running anymore. If `final_dir` is missing because one
+    of them crashed while committing, its old directory is moved back in place.
+    '''
+    parent, name = os.path.split(os.path.normpath(final_dir))
+    prefixes = (f'.{name}.staging-', f'.{name}.old-')
+    try:
+        entries = sorted(os.listdir(parent or os.curdir))
+    except OSError:
+        return
+    for entry in entries:
+        prefix = next((p for p in prefixes if entry.startswith(p)), None)
+        if prefix is None or not entry[len(prefix):].isdigit():
+            continue
+        if _is_running(int(entry[len(prefix):])):
+            continue
+        path = os.path.join(parent, entry)
+        if prefix == prefixes[1] and not os.path.lexists(final_dir):
+            try:
+                os.replace(path, final_dir)
+                continue
+            except OSError:
+                pass
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def create_staging(final_dir):
+    '''
+    Creates (empty) and returns the staging directory for `final_dir`.
+    '''
+    remove_stale_staging(final_dir)
+    staging_dir = _sibling(final_dir, 'staging')
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    return staging_dir
+
+
+# From <linux/fs.h> and <fcntl.h>
+_RENAME_EXCHANGE = 2
+_AT_FDCWD = -100
+
+
+@lru_cache(maxsize=None)
+def _renameat2():
+    '''
+    Returns the `renameat2` function of the C library, or None if it is not
+    available.
+    '''
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p,
+                          ctypes.c_uint]
+    renameat2.restype = ctypes.c_int
+    return renameat2
+
+
+def _exchange(path, other_path):
+    '''
+    Atomically swaps two existing paths.
+
+        Returns:
+            bool: Whether the paths were swapped (False if the platform or the
+                file system does not support it).
+    '''
+    renameat2 = _renameat2()
+    if renameat2 is None:
+        return False
+    if renameat2(_AT_FDCWD, os.fsencode(path), _AT_FDCWD, os.fsencode(other_path),
+                 _RENAME_EXCHANGE) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error, os.strerror(error), path, None, other_path)
+
+
+def commit_staging(staging_dir, final_dir):
+    '''
+    Moves the (already synced) staging directory in place of `final_dir`,
+    atomically where possible.
+    '''
+    if os.path.exists(final_dir) and _exchange(staging_dir, final_dir):
+        # The staging directory holds the old output now
+        _fsync(os.path.dirname(os.path.abspath(final_dir)))
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return
+
+    old_dir = None
+    if os.path.exists(final_dir):
+        old_dir = _sibling(final_dir, 'old')
+        os.replace(final_dir, old_dir)
+    os.replace(staging_dir, final_dir)
+    _fsync(os.path.dirname(os.path.abspath(final_dir)))
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+# =======================
+# ARCHIVES
+# =======================
+
+# Entries get a fixed modification time so that archives are reproducible
+_ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_ARCHIVE_MTIME = 315532800
+
+
+class ArchiveWriter():
+    '''
+    Writes the files of an exporter into a zip or tar.gz archive instead of
+    `root`, storing files with the same content only once in tar archives.
+    Thread-safe.
+    Has the same interface of `OutputWriter`.
+
+        Args:
+            root (str): The output directory of the exporter: the paths of the
+                files written are relative to it in the archive.
+            archive_format (str): One of `OUTPUT_ARCHIVE_FORMATS`.
+    '''
+
+    def __init__(self, root, archive_format):
+        if archive_format not in OUTPUT_ARCHIVE_FORMATS:
+            raise ValueError(f'Unsupported archive format: {archive_format}')
+        self.root = root
+        self.reference_root = root
+        self.format = archive_format
+        self.path = os.path.normpath(root) + '.' + archive_format
+        self.lock = threading.Lock()
+        self.written = 0
+        self.skipped = 0
+        # Name of the first entry with each content (sha256), tar archives only
+        self.names = {}
+
+        directory = os.path.dirname(self.path) or os.curdir
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f'.{os.path.basename(self.path)}.', suffix='.tmp')
+        os.close(fd)
+        if archive_format == 'zip':
+            self.archive = zipfile.ZipFile(self.tmp_path, 'w', zipfile.ZIP_DEFLATED)
+        else:
+            self.archive = tarfile.open(self.tmp_path, 'w:gz')
+
+    def is_staging(self):
+        return False
+
+    def _key(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def _add_link(self, key, target):
+        info = tarfile.TarInfo(key)
+        info.type = tarfile.LNKTYPE
+        info.linkname = target
+        info.mtime = _ARCHIVE_MTIME
+        self.archive.addfile(info)
+
+    def _add(self, key, digest, size, fileobj):
+        '''
+        Adds an entry reading its content from `fileobj` unless the same content
+        was already added to a tar archive, in which case a hard link to it is
+        added instead.
+
+            Returns:
+                bool: Whether the content was added.
+        '''
+        with self.lock:
+            target = self.names.get(digest)
+            if target is not None:
+                self._add_link(key, target)
+                self.skipped += 1
+                count('output.skipped')
+                return False
+
+            if self.format == 'zip':
+                info = zipfile.ZipInfo(key, _ARCHIVE_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = (stat.S_IFREG | 0o644) << 16
+                with self.archive.open(info, 'w') as entry:
+                    shutil.copyfileobj(fileobj, entry, _BLOCK_SIZE)
+            else:
+                self.names[digest] = key
+                info = tarfile.TarInfo(key)
+                info.size = size
+                info.mtime = _ARCHIVE_MTIME
+                self.archive.addfile(info, fileobj)
+            self.written += 1
+        count('output.written')
+        return True
+
+    def write(self, path, data):
+        '''
+        Adds `data` (str or bytes) to the archive as the file at `path` (inside
+        `root`).
+
+            Returns:
+                bool: Whether the content was added (not linked).
+        '''
+        if isinstance(data, str):
+            data = data.encode()
+        return self._add(self._key(path), hashlib.sha256(data).hexdigest(),
+                         len(data), io.BytesIO(data))
+
+    def write_file(self, path, tmp_path):
+        '''
+        Adds the (complete) file at `tmp_path` to the archive as the file at
+        `path` (inside `root`) and removes it.
+        '''
+        digest, size = file_digest(tmp_path)
+        try:
+            with open(tmp_path, 'rb') as f:
+                return self._add(self._key(path), digest, size, f)
+        finally:
+            os.remove(tmp_path)
+
+    def temporary_path(self, path):
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.tmp_path) or os.curdir,
+            prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+        os.close(fd)
+        return tmp_path
+
+    def save(self):
+        '''
+        Completes the archive and moves it in place of the previous one.
+        '''
+        with self.lock:
+            self.archive.close()
+            # Temporary files are private: give the archive the usual mode
+            os.chmod(self.tmp_path, _file_mode())
+            os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        '''
+        Removes the incomplete archive (the previous one is left untouched).
+        '''
+        with self.lock:
+            try:
+                self.archive.close()
+            except Exception:
+                # The archive is being thrown away anyway
+                pass
+            try:
+                os.remove(self.tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def sync(self):
+        pass
+
+    def summary(self):
+        if self.format == 'zip':
+            return f'{self.written} files archived in {self.path}'
+        return f'{self.written} files archived in {self.path}, ' + \
+            f'{self.skipped} duplicates linked'
@@ -0,0 +1,133 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+The default way `docthing` processes a project is phase by phase: the whole
+[`DocumentationBlob`](@DocumentationBlob) is extracted, pruned, interpreted by
+each meta-interpreter and finally exported by each exporter. This means that the
+entire project documentation is kept in memory at once.
+
+The `StreamingPipeline` class provides an alternative driver where leaves flow
+one by one through _extract_ → _interpret_ → _export_ with a bounded number of
+leaves in flight (the _window_):
+
+1. the tree is pruned using only the options found peeking the beginning of each
+   file (see `DocumentationBlob.prune_doc`), so nothing is extracted yet;
+2. each `MetaInterpreter` is `prepare`d with the list of surviving leaves so
+   that tree-wide data (e.g. the navigation neighbours of the `nav.md` plugin)
+   is computed from the structure of the tree alone;
+3. leaves are extracted by a pool of reader threads ahead of time, interpreted
+   in tree order and handed to a writer thread which exports them with all the
+   exporters at once (see `docthing.export_driver`) and releases their content.
+
+Stages overlap: while a leaf is being written the next ones are already being
+read from disk. At most `window` leaves have their content in memory at any time.
+END FILE DOCUMENTATION '''
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import DEFAULT_STREAM_WINDOW
+from .export_driver import ExportDriver
+from .instrumentation import span
+
+
+class StreamingPipeline():
+    '''
+    Streams the leaves of a `DocumentationBlob` through meta-interpreters and
+    exporters keeping at most `window` leaves in memory.
+
+        Args:
+            documentation_blob (DocumentationBlob): The (lazy) blob to process.
+            interpreters (list): The enabled `MetaInterpreter`s.
+            exporters (list): The enabled `Exporter`s.
+            output_dir (str): The output directory passed to each exporter.
+            window (int): The maximum number of leaves in flight.
+            readers (int, optional): The number of reader threads. Defaults to
+                `window`.
+    '''
+
+    def __init__(self, documentation_blob, interpreters, exporters, output_dir,
+                 window=DEFAULT_STREAM_WINDOW, readers=None):
+        if window < 1:
+            raise ValueError('window must be a positive integer')
+
+        self.documentation_blob = documentation_blob
+        self.interpreters = interpreters
+        self.exporters = exporters
+        self.output_dir = output_dir
+        self.window = window
+        self.readers = readers if readers is not None else window
+
+    def plan(self):
+        '''
+        Prunes the blob without extracting it and returns the ordered list of the
+        leaves that will be streamed.
+        '''
+        self.documentation_blob.prune_doc(peek_only=True)
+        leaves = self.documentation_blob.get_leaves()
+        for interpreter in self.interpreters:
+            interpreter.prepare(leaves)
+        return leaves
+
+    def _extract(self, leaf):
+        leaf.unlazy()
+        return leaf
+
+    def _interpret(self, leaf):
+        for interpreter in self.interpreters:
+            with span('interpret_leaf.' + interpreter.get_name(),
+                      leaf=leaf.get_title()):
+                interpreter.interpret_leaf(leaf)
+
+    def _export(self, leaf, driver, pool):
+        driver.export_leaf(leaf, pool)
+        leaf.release_content()
+
+    def run(self):
+        '''
+        Runs the pipeline over the whole blob.
+        '''
+        leaves = self.plan()
+        driver = ExportDriver(self.exporters, self.output_dir)
+        driver.prepare(leaves)
+        try:
+            self._stream(iter(leaves), driver)
+        except BaseException:
+            driver.abort()
+            raise
+        driver.finish()
+
+    def _stream(self, leaves, driver):
+        '''
+        Streams the leaves through extraction, interpretation and export.
+        '''
+        reads = deque()
+        writes = deque()
+        exhausted = False
+
+        with ThreadPoolExecutor(self.readers, 'docthing-reader') as reader_pool, \
+                ThreadPoolExecutor(1, 'docthing-writer') as writer_pool, \
+                ThreadPoolExecutor(driver.workers, 'docthing-exporter') as exporter_pool:
+            while True:
+                # Retire the leaves that were already written
+                while writes and writes[0].done():
+                    writes.popleft().result()
+
+                # Keep the window full reading ahead
+                while not exhausted and len(reads) + len(writes) < self.window:
+                    leaf = next(leaves, None)
+                    if leaf is None:
+                        exhausted = True
+                        break
+                    reads.append(reader_pool.submit(self._extract, leaf))
+
+                if not reads:
+                    if not writes:
+                        break
+                    # The window is full of leaves waiting to be written
+                    writes.popleft().result()
+                    continue
+
+                leaf = reads.popleft().result()
+                self._interpret(leaf)
+                writes.append(writer_pool.submit(self._export, leaf, driver,
+                                                 exporter_pool))
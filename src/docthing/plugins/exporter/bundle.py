@@ -0,0 +1,252 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 2)
+The `bundle` exporter writes the whole documentation into a single Markdown
+file (`handbook.md`) instead of one file per leaf, or into one file per chapter
+(i.e. per child of the root of the index file) with `split=chapter`:
+
+```conf
+[output]
+type=markdown,bundle
+
+[type|bundle]
+split=chapter
+file=handbook
+```
+
+Leaves are appended to the bundle as they are exported, in tree order, so the
+bundle is never held in memory: it is streamed to a temporary file which takes
+the place of the previous one only if its content changed (see
+`OutputWriter.write_file`). Each section of the index file becomes a heading and
+the headings of each leaf are shifted to nest below it.
+
+Links to other leaves (the ones added by the `nav.md` meta-interpreter) are
+rewritten as links to the anchor preceding the linked leaf in the bundle. Other
+resources (e.g. images) are still written as separate files, next to where the
+`markdown` exporter would write them.
+END FILE DOCUMENTATION '''
+
+import os
+import re
+from urllib.parse import quote
+
+from schema import And, Optional, Or, Schema
+
+from ...documentation_content import ResourceReference
+from ..exporter_interface import Exporter
+from ..meta_interpreter.nav import MarkdownNAVReference
+from .markdown import MarkdownExporter
+
+_HEADING_RE = re.compile(r'^(#{1,6})(?=[ \t]|$)')
+_FENCE_RE = re.compile(r'^[ \t]*(```|~~~)')
+
+
+def anchor(components):
+    '''
+    Returns the id of the anchor of the node with the given path (the list of
+    the titles from the root of the documentation to the node).
+    '''
+    return re.sub(r'[^0-9a-z]+', '-', '/'.join(components).lower()).strip('-')
+
+
+def shift_headings(lines, shift):
+    '''
+    Yields the given lines adding `shift` levels to each Markdown heading (up to
+    the sixth level). Fenced code blocks are left untouched.
+    '''
+    fence = None
+    for line in lines:
+        match = _FENCE_RE.match(line)
+        if match is not None:
+            if fence is None:
+                fence = match.group(1)
+            elif fence == match.group(1):
+                fence = None
+        elif fence is None and shift > 0:
+            match = _HEADING_RE.match(line)
+            if match is not None:
+                level = min(len(match.group(1)) + shift, 6)
+                line = '#' * level + line[match.end():]
+        yield line
+
+
+class _Bundle():
+    '''
+    A bundle being written: the temporary file and the sections already
+    written to it.
+    '''
+
+    def __init__(self, path, output_writer):
+        self.path = path
+        if output_writer is not None:
+            self.tmp_path = output_writer.temporary_path(path)
+        else:
+            self.tmp_path = os.path.join(os.path.dirname(path),
+                                         f'.{os.path.basename(path)}.{os.getpid()}.tmp')
+        self.file = open(self.tmp_path, 'w')
+        self.sections = set()
+
+
+class BundleExporter(MarkdownExporter):
+    '''
+    An exporter that exports documentation to a single Markdown file (or to
+    one file per chapter).
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.split = 'none'
+        self.file_name = 'handbook'
+        self.plugin_out_dir = None
+        self.bundles = {}
+
+    def get_name(self):
+        return 'bundle'
+
+    def get_description(self):
+        return 'Export documentation to a single Markdown file (or one per chapter).'
+
+    def schema(self):
+        return Schema({
+            Optional('split'): Or('none', 'chapter'),
+            Optional('file'): And(str, len),
+        })
+
+    def _configure(self, config):
+        self.split = config.get('split', 'none')
+        self.file_name = config.get('file', 'handbook')
+
+    def is_thread_safe(self):
+        # Leaves are appended to the bundle in tree order
+        return False
+
+    # =======================
+    # BUNDLES
+    # =======================
+
+    def _split(self, components):
+        '''
+        Returns the name of the bundle containing the node with the given path
+        and the level of the headings of the root of that bundle.
+        '''
+        if self.split == 'chapter' and len(components) > 1:
+            return components[1], 0
+        return self.file_name, 1
+
+    def _get_bundle(self, components):
+        name, root_level = self._split(components)
+        bundle = self.bundles.get(name)
+        if bundle is None:
+            bundle = _Bundle(os.path.join(self.plugin_out_dir, name + '.md'),
+                             self.output_writer)
+            self.bundles[name] = bundle
+            if root_level > 0:
+                bundle.file.write(f'<a id="{anchor(components[:1])}"></a>\n\n' +
+                                  f'# {components[0]}\n\n')
+        return bundle, root_level
+
+    def _href(self, components, target):
+        '''
+        Returns the link to the anchor of `target` from the bundle containing
+        the node at `components`.
+        '''
+        name, _ = self._split(target)
+        fragment = '#' + anchor(target)
+        if name == self._split(components)[0]:
+            return fragment
+        return quote(name + '.md') + fragment
+
+    # =======================
+    # EXPORT
+    # =======================
+
+    def prepare_export(self, output_dir):
+        self.plugin_out_dir = super().prepare_export(output_dir)
+        self._make_directory(self.plugin_out_dir)
+        self.bundles = {}
+        return self.plugin_out_dir
+
+    def prepare_directories(self, leaves, plugin_out_dir, relative_paths=None):
+        # Directories are created only for the leaves having resources
+        pass
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        if relative_path is None:
+            relative_path = Exporter.get_leaf_relative_path(leaf)
+        leaf_complete_path = os.path.join(plugin_out_dir, relative_path)
+        if any(isinstance(line, ResourceReference) and
+               not isinstance(line, MarkdownNAVReference)
+               for line in leaf.get_content()):
+            self._make_directory(os.path.dirname(leaf_complete_path))
+            self._export_leaf_resources(leaf, leaf_complete_path)
+
+        def import_function(leaf_title, resource):
+            return self._bundle_import(relative_path, leaf_title, resource)
+
+        self._export_leaf(leaf.with_resources_replaced(import_function),
+                          leaf_complete_path)
+
+    def _export_leaf(self, leaf, output_file_no_ext):
+        '''
+        Appends a single leaf node to its bundle.
+        '''
+        components = os.path.relpath(output_file_no_ext, self.plugin_out_dir).split(os.sep)
+        bundle, root_level = self._get_bundle(components)
+
+        # Headings of the sections containing the leaf not written yet
+        for i in range(1, len(components) - 1):
+            section = tuple(components[:i + 1])
+            if section not in bundle.sections:
+                bundle.sections.add(section)
+                bundle.file.write(f'<a id="{anchor(section)}"></a>\n\n' +
+                                  '#' * min(i + root_level, 6) + f' {components[i]}\n\n')
+
+        content = leaf.get_content()
+        lines = [] if content is None else \
+            content.get_printable().splitlines(keepends=True)
+        # If the page does not start with a title insert it
+        first_line = next((line for line in lines if line.strip() != ''), None)
+        if first_line is not None and not first_line.startswith('# '):
+            lines = ['# ' + leaf.get_title() + '\n', '\n'] + lines
+
+        bundle.file.write(f'<a id="{anchor(components)}"></a>\n\n')
+        for line in shift_headings(lines, len(components) - 2 + root_level):
+            bundle.file.write(line)
+        if lines and not lines[-1].endswith('\n'):
+            bundle.file.write('\n')
+        bundle.file.write('\n')
+
+    def abort_export(self):
+        for bundle in self.bundles.values():
+            bundle.file.close()
+            os.remove(bundle.tmp_path)
+        self.bundles = {}
+        super().abort_export()
+
+    def finish_export(self):
+        for bundle in self.bundles.values():
+            bundle.file.close()
+            if self.output_writer is not None:
+                self.output_writer.write_file(bundle.path, bundle.tmp_path)
+            else:
+                os.replace(bundle.tmp_path, bundle.path)
+        self.bundles = {}
+        super().finish_export()
+
+    # =======================
+    # IMPORTS
+    # =======================
+
+    def _bundle_import(self, relative_path, leaf_title, resource):
+        if isinstance(resource, MarkdownNAVReference):
+            target = os.path.normpath(os.path.join(
+                os.path.dirname(relative_path), resource.get_path()[:-len('.md')]))
+            label = os.path.basename(target)
+            href = self._href(relative_path.split(os.sep), target.split(os.sep))
+            return f'<a href="{href}">{label}</a>\n'
+        if isinstance(resource, ResourceReference) and \
+                resource.get_type() in ['image', 'file', 'link']:
+            # Resources are next to where the leaf would be without bundling
+            link = f'[{leaf_title}](' + \
+                quote((relative_path + resource.get_path()).replace(os.sep, '/')) + ')\n'
+            return '!' + link if resource.get_type() == 'image' else link
+        return super().import_function(leaf_title, resource)
@@ -0,0 +1,261 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 2)
+The `jsonl` exporter writes the (interpreted) documentation as
+[JSON Lines](https://jsonlines.org) (`documentation.jsonl`) for tools that
+post-process it without parsing Markdown. The first line is a header, followed
+by one record for each node of the tree, in preorder:
+
+```json
+{"format":"docthing","version":1,"parser":{"doc_level":1,...}}
+{"path":["Project"],"title":"Project","options":{"level":0,...},"leaf":false}
+{"path":["Project","Modules","mod0"],"title":"mod0","options":{...},"leaf":true,
+ "content":["text\\n",{"type":"image","ext":"png","hash":"...","data":"...","encoding":"base64"}]}
+```
+
+- `path` lists the titles of the nodes from the root to the node;
+- `content` (only for leaves) lists the lines of the leaf and its resources: each
+  resource has a type, an extension and a hash; the first time a hash appears the
+  compiled resource (`data`, base64 encoded if it is binary) is included too.
+  Resources without a hash (`null`) always include their data.
+
+Only the sections containing at least one exported leaf have a record. Records
+are written as leaves are exported, so memory use does not grow with the size
+of the documentation.
+
+`read_blob` rebuilds a [`DocumentationBlob`](@DocumentationBlob) from such a
+file, without reading the documented project, so that it can be exported again
+(e.g. to another format); `read_records` yields the records one at a time.
+END FILE DOCUMENTATION '''
+
+import base64
+import json
+import os
+
+from ...documentation_blob import DocumentationBlob, DocumentationNode
+from ...documentation_content import Document, ResourceReference
+from ..exporter_interface import Exporter
+from ..meta_interpreter.nav import MarkdownNAVReference
+
+JSONL_FILE = 'documentation.jsonl'
+
+_FORMAT = 'docthing'
+_FORMAT_VERSION = 1
+
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class StoredResourceReference(ResourceReference):
+    '''
+    A resource read back from the output of the `jsonl` exporter: it is
+    "compiled" to the data stored in it.
+
+        Args:
+            type (str): The type of the resource.
+            ext (str): The extension of the resource.
+            hash (str): The hash of the resource (None if it had none).
+            data (str or bytes): The compiled resource.
+    '''
+
+    def __init__(self, type, ext, hash, data):
+        super().__init__(None, type, use_hash=hash if hash is not None else False)
+        self.ext = ext
+        self.data = data
+
+    def get_ext(self):
+        return self.ext
+
+    def compile(self):
+        return self.data
+
+
+class JSONLinesExporter(Exporter):
+    '''
+    An exporter that exports documentation as JSON Lines.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.plugin_out_dir = None
+        self.file = None
+        self.tmp_path = None
+        self.header_written = False
+        self.written_nodes = set()
+        self.written_hashes = set()
+
+    def _enable(self):
+        pass
+
+    def _disable(self):
+        pass
+
+    def get_name(self):
+        return 'jsonl'
+
+    def get_description(self):
+        return 'Export documentation as JSON Lines.'
+
+    def get_dependencies(self):
+        return []
+
+    def is_thread_safe(self):
+        # Records are written in preorder
+        return False
+
+    def prepare_export(self, output_dir):
+        self.plugin_out_dir = super().prepare_export(output_dir)
+        self._make_directory(self.plugin_out_dir)
+        self.tmp_path = self.output_writer.temporary_path(
+            os.path.join(self.plugin_out_dir, JSONL_FILE))
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+        self.header_written = False
+        self.written_nodes = set()
+        self.written_hashes = set()
+        return self.plugin_out_dir
+
+    def prepare_directories(self, leaves, plugin_out_dir, relative_paths=None):
+        # Nothing is written outside of the JSON Lines file
+        pass
+
+    def _write_header(self, parser_config):
+        if not self.header_written:
+            self.file.write(_dumps({'format': _FORMAT, 'version': _FORMAT_VERSION,
+                                    'parser': parser_config}) + '\n')
+            self.header_written = True
+
+    def _resource_record(self, resource):
+        record = {'type': resource.get_type(), 'ext': resource.get_ext(),
+                  'hash': resource.get_hash(), 'class': type(resource).__name__}
+        # Resources without a hash cannot be told apart: their data is always written
+        key = (record['hash'], record['ext'])
+        if record['hash'] is not None:
+            if key in self.written_hashes:
+                return record
+            self.written_hashes.add(key)
+        data = resource.get_compiled()
+        if isinstance(data, bytes):
+            record['data'] = base64.b64encode(data).decode('ascii')
+            record['encoding'] = 'base64'
+        else:
+            record['data'] = data
+        return record
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        self._export_leaf(leaf, None)
+
+    def _export_leaf(self, leaf, output_file_no_ext):
+        '''
+        Writes the record of a single leaf node (preceded by the ones of the
+        sections containing it, if not written yet).
+        '''
+        self._write_header(leaf.parser_config)
+        path = leaf.get_path()
+        titles = [node.get_title() for node in path]
+        for i, node in enumerate(path[:-1]):
+            if node not in self.written_nodes:
+                self.written_nodes.add(node)
+                self.file.write(_dumps({'path': titles[:i + 1], 'title': node.get_title(),
+                                        'options': node.get_options(), 'leaf': False}) + '\n')
+
+        content = leaf.get_content()
+        self.file.write(_dumps({
+            'path': titles, 'title': leaf.get_title(), 'options': leaf.get_options(),
+            'leaf': True,
+            'content': [self._resource_record(line) if isinstance(line, ResourceReference)
+                        else line for line in (content if content is not None else [])],
+        }) + '\n')
+
+    def import_function(self, leaf_title, resource):
+        return str(resource)
+
+    def abort_export(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            os.remove(self.tmp_path)
+        super().abort_export()
+
+    def finish_export(self):
+        self._write_header({})
+        self.file.close()
+        self.file = None
+        self.output_writer.write_file(
+            os.path.join(self.plugin_out_dir, JSONL_FILE), self.tmp_path)
+        super().finish_export()
+
+
+# =======================
+# READER
+# =======================
+
+def read_records(path):
+    '''
+    Yields the records (dicts) of the JSON Lines file at `path` written by the
+    `jsonl` exporter, one at a time, header first.
+
+        Raises:
+            ValueError: If the file was not written by the `jsonl` exporter.
+    '''
+    with open(path, encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            record = json.loads(line)
+            if lineno == 1 and (record.get('format') != _FORMAT or
+                                record.get('version') != _FORMAT_VERSION):
+                raise ValueError(f'{path}: not a docthing JSON Lines file ' +
+                                 f'(version {_FORMAT_VERSION})')
+            yield record
+
+
+def _read_resource(record, resources):
+    key = (record['hash'], record['ext'])
+    data = None
+    if 'data' in record:
+        data = record['data']
+        if record.get('encoding') == 'base64':
+            data = base64.b64decode(data)
+        if record['hash'] is not None:
+            resources[key] = data
+    elif record['hash'] is not None:
+        data = resources.get(key)
+    if record.get('class') == MarkdownNAVReference.__name__:
+        return MarkdownNAVReference(record['hash'])
+    return StoredResourceReference(record['type'], record['ext'], record['hash'], data)
+
+
+def read_blob(path):
+    '''
+    Rebuilds the documentation blob from the JSON Lines file at `path` written
+    by the `jsonl` exporter (the documented project is not read).
+
+        Raises:
+            ValueError: If the file was not written by the `jsonl` exporter or
+                its records are not in preorder.
+    '''
+    records = read_records(path)
+    parser_config = next(records)['parser']
+    nodes = {}
+    # Compiled resources by (hash, extension)
+    resources = {}
+
+    for record in records:
+        path_key = tuple(record['path'])
+        parent = nodes.get(path_key[:-1])
+        if parent is None and len(path_key) > 1:
+            raise ValueError(f'{path}: the section of {"/".join(path_key)} was not found')
+
+        if record['leaf']:
+            content = Document([_read_resource(line, resources) if isinstance(line, dict)
+                                else line for line in record['content']])
+            node = DocumentationNode(parent, record['title'], content, None, parser_config)
+        else:
+            node = DocumentationNode(parent, record['title'], None, [])
+        node.options = record['options']
+        nodes[path_key] = node
+        if parent is not None:
+            parent.add_child(node)
+
+    roots = [node for key, node in nodes.items() if len(key) == 1]
+    if len(roots) != 1:
+        raise ValueError(f'{path}: expected one root, found {len(roots)}')
+    return DocumentationBlob.from_root(roots[0], parser_config)
@@ -27,6 +27,9 @@ class MarkdownExporter(Exporter):
     def get_dependencies(self):
         return []
 
+    def is_thread_safe(self):
+        return True
+
     def _export_leaf(self, leaf, output_dir):
         '''
         Exports a single leaf node to markdown format.
@@ -46,8 +49,7 @@ class MarkdownExporter(Exporter):
                         '\n\n' + output
                 break
 
-        with open(output_dir + '.md', 'w+') as f:
-            f.write(output)
+        self.write_output(output_dir + '.md', output)
 
     def _link_import(self, leaf_title, resource_path):
         return f'[{leaf_title}](' +\
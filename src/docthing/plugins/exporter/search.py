@@ -0,0 +1,204 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 2)
+The `search` exporter writes a search index of the documentation
+(`search-index.json`) that a client-side script can load to search the
+generated pages without reading them.
+
+The index is built while the documentation is exported (it is usually enabled
+together with another exporter, e.g. `type=markdown,search`): the text of each
+leaf is tokenized once, from memory, and added to an _inverted index_ mapping
+each term to the leaves containing it. It has the following (compact) format:
+
+```json
+{
+    "version": 1,
+    "docs": [["Project/Modules/mod0", "mod0"], ...],
+    "terms": {"module": [0, 1, 3, 2], ...}
+}
+```
+
+- `docs` lists the leaves, in tree order, as pairs of path (relative to the
+  output directory of an exporter, without extension) and title;
+- `terms` maps each (lowercase) term to its _postings_: a flat list of pairs
+  of numbers, the first one is the index of a leaf in `docs` (as the difference
+  with the previous one, to keep numbers small) and the second one is the score
+  of the term in that leaf: the number of times it appears in the text plus
+  `TITLE_WEIGHT` times the number of times it appears in the title.
+
+HTML tags and the targets of Markdown links are not indexed.
+END FILE DOCUMENTATION '''
+
+import json
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+
+from ...documentation_content import ResourceReference
+from ..exporter_interface import Exporter
+
+INDEX_FILE = 'search-index.json'
+TITLE_WEIGHT = 10
+
+_INDEX_VERSION = 1
+_TOKEN_RE = re.compile(r'\w\w+')
+# Text that is not indexed: HTML tags and targets of Markdown links and images
+_MARKUP_RE = re.compile(r'<[^>]*>|\]\([^)]*\)')
+
+
+def tokenize(text):
+    '''
+    Returns the (lowercase) terms of `text`, ignoring markup.
+    '''
+    return _TOKEN_RE.findall(_MARKUP_RE.sub(' ', text).lower())
+
+
+class SearchIndex():
+    '''
+    An inverted index of documents. Thread-safe.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.docs = []
+        # Term -> array of (document id, score) pairs
+        self.postings = {}
+        # Terms whose postings are not sorted by document id
+        self.unsorted = set()
+
+    def add_document(self, path, title):
+        '''
+        Adds a document (with no terms yet) and returns its id.
+        '''
+        with self.lock:
+            self.docs.append([path, title])
+            return len(self.docs) - 1
+
+    def index(self, doc_id, title, lines):
+        '''
+        Indexes the title and the lines (strings) of the document `doc_id`.
+        '''
+        scores = Counter()
+        for line in lines:
+            scores.update(tokenize(line))
+        for term in tokenize(title):
+            scores[term] += TITLE_WEIGHT
+
+        with self.lock:
+            for term, score in scores.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = array('L')
+                elif postings[-2] > doc_id:
+                    self.unsorted.add(term)
+                postings.append(doc_id)
+                postings.append(score)
+
+    def _encoded_postings(self, term):
+        '''
+        Returns the postings of a term as a JSON array.
+        '''
+        postings = self.postings[term]
+        doc_ids = postings[::2]
+        scores = postings[1::2]
+        if term in self.unsorted:
+            # Documents can be indexed in any order: sort them by id
+            doc_ids, scores = zip(*sorted(zip(doc_ids, scores)))
+        encoded = [None] * len(postings)
+        encoded[::2] = [b - a for a, b in zip((0, *doc_ids), doc_ids)]
+        encoded[1::2] = scores
+        return '[' + ','.join(map(str, encoded)) + ']'
+
+    def write(self, f):
+        '''
+        Writes the index (as compact JSON) to the text file `f`, one term at a
+        time.
+        '''
+        with self.lock:
+            f.write('{"version":%d,"docs":' % _INDEX_VERSION)
+            f.write(json.dumps(self.docs, ensure_ascii=False, separators=(',', ':')))
+            f.write(',"terms":{')
+            for i, term in enumerate(sorted(self.postings)):
+                f.write((',' if i > 0 else '') + json.dumps(term, ensure_ascii=False) +
+                        ':' + self._encoded_postings(term))
+            f.write('}}')
+
+
+class SearchIndexExporter(Exporter):
+    '''
+    An exporter that exports a search index of the documentation.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.plugin_out_dir = None
+        self.search_index = None
+        self.doc_ids = {}
+
+    def _enable(self):
+        pass
+
+    def _disable(self):
+        pass
+
+    def get_name(self):
+        return 'search'
+
+    def get_description(self):
+        return 'Export a search index of the documentation.'
+
+    def get_dependencies(self):
+        return []
+
+    def is_thread_safe(self):
+        return True
+
+    def prepare_export(self, output_dir):
+        self.plugin_out_dir = super().prepare_export(output_dir)
+        self._make_directory(self.plugin_out_dir)
+        self.search_index = SearchIndex()
+        self.doc_ids = {}
+        return self.plugin_out_dir
+
+    def prepare_directories(self, leaves, plugin_out_dir, relative_paths=None):
+        # Nothing is written for each leaf, but leaves are numbered in tree
+        #   order here since they can be exported in any order
+        if relative_paths is None:
+            relative_paths = [Exporter.get_leaf_relative_path(leaf) for leaf in leaves]
+        for leaf, relative_path in zip(leaves, relative_paths):
+            self.doc_ids[relative_path] = self.search_index.add_document(
+                relative_path.replace(os.sep, '/'), leaf.get_title())
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        if relative_path is None:
+            relative_path = Exporter.get_leaf_relative_path(leaf)
+        # Resources are not indexed: nothing to write for them
+        self._export_leaf(leaf, os.path.join(plugin_out_dir, relative_path))
+
+    def _export_leaf(self, leaf, output_file_no_ext):
+        '''
+        Adds a single leaf node to the search index.
+        '''
+        relative_path = os.path.relpath(output_file_no_ext, self.plugin_out_dir)
+        doc_id = self.doc_ids.get(relative_path)
+        if doc_id is None:
+            doc_id = self.search_index.add_document(
+                relative_path.replace(os.sep, '/'), leaf.get_title())
+
+        content = leaf.get_content()
+        lines = [] if content is None else \
+            [line for line in content if not isinstance(line, ResourceReference)]
+        self.search_index.index(doc_id, leaf.get_title(), lines)
+
+    def import_function(self, leaf_title, resource):
+        return ''
+
+    def finish_export(self):
+        path = os.path.join(self.plugin_out_dir, INDEX_FILE)
+        tmp_path = self.output_writer.temporary_path(path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            self.search_index.write(f)
+        self.output_writer.write_file(path, tmp_path)
+        self.search_index = None
+        super().finish_export()
@@ -0,0 +1,276 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 2)
+The `sqlite` exporter writes the documentation into a single SQLite database
+(`documentation.db`) so that tools can look single pieces of documentation up
+(by path, level, ...) without parsing a whole output directory:
+
+```sql
+CREATE TABLE nodes (
+    id INTEGER PRIMARY KEY,     -- in tree order
+    parent_id INTEGER,          -- NULL for the root
+    title TEXT,
+    path TEXT,                  -- e.g. 'Project/Modules/mod0'
+    depth INTEGER,              -- 0 for the root
+    level INTEGER,              -- documentation level (see the `level` option)
+    options TEXT,               -- all the options, as JSON
+    is_leaf INTEGER
+);
+CREATE TABLE content (node_id INTEGER PRIMARY KEY, text TEXT);
+CREATE TABLE resources (hash TEXT PRIMARY KEY, type TEXT, ext TEXT, data BLOB);
+CREATE TABLE node_resources (node_id INTEGER, position INTEGER, hash TEXT);
+```
+
+Only the sections containing at least one exported leaf are in `nodes`. The
+`text` of a leaf refers to its resources with the `@ref(<type>)-->[<path>]`
+syntax (see [`ResourceReference`](@ResourceReference)); each resource producing
+some data is stored once in `resources`, compiled, and `node_resources` lists
+the resources of each leaf in order (resources are identified by the hash of
+their source or, if they have none, by `<node_id>:<position>`).
+
+Rows are inserted in batches, all in a single transaction, into a temporary
+database which takes the place of the previous one once the export is complete.
+A full-text search index of the content (the `content_fts` FTS5 table) can be
+added too:
+
+```conf
+[type|sqlite]
+fts=true
+file=documentation.db
+```
+END FILE DOCUMENTATION '''
+
+import json
+import os
+import sqlite3
+
+from schema import And, Optional, Schema
+
+from ... import log
+from ...documentation_content import ResourceReference
+from ..exporter_interface import Exporter
+
+DATABASE_FILE = 'documentation.db'
+
+# Rows inserted at once in each table
+_BATCH_SIZE = 1000
+
+_SCHEMA = '''
+CREATE TABLE nodes (
+    id INTEGER PRIMARY KEY,
+    parent_id INTEGER REFERENCES nodes(id),
+    title TEXT NOT NULL,
+    path TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    is_leaf INTEGER NOT NULL
+);
+CREATE TABLE content (
+    node_id INTEGER PRIMARY KEY REFERENCES nodes(id),
+    text TEXT NOT NULL
+);
+CREATE TABLE resources (
+    hash TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE node_resources (
+    node_id INTEGER NOT NULL REFERENCES nodes(id),
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL REFERENCES resources(hash)
+);
+'''
+
+# Created after the rows are inserted (it is faster than updating them)
+_INDEXES = '''
+CREATE INDEX nodes_parent_id ON nodes(parent_id);
+CREATE INDEX nodes_path ON nodes(path);
+CREATE INDEX nodes_level ON nodes(level);
+CREATE INDEX node_resources_node_id ON node_resources(node_id);
+'''
+
+_FTS = '''
+CREATE VIRTUAL TABLE content_fts USING fts5(title, text);
+INSERT INTO content_fts(rowid, title, text)
+    SELECT node_id, title, text FROM content JOIN nodes ON nodes.id = node_id;
+'''
+
+_INSERTS = {
+    'nodes': 'INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+    'content': 'INSERT INTO content VALUES (?, ?)',
+    'resources': 'INSERT OR IGNORE INTO resources VALUES (?, ?, ?, ?)',
+    'node_resources': 'INSERT INTO node_resources VALUES (?, ?, ?)',
+}
+
+
+class SQLiteExporter(Exporter):
+    '''
+    An exporter that exports documentation to a SQLite database.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.fts = False
+        self.file_name = DATABASE_FILE
+        self.plugin_out_dir = None
+        self.connection = None
+        self.tmp_path = None
+        self.node_ids = {}
+        self.rows = {}
+
+    def _enable(self):
+        pass
+
+    def _disable(self):
+        pass
+
+    def get_name(self):
+        return 'sqlite'
+
+    def get_description(self):
+        return 'Export documentation to a SQLite database.'
+
+    def get_dependencies(self):
+        return []
+
+    def schema(self):
+        return Schema({
+            Optional('fts'): bool,
+            Optional('file'): And(str, len),
+        })
+
+    def _configure(self, config):
+        self.fts = config.get('fts', False)
+        self.file_name = config.get('file', DATABASE_FILE)
+
+    def is_thread_safe(self):
+        # Rows are inserted through a single connection
+        return False
+
+    # =======================
+    # ROWS
+    # =======================
+
+    def _insert(self, table, row):
+        '''
+        Queues a row to be inserted into `table`, inserting the queued rows
+        when there are enough of them.
+        '''
+        rows = self.rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= _BATCH_SIZE:
+            self._flush(table)
+
+    def _execute_script(self, script):
+        # Unlike `executescript` this does not commit the transaction
+        for statement in script.split(';'):
+            if statement.strip():
+                self.connection.execute(statement)
+
+    def _flush(self, table):
+        rows = self.rows.pop(table, [])
+        if rows:
+            self.connection.executemany(_INSERTS[table], rows)
+
+    def _node_id(self, path):
+        '''
+        Returns the id of the last node of `path` (the list of the nodes from
+        the root), inserting it and its ancestors if needed.
+        '''
+        node = path[-1]
+        node_id = self.node_ids.get(node)
+        if node_id is not None:
+            return node_id
+
+        parent_id = self._node_id(path[:-1]) if len(path) > 1 else None
+        node_id = len(self.node_ids) + 1
+        self.node_ids[node] = node_id
+        options = node.get_options()
+        self._insert('nodes', (
+            node_id, parent_id, node.get_title(),
+            '/'.join(n.get_title() for n in path), len(path) - 1,
+            options.get('level', 0), json.dumps(options), int(node.is_leaf())))
+        return node_id
+
+    # =======================
+    # EXPORT
+    # =======================
+
+    def prepare_export(self, output_dir):
+        self.plugin_out_dir = super().prepare_export(output_dir)
+        self._make_directory(self.plugin_out_dir)
+        path = os.path.join(self.plugin_out_dir, self.file_name)
+        self.tmp_path = self.output_writer.temporary_path(path)
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+        self.connection = sqlite3.connect(self.tmp_path, isolation_level=None,
+                                          check_same_thread=False)
+        # The database is written from scratch: no need for a journal
+        self.connection.execute('PRAGMA journal_mode = OFF')
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.execute('BEGIN')
+        self._execute_script(_SCHEMA)
+        self.node_ids = {}
+        self.rows = {}
+        return self.plugin_out_dir
+
+    def prepare_directories(self, leaves, plugin_out_dir, relative_paths=None):
+        # Nothing is written outside of the database
+        pass
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        self._export_leaf(leaf, None)
+
+    def _export_leaf(self, leaf, output_file_no_ext):
+        '''
+        Inserts a single leaf node (and the sections containing it) into the
+        database.
+        '''
+        node_id = self._node_id(leaf.get_path())
+        content = leaf.get_content()
+        text = []
+        position = 0
+        for line in content if content is not None else []:
+            if isinstance(line, ResourceReference):
+                data = line.get_compiled()
+                if data is not None:
+                    if isinstance(data, str):
+                        data = data.encode()
+                    # Resources without a hash cannot be told apart
+                    key = line.get_hash() or f'{node_id}:{position}'
+                    self._insert('resources', (key, line.get_type(), line.get_ext(), data))
+                    self._insert('node_resources', (node_id, position, key))
+                    position += 1
+            text.append(str(line))
+        self._insert('content', (node_id, ''.join(text)))
+
+    def import_function(self, leaf_title, resource):
+        return str(resource)
+
+    def abort_export(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+            os.remove(self.tmp_path)
+        self.rows = {}
+        super().abort_export()
+
+    def finish_export(self):
+        for table in _INSERTS:
+            self._flush(table)
+        self._execute_script(_INDEXES)
+        if self.fts:
+            try:
+                self._execute_script(_FTS)
+            except sqlite3.OperationalError as e:
+                log.warning(f'{self.get_name()}: full-text search index not created: {e}')
+        self.connection.execute('COMMIT')
+        self.connection.close()
+        self.connection = None
+        self.node_ids = {}
+
+        self.output_writer.write_file(
+            os.path.join(self.plugin_out_dir, self.file_name), self.tmp_path)
+        super().finish_export()
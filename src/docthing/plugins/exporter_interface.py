@@ -30,12 +30,32 @@ should be able to define how to import a resource in any format.
 The common syntax will always look like `@ref(type)-->[path]` as you
 can see in the implementation of the method `__str__` in the
 `ResourceReference` class.
+
+## Running exporters side by side
+
+When more than one exporter is enabled the leaves are exported by all of them
+in a single walk of the tree (see `docthing.export_driver`), on a pool of
+threads. An exporter whose `export_leaf` can be called from several threads at
+once should say so overriding `is_thread_safe` (the builtin `markdown` exporter
+does); the others are never run concurrently with themselves.
+
+## Writing files
+
+Exporters should write their files with `write_output` instead of opening
+them directly: files whose content did not change since the previous build
+are left untouched and, when the output is an archive, files are written into
+it instead (see `docthing.output`). Exporters streaming a large file should
+write it to `output_writer.temporary_path(path)` and then hand it to
+`output_writer.write_file`.
 END FILE DOCUMENTATION '''
 
 from abc import abstractmethod
 import os
 
+from .. import log
 from ..documentation_content import ResourceReference
+from ..instrumentation import span
+from ..output import ArchiveWriter, OutputWriter, create_staging, commit_staging
 from .plugin_interface import PluginInterface
 from ..util import mkdir_silent
 
@@ -45,29 +65,163 @@ class Exporter(PluginInterface):
     Exporter is an abstract class that defines the interface for exporters.
     '''
 
+    # Whether to write the output into a staging directory moved in place of
+    #   the output directory only once the export is complete (see
+    #   `docthing.output`)
+    atomic = False
+    # If set (one of `OUTPUT_ARCHIVE_FORMATS`) the output is written
+    #   into an archive instead of a directory
+    archive = None
+    # Whether to write a compressed (`.gz`) copy of each text file too
+    precompress = False
+
+    # Set by `prepare_export`
+    output_writer = None
+    created_dirs = None
+
     def export(self, documentation_blob, output_dir):
         '''
         Exports the documentation blob to the specified format.
         '''
 
         if documentation_blob.is_lazy():
-            print(
-                'Warning: Documentation is lazy. This means that no `meta` ' +
+            log.warning(
+                'Documentation is lazy. This means that no `meta` ' +
                 'plugin was used on it before exporting.')
             documentation_blob.unlazy()
 
-        plugin_out_dir = os.path.join(output_dir, self.get_name())
+        with span('export.' + self.get_name()):
+            plugin_out_dir = self.prepare_export(output_dir)
+            try:
+                self.prepare_directories(documentation_blob.get_leaves(), plugin_out_dir)
+                for leaf in documentation_blob.get_leaves():
+                    with span('export_leaf.' + self.get_name(),
+                              leaf=leaf.get_title()):
+                        self.export_leaf(leaf, plugin_out_dir)
+            except BaseException:
+                self.abort_export()
+                raise
+            self.finish_export()
+
+    def prepare_export(self, output_dir):
+        '''
+        Prepares the output directory before any leaf is exported.
 
+        Returns the directory where this exporter will write its output.
+        '''
         mkdir_silent(output_dir)
-        for leaf in documentation_blob.get_leaves():
-            leaf_relative_path = os.path.join(
-                *[p.get_title() for p in leaf.get_path()])
-            leaf_complete_path = os.path.join(
-                plugin_out_dir, leaf_relative_path)
-            mkdir_silent(os.path.dirname(leaf_complete_path))
-            self._export_leaf_resources(leaf, leaf_complete_path)
-            leaf.replace_resources_with_imports(self.import_function)
-            self._export_leaf(leaf, leaf_complete_path)
+        plugin_out_dir = os.path.join(output_dir, self.get_name())
+        self.created_dirs = set()
+        if self.archive is not None:
+            self.output_writer = ArchiveWriter(plugin_out_dir, self.archive)
+            return plugin_out_dir
+        if self.atomic:
+            staging_dir = create_staging(plugin_out_dir)
+            self.output_writer = OutputWriter(staging_dir, plugin_out_dir,
+                                              self.precompress)
+            return staging_dir
+        self.output_writer = OutputWriter(plugin_out_dir,
+                                          precompress=self.precompress)
+        return plugin_out_dir
+
+    def is_thread_safe(self):
+        '''
+        Returns whether `export_leaf` can be called from more than one thread
+        at once. Overwrite this method in subclasses that are.
+        '''
+        return False
+
+    def prepare_directories(self, leaves, plugin_out_dir, relative_paths=None):
+        '''
+        Creates at once all the directories the given leaves will be exported
+        to, so that `export_leaf` does not need to check them one leaf at a time.
+        The relative paths of the leaves (see `get_leaf_relative_path`) can be
+        provided if already known.
+        '''
+        if relative_paths is None:
+            relative_paths = [Exporter.get_leaf_relative_path(leaf) for leaf in leaves]
+        directories = {os.path.dirname(os.path.join(plugin_out_dir, path))
+                       for path in relative_paths}
+        for directory in sorted(directories):
+            self._make_directory(directory)
+
+    def _make_directory(self, directory):
+        if self.archive is not None:
+            # Nothing is written outside of the archive
+            return
+        if self.created_dirs is not None and directory in self.created_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        if self.created_dirs is not None:
+            self.created_dirs.add(directory)
+
+    @staticmethod
+    def get_leaf_relative_path(leaf):
+        '''
+        Returns the path (without extension) of the output of a leaf relative to
+        the output directory of an exporter.
+        '''
+        return os.path.join(*[p.get_title() for p in leaf.get_path()])
+
+    def write_output(self, path, data):
+        '''
+        Writes `data` (str or bytes) to the file at `path` only if its content
+        changed (see `docthing.output`).
+
+            Returns:
+                bool: Whether the file was written.
+        '''
+        if self.output_writer is None:
+            # `prepare_export` was not called: no manifest to compare with
+            with open(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+                f.write(data)
+            return True
+        return self.output_writer.write(path, data)
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        '''
+        Exports a single (already interpreted) leaf node together with its
+        resources inside `plugin_out_dir`. The path of the leaf relative to it
+        (see `get_leaf_relative_path`) can be provided if already known.
+
+        This can be called one leaf at a time (see `docthing.pipeline`) as long
+        as `prepare_export` was called before and `finish_export` is called after
+        the last leaf.
+        '''
+        if relative_path is None:
+            relative_path = Exporter.get_leaf_relative_path(leaf)
+        leaf_complete_path = os.path.join(plugin_out_dir, relative_path)
+        self._make_directory(os.path.dirname(leaf_complete_path))
+        self._export_leaf_resources(leaf, leaf_complete_path)
+        # The leaf is shared with the other exporters: export a view of it
+        self._export_leaf(leaf.with_resources_replaced(self.import_function),
+                          leaf_complete_path)
+
+    def finish_export(self):
+        '''
+        Called once after the last leaf was exported.
+        Subclasses that need to finalize their output should call this method
+        after doing so.
+        '''
+        if self.output_writer is None:
+            return
+        self.output_writer.save()
+        if self.output_writer.is_staging():
+            self.output_writer.sync()
+            commit_staging(self.output_writer.root,
+                           self.output_writer.reference_root)
+        log.info(f'{self.get_name()}: {self.output_writer.summary()}')
+
+    def abort_export(self):
+        '''
+        Called instead of `finish_export` when the export failed: discards the
+        partial output. Subclasses holding open files should close them and
+        then call this method.
+        '''
+        if self.output_writer is None:
+            return
+        self.output_writer.discard()
+        self.output_writer = None
 
     @abstractmethod
     def _export_leaf(self, leaf, output_file_no_ext):
@@ -91,4 +245,4 @@ class Exporter(PluginInterface):
         '''
         for resource in [line for line in leaf.get_content()
                          if isinstance(line, ResourceReference)]:
-            resource.write(output_file_no_ext)
+            resource.write(output_file_no_ext, self.output_writer)
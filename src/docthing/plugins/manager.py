@@ -22,28 +22,39 @@ Once all plugins are enabled, the `PluginManager` will be able to
 let the user iterate over all them to perform some action.
 END FILE DOCUMENTATION '''
 
-import os
-import importlib.util
 import inspect
+import os
 from typing import Union, List
 
+from .. import log
 from .plugin_interface import PluginInterface
-from ..util import get_docthing_plugin_dir
+from .registry import PluginRegistry
+from ..util import get_docthing_plugin_dir, get_docthing_cache_dir
 
 
 class PluginManager:
-    def __init__(self, plugin_type, builtin_plugins=[]):
+    def __init__(self, plugin_type, builtin_plugins=[], cache_dir=None):
         '''
         Initialize the PluginManager with the specified plugin type.
+
+        Plugins passed as `builtin_plugins` are already instantiated; the other
+        plugins (see `docthing.plugins.registry`) are imported only when they
+        are enabled.
         '''
         self.plugin_dir = get_docthing_plugin_dir(plugin_type)
-        self.plugins = builtin_plugins
+        self.plugins = list(builtin_plugins)
+
+        cache_dir = cache_dir if cache_dir is not None else get_docthing_cache_dir()
+        self.registry = PluginRegistry(
+            plugin_type, self.plugin_dir,
+            os.path.join(cache_dir, f'plugins-{plugin_type}.json'))
+        self.loaded_specs = []
 
     def enable_plugins(self,
                        plugins: Union[str, List[str]] = 'all',
                        configs: dict = {}) -> None:
         '''
-        Enable all plugins from the specified directory.
+        Enable the specified plugins importing them if needed.
 
             Args:
                 plugins (str or list): The name of a plugin or the list of
@@ -55,22 +66,22 @@ class PluginManager:
                 plugins = [plugins]
             else:
                 raise ValueError('Plugins must be a list of plugin names.')
-
-        # Load all plugins from the plugin directory
-        for f in self._get_plugins_from_plugin_dir():
-            self._load_from_file(os.path.join(self.plugin_dir, f))
+        if plugins != 'all':
+            # Empty values (e.g. `meta=`) do not name any plugin
+            plugins = [p for p in plugins if p]
 
         if plugins == 'all':
-            for plugin in self.plugins:
-                c = {"config": configs.get(plugin.get_name(), {})}
-                plugin.enable(**c)
-            return
+            self._load_all()
+            plugins = self._get_names()
+        else:
+            for name in plugins:
+                self._load_by_name(name)
 
-        avail_plugins = [p.get_name() for p in self.plugins]
+        avail_plugins = self._get_names()
         unavailable_plugins = [p for p in plugins if p not in avail_plugins]
         if len(unavailable_plugins) > 0:
-            print('Warning: some plugins were not found: ' +
-                  f'{", ".join(unavailable_plugins)}')
+            log.warning('some plugins were not found: ' +
+                        f'{", ".join(unavailable_plugins)}')
 
         # Enable the specified plugins
         for plugin in self.plugins:
@@ -78,19 +89,61 @@ class PluginManager:
                 c = {"config": configs.get(plugin.get_name(), {})}
                 plugin.enable(**c)
 
-    def _get_plugins_from_plugin_dir(self):
-        res = []
-        if os.path.isdir(self.plugin_dir):
-            for filename in os.listdir(self.plugin_dir):
-                if filename.endswith('.py'):
-                    res.append(filename)
-        return res
+    def _get_names(self):
+        return [p.get_name() for p in self.plugins]
+
+    def _load(self, spec):
+        '''
+        Import and instantiate the plugin described by a registry specification
+        (only once). Classes not implementing `PluginInterface` are skipped.
+        '''
+        if spec in self.loaded_specs:
+            return
+        self.loaded_specs.append(spec)
+        plugin_class = self.registry.load_class(spec)
+        if not inspect.isclass(plugin_class) or \
+                not issubclass(plugin_class, PluginInterface) or \
+                inspect.isabstract(plugin_class):
+            if spec['name'] is not None:
+                where = spec.get('value') or f'{spec["class"]} in {spec["path"]}'
+                log.warning(f'{where} does not implement PluginInterface, ' +
+                            'skipping it')
+            return
+        log.debug(f'Found plugin: {plugin_class.__name__}')
+        self.plugins.append(plugin_class())
+
+    def _load_all(self):
+        '''
+        Import all the plugins known by the registry.
+        '''
+        for spec in self.registry.get_manifest():
+            if spec['name'] is None or spec['name'] not in self._get_names():
+                self._load(spec)
+
+    def _load_by_name(self, name):
+        '''
+        Import the plugin `name` unless it is already loaded. If the registry
+        does not know it, the plugins whose name could not be determined
+        statically are imported.
+        '''
+        if name in self._get_names():
+            return
+
+        for spec in self.registry.find_all(name):
+            self._load(spec)
+            if name in self._get_names():
+                return
+
+        for spec in self.registry.get_unnamed():
+            self._load(spec)
+            if name in self._get_names():
+                return
 
     def get_plugins(self):
         '''
         Return the list of enabled plugins.
         '''
-        return self.plugins
+        return [p for p in self.plugins if p.is_enabled()]
 
     def disable_plugins(self):
         '''
@@ -98,22 +151,3 @@ class PluginManager:
         '''
         for plugin in self.plugins:
             plugin.disable()
-
-    def _load_from_file(self, filepath):
-        '''
-        Load and verify a single plugin.
-        '''
-        module_name = os.path.splitext(os.path.basename(filepath))[0]
-
-        # Load the module from file
-        spec = importlib.util.spec_from_file_location(module_name, filepath)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        # Inspect module for classes
-        for name, obj in inspect.getmembers(module, inspect.isclass):
-            # Check if the class is a subclass of PluginInterface and not the
-            # abstract class itself
-            if issubclass(obj, PluginInterface) and obj is not PluginInterface:
-                print(f'Found plugin: {name}')
-                self.plugins.append(obj())  # Instantiate the plugin class
@@ -14,6 +14,7 @@ class MarkdownNAVInterpreter(MetaInterpreter):
 
     def __init__(self):
         super().__init__('end_file')
+        self.neighbours = {}
 
     def get_name(self):
         return 'nav.md'
@@ -36,10 +37,22 @@ class MarkdownNAVInterpreter(MetaInterpreter):
     def _should_keep_ending(self):
         return True
 
+    def prepare(self, leaves):
+        # Precompute previous and next leaf of each leaf once instead of
+        #   listing all the leaves of the tree for each one of them
+        self.neighbours = {}
+        for i, leaf in enumerate(leaves):
+            self.neighbours[leaf] = (
+                leaves[i - 1] if i > 0 else None,
+                leaves[i + 1] if i < len(leaves) - 1 else None)
+
     def generate_resource(self, source):
         leaf = source
-        prev = leaf.get_previous_tree_leaf_breadth_first()
-        next = leaf.get_next_tree_leaf_breadth_first()
+        if leaf in self.neighbours:
+            prev, next = self.neighbours[leaf]
+        else:
+            prev = leaf.get_previous_tree_leaf_breadth_first()
+            next = leaf.get_next_tree_leaf_breadth_first()
 
         res = []
 
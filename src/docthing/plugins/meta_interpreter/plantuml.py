@@ -3,7 +3,9 @@
 import subprocess as sp
 from typing import Union
 
+from ...dependencies import DEPENDENCIES
 from ...documentation_content import ResourceReference
+from ...instrumentation import span
 from ..meta_interpreter_interface import MetaInterpreter
 
 
@@ -34,28 +36,36 @@ class PlantUMLInterpreter(MetaInterpreter):
         return True
 
     def generate_resource(self, source):
-        return PlantUMLReference(source)
+        return PlantUMLReference(source, self.get_dependency_path('plantuml'))
 
 
 class PlantUMLReference(ResourceReference):
     '''
     A class that represents a reference to a PlantUML diagram.
+
+        Args:
+            source (list): The lines of the diagram.
+            executable (str, optional): The absolute path of the `plantuml`
+                executable. If None it is resolved when compiling.
     '''
 
-    def __init__(self, source):
+    def __init__(self, source, executable=None):
         super().__init__(source, 'image')
+        self.executable = executable
 
     def get_ext(self):
         return 'png'
 
     def compile(self) -> Union[bytes, str]:
         try:
-            completed_process = sp.run(
-                ['plantuml', '-tpng', '-pipe'],
-                input=''.join(self.source).encode('utf-8'),
-                stdout=sp.PIPE,
-                check=True,
-            )
+            with span('subprocess.plantuml'):
+                completed_process = sp.run(
+                    [self.executable or DEPENDENCIES.resolve('plantuml') or 'plantuml',
+                     '-tpng', '-pipe'],
+                    input=''.join(self.source).encode('utf-8'),
+                    stdout=sp.PIPE,
+                    check=True,
+                )
             return completed_process.stdout
         except sp.CalledProcessError as e:
             raise ValueError(
@@ -57,6 +57,8 @@ import re
 
 from abc import abstractmethod
 
+from .. import log
+from ..instrumentation import span
 from .plugin_interface import PluginInterface
 
 
@@ -188,8 +190,8 @@ class MetaInterpreter(PluginInterface):
             return
 
         if last_line is None:
-            print('Warning: reached end of file without finding end of ' +
-                  f'code ({self.get_name()}): giving up')
+            log.warning('reached end of file without finding end of ' +
+                        f'code ({self.get_name()}): giving up')
 
         if not self._should_keep_beginning():
             content_first_line = first_line + 1
@@ -220,6 +222,16 @@ class MetaInterpreter(PluginInterface):
         elif self.mode == 'block':
             self.interpret_leaf_block(leaf)
 
+    def prepare(self, leaves):
+        '''
+        Called once with the ordered list of all the leaves that are going to be
+        interpreted before any of them is interpreted.
+
+        Overwrite this method in subclasses to precompute tree-wide data from the
+        structure of the tree alone (the leaves could still be lazy).
+        '''
+        pass
+
     def interpret(self, documentation_blob):
         '''
         Search all leaf in DocumentationBlob and interpret the code blocks.
@@ -227,8 +239,13 @@ class MetaInterpreter(PluginInterface):
         This will replace lines in `Document`s with the result of the interpretation
         which is a `ResourceReference` implementation.
         '''
-        for leaf in documentation_blob.get_leaves():
-            if leaf.is_lazy():
-                leaf.unlazy()
+        with span('interpret.' + self.get_name()):
+            leaves = documentation_blob.get_leaves()
+            self.prepare(leaves)
+            for leaf in leaves:
+                if leaf.is_lazy():
+                    leaf.unlazy()
 
-            self.interpret_leaf(leaf)
+                with span('interpret_leaf.' + self.get_name(),
+                          leaf=leaf.get_title()):
+                    self.interpret_leaf(leaf)
@@ -50,9 +50,11 @@ documentation).
 END FILE DOCUMENTATION '''
 
 from abc import ABC, abstractmethod
-import shutil
 from schema import Schema
-from typing import List
+from typing import List, Union
+
+from .. import log
+from ..dependencies import DEPENDENCIES
 
 
 class PluginInterface(ABC):
@@ -91,7 +93,7 @@ class PluginInterface(ABC):
         '''
         Enable the plugin and perform any necessary initialization.
         '''
-        print(f'Enabling plugin: {self.get_name()}')
+        log.info(f'Enabling plugin: {self.get_name()}')
         self.configure(config)
         self._enable()
         self.enabled = True
@@ -135,10 +137,18 @@ class PluginInterface(ABC):
         Check if all the dependencies required by the plugin are available.
         '''
         for dep in self.get_dependencies():
-            if not shutil.which(dep):
+            if self.get_dependency_path(dep) is None:
                 return False
         return True
 
+    def get_dependency_path(self, dependency: str) -> Union[str, None]:
+        '''
+        Return the absolute path of the executable of a dependency (resolved
+        only once, see `docthing.dependencies`) or None if it is not available.
+        Plugins should run their dependencies through this path.
+        '''
+        return DEPENDENCIES.resolve(dependency)
+
     def schema(self) -> Schema:
         '''
         Return the schema for the plugin configuration.
@@ -0,0 +1,318 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 2)
+Plugins can be provided to `docthing` in three ways:
+
+1. _builtin_ plugins shipped with `docthing` itself;
+2. Python files placed in the plugin directory of the plugin type (e.g.
+   `~/.local/share/docthing/plugins/exporter/` on Linux);
+3. installed Python packages exposing an _entry point_ in the group
+   `docthing.<plugin type>` (e.g. `docthing.exporter`) whose name is the name
+   of the plugin and whose value is the class implementing it:
+
+```toml
+[project.entry-points."docthing.exporter"]
+html = "docthing_html:HTMLExporter"
+```
+
+To find out which plugins are available without importing all of them, the
+`PluginRegistry` keeps a _manifest_ mapping the name of each plugin to where its
+class is defined. The manifest of the plugin directory is built with a static
+scan of each file (the source is parsed but not executed: a class defining, or
+inheriting from a class of the same file, a `get_name` method returning a string
+literal is a plugin with that name; the name of the other classes inheriting
+from something is known only importing the file) and entry points are looked
+up in the installed packages metadata. Both are cached on disk (in the `cache`
+directory next to the plugin directory) and refreshed only when a file of the
+plugin directory (or a directory of `sys.path`) changes.
+
+Only the plugins that are actually requested are then imported; classes that
+turn out not to implement `PluginInterface` are skipped. A plugin of the plugin
+directory or of an installed package named as a builtin plugin overrides it.
+END FILE DOCUMENTATION '''
+
+import ast
+import json
+import os
+import sys
+
+from .. import log
+
+# Builtin plugins for each plugin type: name -> 'module:Class'
+BUILTIN_PLUGINS = {
+    'exporter': {
+        'markdown': 'docthing.plugins.exporter.markdown:MarkdownExporter',
+        'bundle': 'docthing.plugins.exporter.bundle:BundleExporter',
+        'search': 'docthing.plugins.exporter.search:SearchIndexExporter',
+        'sqlite': 'docthing.plugins.exporter.sqlite:SQLiteExporter',
+        'jsonl': 'docthing.plugins.exporter.jsonl:JSONLinesExporter',
+    },
+    'meta-interpreter': {
+        'plantuml': 'docthing.plugins.meta_interpreter.plantuml:PlantUMLInterpreter',
+        'nav.md': 'docthing.plugins.meta_interpreter.nav:MarkdownNAVInterpreter',
+    },
+}
+
+_MANIFEST_VERSION = 2
+
+
+def _literal_name(class_def):
+    '''
+    Returns the string literal returned by the `get_name` method defined in
+    the class definition, None if there is no such method and an empty string
+    if the method does not return a literal.
+    '''
+    for node in class_def.body:
+        if isinstance(node, ast.FunctionDef) and node.name == 'get_name':
+            returns = [n for n in ast.walk(node) if isinstance(n, ast.Return)]
+            if len(returns) == 1 and isinstance(returns[0].value, ast.Constant) \
+                    and isinstance(returns[0].value.value, str):
+                return returns[0].value.value
+            return ''
+    return None
+
+
+def _has_bases(class_def):
+    '''
+    Returns whether the class definition inherits from anything but `object`.
+    '''
+    return any(not (isinstance(base, ast.Name) and base.id == 'object')
+               for base in class_def.bases)
+
+
+def scan_plugin_file(path):
+    '''
+    Statically scans a Python file looking for plugin classes.
+
+    A class is a candidate plugin if it defines a `get_name` method or if it
+    inherits from some other class (e.g. from `PluginInterface` or from another
+    plugin). Whether it actually is a plugin is checked when it is imported.
+
+        Returns:
+            list: A list of `{'class': ..., 'name': ...}` dicts, one for each
+            candidate class. The name is None if it can be known only importing
+            the file.
+    '''
+    with open(path, 'rb') as f:
+        try:
+            tree = ast.parse(f.read(), filename=path)
+        except SyntaxError:
+            return []
+
+    res = []
+    # Names of the classes of the file (to resolve inherited `get_name`s)
+    names = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        name = _literal_name(node)
+        if name is None and _has_bases(node):
+            inherited = [names.get(base.id) for base in node.bases
+                         if isinstance(base, ast.Name)]
+            name = inherited[0] if len(inherited) == len(node.bases) == 1 \
+                and inherited[0] else ''
+        if name is not None:
+            names[node.name] = name
+            res.append({'class': node.name, 'name': name or None})
+    return res
+
+
+def _sys_path_fingerprint():
+    '''
+    Returns the modification times of the directories in `sys.path`, which
+    change when packages are installed or removed. The current directory is
+    skipped: it is the project being documented, not where packages live.
+    '''
+    res = []
+    cwd = os.getcwd()
+    for path in sys.path:
+        if path in ('', cwd):
+            continue
+        try:
+            res.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            res.append([path, None])
+    return res
+
+
+class PluginRegistry():
+    '''
+    Knows all the plugins of a plugin type and where their classes are defined.
+
+        Args:
+            plugin_type (str): The plugin type (one of `SUPPORTED_PLUGIN_TYPES`).
+            plugin_dir (str): The directory containing the plugin files.
+            cache_path (str, optional): The path of the manifest cache file. If
+                None the manifest is not cached.
+    '''
+
+    def __init__(self, plugin_type, plugin_dir, cache_path=None):
+        self.plugin_type = plugin_type
+        self.plugin_dir = str(plugin_dir)
+        self.cache_path = str(cache_path) if cache_path is not None else None
+        self.manifest = None
+        self.modules = {}
+
+    # =======================
+    # MANIFEST
+    # =======================
+
+    def _load_cache(self):
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('version') != _MANIFEST_VERSION:
+            return {}
+        return cache
+
+    def _save_cache(self, cache):
+        if self.cache_path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # The cache is only an optimization
+            pass
+
+    def _scan_plugin_dir(self, cached_files):
+        '''
+        Returns the manifest of the plugin directory reusing the cached entries
+        of the files that did not change.
+        '''
+        files = {}
+        if not os.path.isdir(self.plugin_dir):
+            return files
+
+        with os.scandir(self.plugin_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.py') or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                cached = cached_files.get(entry.path)
+                if cached is not None and cached['mtime'] == stat.st_mtime_ns \
+                        and cached['size'] == stat.st_size:
+                    files[entry.path] = cached
+                else:
+                    files[entry.path] = {
+                        'mtime': stat.st_mtime_ns,
+                        'size': stat.st_size,
+                        'plugins': scan_plugin_file(entry.path),
+                    }
+        return files
+
+    def _scan_entry_points(self, cached_entry_points):
+        '''
+        Returns the entry points of the plugin type reusing the cached ones if
+        no directory of `sys.path` changed.
+        '''
+        fingerprint = _sys_path_fingerprint()
+        if cached_entry_points.get('fingerprint') == fingerprint:
+            return cached_entry_points
+
+        from importlib.metadata import entry_points
+
+        group = 'docthing.' + self.plugin_type
+        all_entry_points = entry_points()
+        if hasattr(all_entry_points, 'select'):
+            selected = all_entry_points.select(group=group)
+        else:  # Python < 3.10
+            selected = all_entry_points.get(group, [])
+
+        return {
+            'fingerprint': fingerprint,
+            'plugins': [{'name': ep.name, 'value': ep.value} for ep in selected],
+        }
+
+    def get_manifest(self):
+        '''
+        Returns the manifest: a list of plugin specifications (dicts) in order
+        of precedence (plugin directory, entry points, builtin plugins). Each
+        specification has a `name` (None if it is not known until the plugin is
+        imported) and either a `value` (`'module:Class'`) or a `path` and a
+        `class`.
+        '''
+        if self.manifest is not None:
+            return self.manifest
+
+        cache = self._load_cache()
+        files = self._scan_plugin_dir(cache.get('files', {}))
+        eps = self._scan_entry_points(cache.get('entry_points', {}))
+
+        new_cache = {'version': _MANIFEST_VERSION, 'files': files, 'entry_points': eps}
+        if new_cache != cache:
+            self._save_cache(new_cache)
+
+        manifest = []
+        for path in sorted(files):
+            manifest += [{'name': p['name'], 'path': path, 'class': p['class']}
+                         for p in files[path]['plugins']]
+        manifest += [dict(p) for p in eps['plugins']]
+
+        builtins = BUILTIN_PLUGINS.get(self.plugin_type, {})
+        for spec in manifest:
+            if spec['name'] in builtins:
+                log.info(f'the {self.plugin_type} plugin {spec["name"]} from ' +
+                         f'{spec.get("path", spec.get("value"))} overrides ' +
+                         'the builtin one')
+        manifest += [{'name': name, 'value': value}
+                     for name, value in builtins.items()]
+
+        self.manifest = manifest
+        return manifest
+
+    def find_all(self, name):
+        '''
+        Returns the specifications of the plugins named `name` in order of
+        precedence.
+        '''
+        return [spec for spec in self.get_manifest() if spec['name'] == name]
+
+    def find(self, name):
+        '''
+        Returns the specification of the plugin `name` or None if it is not
+        in the manifest (or its name is known only after importing it).
+        '''
+        specs = self.find_all(name)
+        return specs[0] if specs else None
+
+    def get_unnamed(self):
+        '''
+        Returns the specifications of the plugins whose name could not be
+        determined without importing them.
+        '''
+        return [spec for spec in self.get_manifest() if spec['name'] is None]
+
+    # =======================
+    # LOADING
+    # =======================
+
+    def load_class(self, spec):
+        '''
+        Imports the module defining the plugin and returns its class.
+        '''
+        if 'value' in spec:
+            from importlib import import_module
+
+            module_name, _, class_name = spec['value'].partition(':')
+            obj = import_module(module_name)
+            for attr in class_name.split('.'):
+                obj = getattr(obj, attr)
+            return obj
+
+        if spec['path'] not in self.modules:
+            import importlib.util
+
+            module_name = os.path.splitext(os.path.basename(spec['path']))[0]
+            module_spec = importlib.util.spec_from_file_location(
+                module_name, spec['path'])
+            module = importlib.util.module_from_spec(module_spec)
+            module_spec.loader.exec_module(module)
+            self.modules[spec['path']] = module
+        return getattr(self.modules[spec['path']], spec['class'])
@@ -0,0 +1 @@
+# SPDX-License-Identifier: MIT
@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: MIT
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+
+from .sourcefs_interface import SourceFS, SourceDirEntry, relative_path
+from .sourcefs_interface import FILE, DIRECTORY
+
+# Magic numbers of the compressed tar archives and how to open them
+_COMPRESSIONS = (
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+)
+_BLOCK_SIZE = 1 << 16
+
+
+def _decompress(archive_path):
+    '''
+    Returns a temporary file containing the decompressed content of the archive
+    at `archive_path`, or None if it is not compressed.
+    '''
+    with open(archive_path, 'rb') as f:
+        magic = f.read(6)
+    opener = next((opener for prefix, opener in _COMPRESSIONS
+                   if magic.startswith(prefix)), None)
+    if opener is None:
+        return None
+
+    decompressed = tempfile.TemporaryFile()
+    try:
+        with opener(archive_path, 'rb') as f:
+            shutil.copyfileobj(f, decompressed, _BLOCK_SIZE)
+    except BaseException:
+        decompressed.close()
+        raise
+    decompressed.seek(0)
+    return decompressed
+
+
+class ArchiveFS(SourceFS):
+    '''
+    A `SourceFS` serving the files of a zip or tar (optionally compressed)
+    archive without extracting it.
+
+    The index of the archive (the central directory of zip files, the member
+    headers of tar files) is read once when the archive is opened; members are
+    read on demand when opened. Compressed tar archives (gzip, bzip2, xz) can
+    only be read from the start, so they are decompressed once, in a single
+    pass, into a temporary file which members are then read from in any order.
+
+    Paths under `mount_point` are mapped to the members of the archive: e.g.
+    with `mount_point='/project'` the path `/project/src/main.c` is the member
+    `src/main.c`. If all the members of the archive are inside a single top
+    level directory (as it happens for most source tarballs) that directory is
+    used as the root of the archive.
+
+        Args:
+            archive_path (str): The path to the zip or tar archive.
+            mount_point (str, optional): The directory the archive is mapped to.
+                Defaults to the current working directory.
+    '''
+
+    def __init__(self, archive_path, mount_point=None):
+        super().__init__()
+        self.mount_point = os.path.abspath(
+            mount_point if mount_point is not None else os.getcwd())
+        self.lock = threading.Lock()
+        self.decompressed = None
+
+        if zipfile.is_zipfile(archive_path):
+            self.archive = zipfile.ZipFile(archive_path)
+            members = [(info.filename, info.is_dir(), info)
+                       for info in self.archive.infolist()]
+        elif tarfile.is_tarfile(archive_path):
+            self.decompressed = _decompress(archive_path)
+            if self.decompressed is not None:
+                self.archive = tarfile.open(fileobj=self.decompressed, mode='r:')
+            else:
+                self.archive = tarfile.open(archive_path)
+            members = [(info.name, info.isdir(), info)
+                       for info in self.archive.getmembers()
+                       if info.isdir() or info.isfile()]
+        else:
+            raise ValueError(f'{archive_path} is not a zip or tar archive')
+
+        self._build_index(members)
+
+    def _build_index(self, members):
+        '''
+        Build the index of the archive: a dict mapping each directory to the
+        dict of its entries (name to is_dir) and a dict mapping each file to its
+        member.
+        '''
+        self.directories = {'': {}}
+        self.files = {}
+
+        def _add_directory(path):
+            while path not in self.directories:
+                self.directories[path] = {}
+                parent, name = posixpath.split(path)
+                self.directories[parent][name] = True
+                path = parent
+
+        for name, is_dir, info in members:
+            name = posixpath.normpath(name.lstrip('/'))
+            if name in ('', '.', '..') or name.startswith('../'):
+                continue
+            if is_dir:
+                _add_directory(name)
+            else:
+                parent, basename = posixpath.split(name)
+                _add_directory(parent)
+                self.directories[parent][basename] = False
+                self.files[name] = info
+
+        # Use the only top level directory as root
+        self.prefix = ''
+        top_level = self.directories['']
+        if len(top_level) == 1 and list(top_level.values())[0]:
+            self.prefix = list(top_level.keys())[0] + '/'
+
+    def _member_path(self, path):
+        relative = relative_path(self.mount_point, path)
+        if relative is None:
+            return None
+        if relative == '':
+            return self.prefix.rstrip('/')
+        return self.prefix + relative
+
+    def isfile(self, path):
+        return self._member_path(path) in self.files
+
+    def isdir(self, path):
+        return self._member_path(path) in self.directories
+
+    def stat_many(self, paths):
+        res = {}
+        for path in paths:
+            member_path = self._member_path(path)
+            if member_path in self.files:
+                res[path] = FILE
+            elif member_path in self.directories:
+                res[path] = DIRECTORY
+            else:
+                res[path] = None
+        return res
+
+    def open(self, path):
+        member_path = self._member_path(path)
+        if member_path not in self.files:
+            raise FileNotFoundError(f'{path} is not a file in the archive')
+
+        info = self.files[member_path]
+        with self.lock:
+            if isinstance(self.archive, zipfile.ZipFile):
+                with self.archive.open(info) as f:
+                    data = f.read()
+            else:
+                data = self.archive.extractfile(info).read()
+        return io.TextIOWrapper(io.BytesIO(data))
+
+    def scandir(self, path):
+        member_path = self._member_path(path)
+        if member_path not in self.directories:
+            raise NotADirectoryError(f'{path} is not a directory in the archive')
+
+        return self._listing([
+            SourceDirEntry(name, os.path.join(path, name), is_dir)
+            for name, is_dir in self.directories[member_path].items()])
+
+    def close(self):
+        with self.lock:
+            self.archive.close()
+            if self.decompressed is not None:
+                self.decompressed.close()
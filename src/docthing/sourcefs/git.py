@@ -0,0 +1,201 @@
+# SPDX-License-Identifier: MIT
+
+import io
+import os
+import posixpath
+import subprocess as sp
+import tempfile
+import threading
+
+from ..instrumentation import count
+from .sourcefs_interface import SourceFS, SourceDirEntry, relative_path
+
+_GIT_TREE_MODE = b'40000'
+_GIT_SUBMODULE_MODE = b'160000'
+
+# Files larger than this are spooled to a temporary file instead of memory
+_SPOOL_SIZE = 1 << 20
+_BLOCK_SIZE = 1 << 16
+
+
+def _copy(source, destination, size):
+    '''
+    Copies `size` bytes from `source` to `destination` a block at a time.
+    '''
+    while size > 0:
+        block = source.read(min(size, _BLOCK_SIZE))
+        if not block:
+            raise EOFError('git cat-file ended unexpectedly')
+        destination.write(block)
+        size -= len(block)
+
+
+class GitRevisionFS(SourceFS):
+    '''
+    A `SourceFS` serving the files of a git repository as they are at a given
+    revision, without checking them out.
+
+    Paths are the ones the files would have in the working tree of the
+    repository. All objects are read through a single long-lived
+    `git cat-file --batch` process and directory listings (git trees) are
+    cached. Files are copied out of the process in chunks, into memory or, if
+    they are large, into a temporary file.
+
+        Args:
+            rev (str): The revision (commit, tag, branch, ...) to read.
+            path (str): A path inside the repository (used to locate it).
+
+        Raises:
+            ValueError: If `path` is not in a git repository or `rev` is not a
+                commit of it.
+    '''
+
+    def __init__(self, rev, path='.'):
+        super().__init__()
+
+        directory = os.path.abspath(path)
+        while not os.path.isdir(directory):
+            directory = os.path.dirname(directory)
+
+        self.toplevel = GitRevisionFS._git(
+            ['rev-parse', '--show-toplevel'], directory)
+        try:
+            self.commit = GitRevisionFS._git(
+                ['rev-parse', '--verify', '--quiet', rev + '^{commit}'], directory)
+        except ValueError:
+            # `--quiet` leaves nothing on the standard error to report
+            raise ValueError(f'unknown revision {rev}') from None
+        self.hash_size = len(self.commit) // 2
+
+        self.process = None
+        self.lock = threading.Lock()
+        self.trees = {}
+
+    @staticmethod
+    def _git(args, cwd):
+        try:
+            completed_process = sp.run(
+                ['git'] + args, cwd=cwd, stdout=sp.PIPE, stderr=sp.PIPE,
+                check=True)
+        except sp.CalledProcessError as e:
+            raise ValueError(f'git {" ".join(args)} failed: ' +
+                             e.stderr.decode(errors='replace').strip())
+        return completed_process.stdout.decode().strip()
+
+    def _cat_file(self, spec, spool=False):
+        '''
+        Read an object from the `git cat-file --batch` process.
+
+            Args:
+                spec (str): The object to read.
+                spool (bool, optional): Whether to copy the object, in chunks,
+                    into a (rewound) binary file object instead of bytes.
+
+            Returns:
+                tuple: `(type, bytes or file object)` or `(None, None)` if it
+                    does not exist.
+        '''
+        with self.lock:
+            if self.process is None:
+                self.process = sp.Popen(['git', 'cat-file', '--batch'],
+                                        cwd=self.toplevel,
+                                        stdin=sp.PIPE, stdout=sp.PIPE)
+
+            self.process.stdin.write(spec.encode() + b'\n')
+            self.process.stdin.flush()
+
+            header = self.process.stdout.readline().decode().split()
+            if len(header) != 3:
+                # `<spec> missing` or `<spec> ambiguous`
+                return None, None
+
+            _, object_type, size = header
+            size = int(size)
+            if spool:
+                data = io.BytesIO() if size <= _SPOOL_SIZE else tempfile.TemporaryFile()
+                _copy(self.process.stdout, data, size)
+                data.seek(0)
+            else:
+                data = self.process.stdout.read(size)
+            self.process.stdout.read(1)  # trailing newline
+            return object_type, data
+
+    def _parse_tree(self, data):
+        entries = {}
+        i = 0
+        while i < len(data):
+            space = data.index(b' ', i)
+            nul = data.index(b'\0', space)
+            mode = data[i:space]
+            name = data[space + 1:nul].decode()
+            sha = data[nul + 1:nul + 1 + self.hash_size].hex()
+            i = nul + 1 + self.hash_size
+            if mode != _GIT_SUBMODULE_MODE:
+                entries[name] = (mode == _GIT_TREE_MODE, sha)
+        return entries
+
+    def _tree(self, relative_dir):
+        '''
+        Return the (cached) entries of a directory as a dict mapping each name
+        to a tuple `(is_dir, sha)` or None if it is not a directory.
+        '''
+        if relative_dir in self.trees:
+            count('cache.hits')
+        else:
+            count('cache.misses')
+            object_type, data = self._cat_file(
+                self.commit + ':' + relative_dir)
+            self.trees[relative_dir] = self._parse_tree(data) \
+                if object_type == 'tree' else None
+        return self.trees[relative_dir]
+
+    def _entry(self, path):
+        relative = relative_path(self.toplevel, path)
+        if relative is None:
+            return None
+        if relative == '':
+            return (True, None)
+
+        parent, name = posixpath.split(relative)
+        tree = self._tree(parent)
+        return tree.get(name) if tree is not None else None
+
+    def isfile(self, path):
+        entry = self._entry(path)
+        return entry is not None and not entry[0]
+
+    def isdir(self, path):
+        entry = self._entry(path)
+        return entry is not None and entry[0]
+
+    def is_repository_root(self, path, entry_names=None):
+        # Trees have no `.git` entry: the repository root is the top level
+        return relative_path(self.toplevel, path) == ''
+
+    def open(self, path):
+        entry = self._entry(path)
+        if entry is None or entry[0]:
+            raise FileNotFoundError(
+                f'{path} is not a file at revision {self.commit}')
+
+        _, data = self._cat_file(entry[1], spool=True)
+        return io.TextIOWrapper(data)
+
+    def scandir(self, path):
+        relative = relative_path(self.toplevel, path)
+        tree = self._tree(relative) if relative is not None else None
+        if tree is None:
+            raise NotADirectoryError(
+                f'{path} is not a directory at revision {self.commit}')
+
+        return self._listing([
+            SourceDirEntry(name, os.path.join(path, name), is_dir)
+            for name, (is_dir, _) in tree.items()])
+
+    def close(self):
+        with self.lock:
+            if self.process is not None:
+                self.process.stdin.close()
+                self.process.wait()
+                self.process.stdout.close()
+                self.process = None
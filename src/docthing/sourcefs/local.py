@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: MIT
+
+import os
+
+from .sourcefs_interface import SourceFS, FILE, DIRECTORY
+
+
+class LocalFS(SourceFS):
+    '''
+    A `SourceFS` reading from the local disk.
+    '''
+
+    def open(self, path):
+        return open(path, 'r')
+
+    def isfile(self, path):
+        return os.path.isfile(path)
+
+    def isdir(self, path):
+        return os.path.isdir(path)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def realpath(self, path):
+        return os.path.realpath(path)
+
+    def scandir(self, path):
+        return os.scandir(path)
+
+    def _list_types(self, directory):
+        '''
+        Returns a dict mapping the names of the files and directories in
+        `directory` to their type, or None if it cannot be listed.
+        '''
+        types = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        types[entry.name] = DIRECTORY
+                    elif entry.is_file():
+                        types[entry.name] = FILE
+        except OSError:
+            return None
+        return types
+
+    def stat_many(self, paths):
+        '''
+        Paths sharing the same parent directory are resolved with a single
+        listing of the parent instead of one `stat` each. Paths missing from
+        the listing (e.g. spelled with a different case on a case-insensitive
+        file system) or whose parent cannot be listed are checked one by one.
+        '''
+        res = {}
+        by_parent = {}
+        for path in paths:
+            absolute = os.path.abspath(path)
+            by_parent.setdefault(os.path.dirname(absolute), []).append(
+                (path, os.path.basename(absolute)))
+
+        for parent, children in by_parent.items():
+            types = None
+            if len(children) > 1 and all(name for _, name in children):
+                types = self._list_types(parent)
+            if types is None:
+                res.update(super().stat_many([p for p, _ in children]))
+                continue
+
+            missing = []
+            for path, name in children:
+                res[path] = types.get(name)
+                if res[path] is None:
+                    missing.append(path)
+            if missing:
+                res.update(super().stat_many(missing))
+        return res
+
+
+LOCAL_FS = LocalFS()
@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+`docthing` never touches the project files directly: every `open`, `isfile`,
+`isdir` or directory listing performed while building the
+[`DocumentationBlob`](@DocumentationBlob) goes through a `SourceFS`.
+
+The default implementation is `LocalFS` which reads from the local disk but
+other backends can serve the same paths from somewhere else, for example
+`GitRevisionFS` reads the files as they were at a given git revision without
+checking them out and `ArchiveFS` reads them from a zip or tar archive without
+extracting it.
+
+When many paths have to be checked at once `stat_many` should be preferred over
+calling `isfile`/`isdir` for each path: backends can answer in batch (e.g. one
+directory listing for all the paths with the same parent).
+
+Paths are always the ones the project would have on the local disk: this way
+the relative paths in the _index file_ and in the _configuration_ are resolved
+in the same way whatever the backend is.
+END FILE DOCUMENTATION '''
+
+import os
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+
+FILE = 'file'
+DIRECTORY = 'dir'
+
+
+def relative_path(root, path):
+    '''
+    Convert `path` to a `/`-separated path relative to the directory `root`
+    (`''` for `root` itself) or None if it is not inside `root`.
+
+    Useful for backends mapping the paths of the local disk under `root` to
+    paths inside some other storage.
+    '''
+    relative = os.path.relpath(os.path.abspath(path), root)
+    if relative == os.curdir:
+        return ''
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return None
+    return relative.replace(os.sep, '/')
+
+
+class SourceDirEntry():
+    '''
+    A minimal `os.DirEntry`-like object returned by `SourceFS.scandir` for
+    backends not backed by the local disk.
+    '''
+
+    def __init__(self, name, path, is_dir):
+        self.name = name
+        self.path = path
+        self._is_dir = is_dir
+
+    def is_dir(self, follow_symlinks=True):
+        return self._is_dir
+
+    def is_file(self, follow_symlinks=True):
+        return not self._is_dir
+
+    def __repr__(self):
+        return f'<SourceDirEntry {self.name!r}>'
+
+
+class SourceFS(ABC):
+    '''
+    SourceFS is an abstract class that defines the interface for the file
+    systems the project sources are read from.
+    '''
+
+    def __init__(self):
+        self.ignore_cache = None
+
+    @abstractmethod
+    def open(self, path):
+        '''
+        Open the file at `path` for reading in text mode.
+        The returned object must be usable as a context manager and iterable
+        line by line.
+        '''
+        pass
+
+    @abstractmethod
+    def isfile(self, path) -> bool:
+        '''
+        Return whether `path` is an existing file.
+        '''
+        pass
+
+    @abstractmethod
+    def isdir(self, path) -> bool:
+        '''
+        Return whether `path` is an existing directory.
+        '''
+        pass
+
+    def exists(self, path) -> bool:
+        '''
+        Return whether `path` exists.
+        '''
+        return self.isfile(path) or self.isdir(path)
+
+    def is_repository_root(self, path, entry_names=None) -> bool:
+        '''
+        Return whether `path` is the root of a repository (it contains `.git`).
+        `entry_names`, if given, are the names of the entries of `path`.
+        '''
+        if entry_names is not None:
+            return '.git' in entry_names
+        return self.exists(os.path.join(path, '.git'))
+
+    def stat_many(self, paths) -> dict:
+        '''
+        Return a dict mapping each of the given paths to its type: `FILE`,
+        `DIRECTORY` or None if it does not exist.
+        Overwrite this method in subclasses able to answer in batch.
+        '''
+        res = {}
+        for path in paths:
+            if self.isfile(path):
+                res[path] = FILE
+            elif self.isdir(path):
+                res[path] = DIRECTORY
+            else:
+                res[path] = None
+        return res
+
+    def realpath(self, path) -> str:
+        '''
+        Return the canonical path of `path`: two paths referring to the same
+        file have the same canonical path.
+        Overwrite this method in subclasses supporting symbolic links.
+        '''
+        return os.path.abspath(path)
+
+    @abstractmethod
+    def scandir(self, path):
+        '''
+        Return a context manager iterating over the entries of the directory
+        at `path` as `os.DirEntry`-like objects (see `SourceDirEntry`).
+        '''
+        pass
+
+    def get_ignore_cache(self):
+        '''
+        Return the `IgnoreCache` (see `docthing.ignore`) for this file system.
+        '''
+        if self.ignore_cache is None:
+            from ..ignore import IgnoreCache
+            self.ignore_cache = IgnoreCache(source_fs=self)
+        return self.ignore_cache
+
+    def close(self) -> None:
+        '''
+        Release any resource held by the file system.
+        '''
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @staticmethod
+    def _listing(entries):
+        '''
+        Helper to return a list of entries from `scandir`.
+        '''
+        return nullcontext(iter(entries))
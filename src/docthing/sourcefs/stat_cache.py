@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+While a [`DocumentationBlob`](@DocumentationBlob) is built the type of each
+path of the _index file_ (file, directory or missing) is needed more than once.
+On network file systems each check is a round-trip, so the blob asks a
+`StatCache` instead: all the paths are checked in batch when the tree is
+constructed (see `SourceFS.stat_many`, which lists each parent directory once
+instead of checking each path) and the answers are kept for the whole build.
+END FILE DOCUMENTATION '''
+
+from threading import Lock
+
+from .local import LOCAL_FS
+from .sourcefs_interface import FILE, DIRECTORY
+
+
+class StatCache():
+    '''
+    Caches the type of the paths of a `SourceFS`. Thread-safe.
+
+        Args:
+            source_fs (SourceFS, optional): The file system the paths are
+                checked on. Defaults to the local disk.
+    '''
+
+    def __init__(self, source_fs=None):
+        self.source_fs = source_fs or LOCAL_FS
+        self.lock = Lock()
+        self.types = {}
+
+    def prefetch(self, paths):
+        '''
+        Checks all the given paths not checked yet in a single batch.
+        '''
+        with self.lock:
+            missing = list({path for path in paths if path not in self.types})
+        if not missing:
+            return
+        types = self.source_fs.stat_many(missing)
+        with self.lock:
+            self.types.update(types)
+
+    def get_type(self, path):
+        '''
+        Returns the type of `path`: `FILE`, `DIRECTORY` or None if it does not
+        exist.
+        '''
+        with self.lock:
+            if path in self.types:
+                return self.types[path]
+        self.prefetch([path])
+        return self.types[path]
+
+    def isfile(self, path):
+        return self.get_type(path) == FILE
+
+    def isdir(self, path):
+        return self.get_type(path) == DIRECTORY
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import io
 from abc import ABC, abstractmethod
-from typing import Union, List, Callable
+from typing import Union, List, Callable, TextIO
+
+_BRANCHES = {'first': '', 'middle': '├── ', 'last': '└── '}
+_INDENTS = {'first': '', 'middle': '│   ', 'last': '    '}
 
 
 class TreeNode(ABC):
@@ -272,33 +276,33 @@ class TreeNode(ABC):
 
         return relative_path
 
-    def to_string(self, prevprefix: str = '', position: str = 'first') -> str:
-        if position not in ['first', 'middle', 'last']:
+    def write(self, writer: TextIO, prevprefix: str = '',
+              position: str = 'first') -> None:
+        '''
+        Write a representation of the subtree rooted in this node to `writer`
+        (any object with a `write` method, e.g. a file), one line per node.
+        '''
+        if position not in _BRANCHES:
             raise ValueError('Invalid position')
 
-        # Node representation
-        prefix = ''
-        if position == 'last':
-            prefix += '└── '
-        elif position == 'middle':
-            prefix += '├── '
+        stack = [(self, prevprefix, position)]
+        while stack:
+            node, node_prevprefix, node_position = stack.pop()
+            writer.write(node_prevprefix + _BRANCHES[node_position] +
+                         str(node) + '\n')
 
-        result = prevprefix + prefix + str(self) + '\n'
+            # Modify the prefix for child nodes
+            child_prevprefix = node_prevprefix + _INDENTS[node_position]
+            last = len(node.children) - 1
+            # Reversed since the stack pops the last one first
+            for i in range(last, -1, -1):
+                stack.append((node.children[i], child_prevprefix,
+                              'last' if i == last else 'middle'))
 
-        child_prevprefix = prevprefix
-        if position == 'first':
-            child_prevprefix += ''
-        elif position == 'last':
-            child_prevprefix += '    '
-        elif position == 'middle':
-            child_prevprefix += '│   '
-
-        # Modify the prefix for child nodes │
-        for i, child in enumerate(self.children):
-            result += child.to_string(child_prevprefix,
-                                      'last' if i == len(self.children) - 1 else 'middle')
-
-        return result
+    def to_string(self, prevprefix: str = '', position: str = 'first') -> str:
+        result = io.StringIO()
+        self.write(result, prevprefix, position)
+        return result.getvalue()
 
     def prune(
             self,
@@ -405,6 +409,10 @@ class Tree(TreeNode):
     def get_leaves(self) -> List[TreeNode]:
         return self.get_root().get_leaves()
 
+    def write(self, writer: TextIO, prevprefix: str = '',
+              position: str = 'first') -> None:
+        self.get_root().write(writer, prevprefix, position)
+
     def to_string(self, prevprefix: str = '', position: str = 'first') -> str:
         return self.get_root().to_string(prevprefix, position)
 
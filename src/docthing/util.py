@@ -20,12 +20,14 @@ plugin directory.
 END FILE DOCUMENTATION '''
 
 import os
-import hashlib
-import pathlib
 import sys
+from typing import TYPE_CHECKING
 
 from .constants import SUPPORTED_PLUGIN_TYPES
 
+if TYPE_CHECKING:
+    import pathlib
+
 # =======================
 # COMMON UTILS
 # =======================
@@ -87,10 +89,12 @@ def sha256sum(string):
     '''
     Computes the SHA-256 hash of a given string.
     '''
+    import hashlib
+
     return hashlib.sha256(str.encode(string)).hexdigest()
 
 
-def get_datadir() -> pathlib.Path:
+def get_datadir() -> 'pathlib.Path':
     '''
     Returns a parent directory path
     where persistent application data can be stored.
@@ -101,6 +105,8 @@ def get_datadir() -> pathlib.Path:
 
     ref: https://stackoverflow.com/questions/19078969/python-getting-appdata-folder-in-a-cross-platform-way
     '''
+    import pathlib
+
     home = pathlib.Path.home()
 
     if sys.platform == 'win32':
@@ -118,6 +124,13 @@ def get_docthing_datadir():
     return get_datadir() / 'docthing'
 
 
+def get_docthing_cache_dir():
+    '''
+    Returns the path to the directory where docthing caches data between runs.
+    '''
+    return get_docthing_datadir() / 'cache'
+
+
 def get_docthing_plugin_dir(plugin_type=None):
     '''
     Returns the path to the docthing plugin directory.
@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: MIT
+''' BEGIN FILE DOCUMENTATION (level: 3)
+When a leaf of the _index file_ points to a directory, `docthing` looks for
+documentation in every file of that directory (and of its subdirectories) whose
+name ends with one of the `extensions` but not with one of the `iexts` listed
+in the `parser` section of the configuration.
+
+Suffixes can be made of more than one part: `iexts=test.{extensions}` with
+`extensions=js,ts` ignores `main.test.ts` but not `main.ts`. A suffix matches
+a whole file name too: `iexts=__init__.{extensions}` with `extensions=py`
+ignores `__init__.py`.
+
+The `walk_files` function walks the directory using `scandir` (which returns
+the type of each entry without an additional `stat` call on most platforms),
+never descends into pruned subtrees (hidden directories such as `.git` by
+default and, if requested, directories ignored by `.gitignore`-like files, see
+`docthing.ignore`) and yields files in a deterministic order: for each
+directory, first its files sorted by name, then the content of its
+subdirectories sorted by name.
+END FILE DOCUMENTATION '''
+
+import os
+from functools import lru_cache
+
+from .sourcefs.local import LOCAL_FS
+
+
+class SuffixMatcher():
+    '''
+    Matches file names against a set of (possibly multi-part) suffixes to
+    include and a set of suffixes to exclude.
+
+        Args:
+            extensions (str, list or None): The suffixes (without the leading dot)
+                a file name should end with. If None or empty every file matches.
+            ignored_extensions (str, list or None): The suffixes (without the
+                leading dot) of the file names to exclude.
+    '''
+
+    def __init__(self, extensions=None, ignored_extensions=None):
+        self.include = SuffixMatcher._compile(extensions)
+        self.exclude = SuffixMatcher._compile(ignored_extensions)
+
+    @staticmethod
+    def _compile(extensions):
+        '''
+        Converts a list of extensions into a tuple of dotted suffixes suitable
+        to be passed to `str.endswith`.
+        '''
+        if extensions is None:
+            return ()
+        if isinstance(extensions, str):
+            extensions = [extensions]
+        return tuple(sorted({'.' + str(ext).lstrip('.')
+                             for ext in extensions if str(ext).strip('.')}))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _cached(extensions, ignored_extensions):
+        return SuffixMatcher(list(extensions), list(ignored_extensions))
+
+    @staticmethod
+    def from_parser_config(parser_config):
+        '''
+        Returns the (cached) matcher for the `extensions` and `iexts` of the
+        given parser configuration.
+        '''
+        def _as_tuple(value):
+            if value is None:
+                return ()
+            if isinstance(value, (str, int, float)):
+                return (str(value),)
+            return tuple(str(v) for v in value)
+
+        return SuffixMatcher._cached(
+            _as_tuple(parser_config.get('extensions')),
+            _as_tuple(parser_config.get('iexts')))
+
+    def matches(self, filename):
+        '''
+        Returns whether the given file name should be included. A file name
+        equal to a suffix matches it too.
+        '''
+        # Suffixes are dotted: a leading dot matches them against the whole name
+        dotted = '.' + filename
+        if self.exclude and dotted.endswith(self.exclude):
+            return False
+        return not self.include or dotted.endswith(self.include)
+
+
+def _is_hidden_directory(entry):
+    return entry.name.startswith('.')
+
+
+def walk_files(root, matcher, prune_directory=_is_hidden_directory,
+               ignore_cache=None, source_fs=None):
+    '''
+    Recursively walks `root` and yields the paths of the files accepted by
+    `matcher` in a deterministic order.
+
+        Args:
+            root (str): The directory to walk.
+            matcher (SuffixMatcher): The matcher used to select the files.
+            prune_directory (callable): Given an `os.DirEntry` of a directory
+                returns whether its whole subtree should be skipped.
+            ignore_cache (IgnoreCache, optional): If provided, files and
+                directories ignored by `.gitignore`-like files are skipped (see
+                `docthing.ignore`). In this case yielded paths are absolute.
+            source_fs (SourceFS, optional): The file system to walk. Defaults to
+                the local disk.
+
+        Yields:
+            str: The path of each matching file.
+    '''
+    source_fs = source_fs or LOCAL_FS
+    if ignore_cache is not None:
+        root = os.path.abspath(root)
+
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        files = []
+        subdirectories = []
+        with source_fs.scandir(directory) as it:
+            entries = list(it)
+
+        ignore = None
+        if ignore_cache is not None:
+            ignore = ignore_cache.for_directory(
+                directory, {entry.name for entry in entries})
+            if ignore.empty:
+                ignore = None
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not prune_directory(entry) and \
+                        (ignore is None or not ignore.is_ignored(entry.path, True)):
+                    subdirectories.append(entry.path)
+            elif entry.is_file() and matcher.matches(entry.name) and \
+                    (ignore is None or not ignore.is_ignored(entry.path)):
+                files.append(entry.path)
+
+        yield from sorted(files)
+        # Reversed since the stack pops the last one first
+        stack.extend(sorted(subdirectories, reverse=True))
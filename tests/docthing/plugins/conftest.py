@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+from docthing.documentation_blob import DocumentationBlob
+from docthing.documentation_content import ResourceReference
+
+
+class ImageReference(ResourceReference):
+    '''
+    An image "compiled" to its source prefixed with `png:`.
+    '''
+
+    def __init__(self, source, use_hash=True):
+        super().__init__(source, 'image', use_hash)
+
+    def get_ext(self):
+        return 'png'
+
+    def compile(self):
+        return b'png:' + ''.join(self.source).encode()
+
+
+@pytest.fixture
+def image_reference():
+    return ImageReference
+
+
+@pytest.fixture
+def project_files():
+    '''
+    The files of the documented project (name -> content). Override it in the
+    test modules needing a different project.
+    '''
+    return {
+        'README.md': '# Quick\n\nInstall the package.\n',
+        'a.md': 'Parsing of index files.\n',
+        'b.md': 'The output writer.\n',
+        'docthing.jsonc': '''
+            {
+                "main-title": "Project",
+                "quick": "README.md",
+                "Modules": {"parser": "a.md", "output": "b.md"}
+            }
+        ''',
+    }
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch, project_files):
+    '''
+    Writes the documented project into `tmp_path/src` (outputs go next to it)
+    and returns its path.
+    '''
+    src = tmp_path / 'src'
+    src.mkdir()
+    for name, content in project_files.items():
+        (src / name).write_text(content)
+    monkeypatch.chdir(src)
+    return src
+
+
+@pytest.fixture
+def parser_config():
+    return {
+        'begin_doc': 'BEGIN FILE DOCUMENTATION',
+        'end_doc': 'END FILE DOCUMENTATION',
+        'doc_level': 1,
+        'extensions': [],
+        'iexts': [],
+        'peek_lines': 1,
+    }
+
+
+@pytest.fixture
+def blob(project, parser_config):
+    return DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+from schema import SchemaError
+
+from docthing.documentation_blob import DocumentationBlob
+from docthing.export_driver import ExportDriver
+from docthing.pipeline import StreamingPipeline
+from docthing.plugins.exporter.bundle import BundleExporter, anchor, shift_headings
+from docthing.plugins.exporter.markdown import MarkdownExporter
+from docthing.plugins.meta_interpreter.nav import MarkdownNAVInterpreter
+
+
+@pytest.fixture
+def project_files():
+    return {
+        'README.md': '# Quick\n\nquick start\n',
+        'INTRO.md': 'intro\n\n## Details\n\n```\n# not a heading\n```\n',
+        'a.md': 'module a\n',
+        'b.md': 'module b\n',
+        'docthing.jsonc': '''
+            {
+                "main-title": "Project",
+                "quick": "README.md",
+                "intro": "INTRO.md",
+                "Modules": {"a": "a.md", "b": "b.md"}
+            }
+        ''',
+    }
+
+
+def _export(blob, exporters, outdir):
+    StreamingPipeline(blob, [MarkdownNAVInterpreter()], exporters, str(outdir),
+                      window=2).run()
+
+
+def test_anchor():
+    assert anchor(['Project', 'My Modules', 'a.b']) == 'project-my-modules-a-b'
+
+
+def test_shift_headings():
+    lines = ['# Title\n', 'text\n', '```\n', '# code\n', '```\n', '###### Deep\n']
+    assert list(shift_headings(lines, 2)) == \
+        ['### Title\n', 'text\n', '```\n', '# code\n', '```\n', '###### Deep\n']
+
+
+def test_bundle_single_file(blob, tmp_path):
+    exporter = BundleExporter()
+    exporter.enable({})
+    _export(blob, [exporter], tmp_path / 'out')
+
+    assert os.listdir(tmp_path / 'out' / 'bundle') == ['handbook.md']
+    handbook = (tmp_path / 'out' / 'bundle' / 'handbook.md').read_text()
+
+    # Sections and leaves are in tree order with nested headings
+    headings = [line for line in handbook.splitlines() if line.startswith('#')]
+    assert headings == ['# Project', '## Quick', '## Introduction', '### Details',
+                        '# not a heading', '## Modules', '### a', '### b']
+
+    # Navigation links point to anchors in the bundle
+    assert '<a href="#project-introduction">Introduction</a>' in handbook
+    assert '<a id="project-introduction"></a>' in handbook
+    assert '<a href="#project-modules-b">b</a>' in handbook
+    assert '.md"' not in handbook
+
+
+def test_bundle_split_chapters(blob, tmp_path):
+    exporter = BundleExporter()
+    exporter.enable({'split': 'chapter'})
+    _export(blob, [exporter], tmp_path / 'out')
+
+    out = tmp_path / 'out' / 'bundle'
+    assert sorted(p for p in os.listdir(out) if p.endswith('.md')) == \
+        ['Introduction.md', 'Modules.md', 'Quick Start.md']
+    modules = (out / 'Modules.md').read_text()
+    assert [line for line in modules.splitlines() if line.startswith('#')] == \
+        ['# Modules', '## a', '## b']
+    # Links across chapters point to the other file
+    assert '<a href="Introduction.md#project-introduction">Introduction</a>' in modules
+    assert '<a href="#project-modules-b">b</a>' in modules
+
+
+def test_bundle_invalid_config():
+    with pytest.raises(SchemaError):
+        BundleExporter().enable({'split': 'section'})
+
+
+def test_bundle_unchanged(project, blob, parser_config, tmp_path):
+    exporter = BundleExporter()
+    exporter.enable({})
+    _export(blob, [exporter], tmp_path / 'out')
+    handbook = tmp_path / 'out' / 'bundle' / 'handbook.md'
+    mtime = os.stat(handbook).st_mtime_ns
+
+    _export(DocumentationBlob(str(project / 'docthing.jsonc'), parser_config), [exporter],
+            tmp_path / 'out')
+
+    assert os.stat(handbook).st_mtime_ns == mtime
+    assert exporter.output_writer.skipped == 1
+    assert not [p for p in os.listdir(handbook.parent) if p.endswith('.tmp')]
+
+
+def test_bundle_with_other_exporters(blob, tmp_path):
+    exporter = BundleExporter()
+    exporter.enable({})
+    blob.unlazy()
+    ExportDriver([MarkdownExporter(), exporter], str(tmp_path / 'out')).export(blob)
+
+    handbook = (tmp_path / 'out' / 'bundle' / 'handbook.md').read_text()
+    assert handbook.index('module a') < handbook.index('module b')
+    assert (tmp_path / 'out' / 'markdown' / 'Project' / 'Modules' / 'a.md').exists()
@@ -107,6 +107,7 @@ def test_export(
                         return_value="Section 1.1")),
                 ]),
                 replace_resources_with_imports=MagicMock(),
+                with_resources_replaced=MagicMock(),
                 get_content=MagicMock(return_value=[]),
             )
         ]
@@ -119,8 +120,9 @@ def test_export(
     mock_documentation_blob.unlazy.assert_called_once()
     mock_mkdir_silent.assert_any_call(str(output_dir))
     leaf = mock_documentation_blob.get_leaves.return_value[0]
-    leaf.replace_resources_with_imports.assert_called_with(
+    leaf.with_resources_replaced.assert_called_with(
         exporter.import_function)
+    leaf.replace_resources_with_imports.assert_not_called()
 
 
 def test_export_leaf_resources(mock_documentation_blob, tmp_path):
@@ -145,7 +147,7 @@ def test_export_leaf_resources(mock_documentation_blob, tmp_path):
 
         # Assertions
         assert mock_write.call_count == 2
-        mock_write.assert_any_call(str(output_file_no_ext))
+        mock_write.assert_any_call(str(output_file_no_ext), exporter.output_writer)
 
 
 def test_import_function():
@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: MIT
+
+import json
+import shutil
+
+import pytest
+
+from docthing.documentation_content import ResourceReference
+from docthing.export_driver import ExportDriver
+from docthing.pipeline import StreamingPipeline
+from docthing.plugins.exporter.jsonl import JSONL_FILE, JSONLinesExporter
+from docthing.plugins.exporter.jsonl import StoredResourceReference, read_blob, read_records
+from docthing.plugins.exporter.markdown import MarkdownExporter
+from docthing.plugins.meta_interpreter.nav import MarkdownNAVInterpreter, MarkdownNAVReference
+
+
+def _export(blob, image_reference, outdir):
+    blob.unlazy()
+    MarkdownNAVInterpreter().interpret(blob)
+    for leaf in blob.get_leaves()[1:]:
+        leaf.get_content().append_resource(image_reference(['diagram']))
+    ExportDriver([MarkdownExporter(), JSONLinesExporter()], str(outdir)).export(blob)
+    return outdir / 'jsonl' / JSONL_FILE
+
+
+def test_jsonl_records(blob, image_reference, parser_config, tmp_path):
+    records = list(read_records(_export(blob, image_reference, tmp_path / 'out')))
+
+    assert records[0]['parser'] == parser_config
+    assert [r['path'] for r in records[1:]] == [
+        ['Project'], ['Project', 'Quick Start'], ['Project', 'Modules'],
+        ['Project', 'Modules', 'parser'], ['Project', 'Modules', 'output']]
+    assert [r['leaf'] for r in records[1:]] == [False, True, False, True, True]
+
+    parser = records[4]
+    assert parser['options']['level'] == 0
+    assert 'Parsing of index files.\n' in parser['content']
+    images = [c for r in records[1:] for c in r.get('content', [])
+              if isinstance(c, dict) and c['type'] == 'image']
+    # The compiled resource is stored only the first time
+    assert len(images) == 2
+    assert images[0]['encoding'] == 'base64' and 'data' not in images[1]
+    assert images[0]['hash'] == images[1]['hash']
+
+
+def test_jsonl_read_blob(project, blob, image_reference, parser_config, tmp_path):
+    jsonl = _export(blob, image_reference, tmp_path / 'out')
+    # The project is not needed to read the blob back
+    shutil.rmtree(project)
+
+    blob = read_blob(str(jsonl))
+    assert not blob.is_lazy()
+    assert blob.parser_config == parser_config
+    leaves = blob.get_leaves()
+    assert [leaf.get_title() for leaf in leaves] == ['Quick Start', 'parser', 'output']
+    resources = [line for line in leaves[1].get_content() if isinstance(line, ResourceReference)]
+    assert any(isinstance(r, MarkdownNAVReference) for r in resources)
+    image, = [r for r in resources if isinstance(r, StoredResourceReference)]
+    assert image.get_compiled() == b'png:diagram'
+    assert image.get_path() == image_reference(['diagram']).get_path()
+
+    # Exporting the blob read back gives the same output
+    StreamingPipeline(blob, [], [MarkdownExporter()], str(tmp_path / 'again')).run()
+    for name in ['Project/Quick Start.md', 'Project/Modules/parser.md',
+                 'Project/Modules/output' + image.get_path()]:
+        assert (tmp_path / 'again' / 'markdown' / name).read_bytes() == \
+            (tmp_path / 'out' / 'markdown' / name).read_bytes()
+
+
+def test_jsonl_unhashed_resources(blob, image_reference, tmp_path):
+    blob.unlazy()
+    for leaf in blob.get_leaves():
+        leaf.get_content().append_resource(image_reference([leaf.get_title()], use_hash=False))
+    ExportDriver([JSONLinesExporter()], str(tmp_path / 'out')).export(blob)
+
+    # Resources without a hash are never deduplicated
+    leaves = read_blob(str(tmp_path / 'out' / 'jsonl' / JSONL_FILE)).get_leaves()
+    assert [line.get_compiled() for leaf in leaves for line in leaf.get_content()
+            if isinstance(line, ResourceReference)] == \
+        [b'png:Quick Start', b'png:parser', b'png:output']
+
+
+def test_jsonl_invalid_file(tmp_path):
+    path = tmp_path / 'other.jsonl'
+    path.write_text(json.dumps({'format': 'other'}) + '\n')
+    with pytest.raises(ValueError):
+        read_blob(str(path))
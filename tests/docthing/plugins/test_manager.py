@@ -1,6 +1,6 @@
 # SPDX-License-Identifier: MIT
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 from schema import Schema
 
 from docthing.plugins.manager import PluginManager
@@ -71,6 +71,17 @@ class MockPlugin2(PluginInterface):
         self.configured = True
 
 
+@pytest.fixture(autouse=True)
+def plugin_cache_dir(tmp_path, monkeypatch):
+    """
+    Fixture to keep the plugin registry cache out of the user data directory.
+    """
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr("docthing.plugins.manager.get_docthing_cache_dir",
+                        lambda: str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture
 def mock_plugin_dir(tmp_path):
     """
@@ -163,52 +174,147 @@ def test_disable_plugins(mock_get_dir, mock_plugins, tmp_path):
 
 
 @patch("docthing.util.SUPPORTED_PLUGIN_TYPES", new=["mock_type"])
-@patch("os.listdir")
-@patch("os.path.isdir")
-def test_get_plugins_from_plugin_dir(mock_isdir, mock_listdir, tmp_path):
+def test_enable_plugins_invalid_type(mock_plugins):
     """
-    Test retrieving plugins from the plugin directory.
+    Test enabling plugins with an invalid type.
     """
-    mock_isdir.return_value = True
-    mock_listdir.return_value = [
-        "plugin1.py", "plugin2.py", "not_a_plugin.txt"]
+    manager = PluginManager("mock_type", builtin_plugins=mock_plugins)
+
+    with pytest.raises(ValueError, match="Plugins must be a list of plugin names."):
+        manager.enable_plugins(plugins=123)
 
-    manager = PluginManager("mock_type")
-    plugins = manager._get_plugins_from_plugin_dir()
 
-    assert "plugin1.py" in plugins
-    assert "plugin2.py" in plugins
-    assert "not_a_plugin.txt" not in plugins
+PLUGIN_FILE = """
+from docthing.plugins.plugin_interface import PluginInterface
 
+with open({log!r}, "a") as f:
+    f.write(__name__ + "\\n")
 
-@patch("docthing.util.SUPPORTED_PLUGIN_TYPES", new=["mock_type"])
-@patch("importlib.util.spec_from_file_location")
-@patch("importlib.util.module_from_spec")
-def test_load_from_file(mock_module_from_spec, mock_spec_from_file_location):
+
+class FilePlugin(PluginInterface):
+    def _enable(self):
+        pass
+
+    def _disable(self):
+        pass
+
+    def get_name(self):
+        return "{name}"
+
+    def get_description(self):
+        return "A plugin living in the plugin directory."
+
+    def get_dependencies(self):
+        return []
+"""
+
+
+@pytest.fixture
+def file_plugins(tmp_path, monkeypatch):
     """
-    Test loading a plugin from a file.
+    Fixture to create a plugin directory with two plugin files; returns a
+    function listing the ones that were imported.
     """
-    mock_spec = MagicMock()
-    mock_spec_from_file_location.return_value = mock_spec
+    plugin_dir = tmp_path / "plugins"
+    plugin_dir.mkdir()
+    log = tmp_path / "imported.log"
+    log.write_text("")
+    for name in ["first", "second"]:
+        (plugin_dir / f"{name}.py").write_text(
+            PLUGIN_FILE.format(name=name, log=str(log)))
+    monkeypatch.setattr("docthing.plugins.manager.get_docthing_plugin_dir",
+                        lambda plugin_type: str(plugin_dir))
+    return lambda: log.read_text().split()
 
-    mock_module = MagicMock()
-    mock_module_from_spec.return_value = mock_module
 
-    mock_module.Plugin1 = MockPlugin1
+def test_only_requested_plugins_are_imported(file_plugins, mock_plugins):
+    """
+    Test that plugins in the plugin directory are imported only if enabled.
+    """
+    manager = PluginManager("exporter", builtin_plugins=mock_plugins)
+    manager.enable_plugins(plugins=["second", "MockPlugin1"],
+                           configs={"MockPlugin1": {"key": {}}})
 
-    manager = PluginManager("mock_type")
-    manager._load_from_file("mock_path/plugin1.py")
+    assert file_plugins() == ["second"]
+    assert sorted(p.get_name() for p in manager.get_plugins()) == \
+        ["MockPlugin1", "second"]
 
-    assert len(manager.plugins) == 1
-    assert isinstance(manager.plugins[0], MockPlugin1)
 
+def test_enable_all_imports_every_plugin(file_plugins):
+    """
+    Test that enabling all plugins imports the builtin and file plugins.
+    """
+    manager = PluginManager("exporter")
+    manager.enable_plugins(plugins="all")
 
-@patch("docthing.util.SUPPORTED_PLUGIN_TYPES", new=["mock_type"])
-def test_enable_plugins_invalid_type(mock_plugins):
+    assert sorted(file_plugins()) == ["first", "second"]
+    assert {"markdown", "first", "second"} <= {
+        p.get_name() for p in manager.get_plugins()}
+
+
+def test_builtin_plugins_are_imported_on_demand(tmp_path, monkeypatch):
     """
-    Test enabling plugins with an invalid type.
+    Test that builtin plugins are found through the registry.
     """
-    manager = PluginManager("mock_type", builtin_plugins=mock_plugins)
+    monkeypatch.setattr("docthing.plugins.manager.get_docthing_plugin_dir",
+                        lambda plugin_type: str(tmp_path / "plugins"))
+    manager = PluginManager("meta-interpreter")
+    manager.enable_plugins(plugins=["nav.md"])
 
-    with pytest.raises(ValueError, match="Plugins must be a list of plugin names."):
-        manager.enable_plugins(plugins=123)
+    assert [p.get_name() for p in manager.get_plugins()] == ["nav.md"]
+
+
+def test_plugin_dir_overrides_builtin_plugins(file_plugins, tmp_path):
+    """
+    Test that a plugin named as a builtin one replaces it.
+    """
+    (tmp_path / "plugins" / "markdown.py").write_text(
+        PLUGIN_FILE.format(name="markdown", log=str(tmp_path / "imported.log")))
+    manager = PluginManager("exporter")
+    manager.enable_plugins(plugins=["markdown"])
+
+    assert file_plugins() == ["markdown"]
+    assert [type(p).__name__ for p in manager.get_plugins()] == ["FilePlugin"]
+
+
+DERIVED_PLUGIN_FILE = """
+from docthing.plugins.plugin_interface import PluginInterface
+
+
+class NotAPlugin:
+    def get_name(self):
+        return "fake"
+
+
+class Base(PluginInterface):
+    def get_name(self):
+        return "derived"
+
+
+class Derived(Base):
+    def _enable(self):
+        pass
+
+    def _disable(self):
+        pass
+
+    def get_description(self):
+        return "A plugin inheriting its name."
+
+    def get_dependencies(self):
+        return []
+"""
+
+
+def test_only_plugin_interface_subclasses_are_loaded(file_plugins, tmp_path):
+    """
+    Test that classes not implementing PluginInterface are skipped and that
+    subclasses inheriting `get_name` are found.
+    """
+    (tmp_path / "plugins" / "derived.py").write_text(DERIVED_PLUGIN_FILE)
+    manager = PluginManager("exporter")
+    manager.enable_plugins(plugins=["fake"])
+    assert manager.get_plugins() == []
+
+    manager.enable_plugins(plugins=["derived"])
+    assert [type(p).__name__ for p in manager.get_plugins()] == ["Derived"]
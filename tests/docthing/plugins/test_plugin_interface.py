@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from schema import Schema, SchemaError
 
+from docthing.dependencies import DEPENDENCIES
 from docthing.plugins.plugin_interface import PluginInterface
 
 
@@ -80,11 +81,16 @@ def test_plugin_dependencies_available(mock_plugin):
     """
     Test the are_dependencies_available method.
     """
-    with patch("shutil.which", return_value=True):
+    # Resolved paths are memoized: forget them before each check
+    DEPENDENCIES.clear()
+    with patch("shutil.which", side_effect=lambda x: "/usr/bin/" + x):
         assert mock_plugin.are_dependencies_available()
+        assert mock_plugin.get_dependency_path("git") == "/usr/bin/git"
 
-    with patch("shutil.which", side_effect=lambda x: x != "git"):
+    DEPENDENCIES.clear()
+    with patch("shutil.which", side_effect=lambda x: None if x == "git" else "/usr/bin/" + x):
         assert not mock_plugin.are_dependencies_available()
+    DEPENDENCIES.clear()
 
 
 def test_plugin_validate_config_success(mock_plugin):
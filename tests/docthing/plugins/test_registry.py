@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+from docthing.plugins import registry
+from docthing.plugins.registry import PluginRegistry, scan_plugin_file
+
+
+PLUGIN_SOURCE = '''
+import os
+
+class Helper:
+    pass
+
+
+class NamedPlugin:
+    def get_name(self):
+        return "named"
+
+
+class DynamicPlugin:
+    def get_name(self):
+        return os.environ.get("PLUGIN_NAME", "dynamic")
+'''
+
+
+@pytest.fixture
+def plugin_dir(tmp_path):
+    plugin_dir = tmp_path / 'plugins'
+    plugin_dir.mkdir()
+    (plugin_dir / 'plugin.py').write_text(PLUGIN_SOURCE)
+    (plugin_dir / 'notes.txt').write_text('not a plugin')
+    return plugin_dir
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    scanned = []
+
+    def _scan(path):
+        scanned.append(os.path.basename(path))
+        return scan_plugin_file(path)
+
+    monkeypatch.setattr(registry, 'scan_plugin_file', _scan)
+    return scanned
+
+
+def test_scan_plugin_file(plugin_dir):
+    assert scan_plugin_file(str(plugin_dir / 'plugin.py')) == [
+        {'class': 'NamedPlugin', 'name': 'named'},
+        {'class': 'DynamicPlugin', 'name': None},
+    ]
+
+
+def test_scan_plugin_file_syntax_error(tmp_path):
+    (tmp_path / 'broken.py').write_text('class :')
+    assert scan_plugin_file(str(tmp_path / 'broken.py')) == []
+
+
+def test_manifest(plugin_dir):
+    reg = PluginRegistry('exporter', plugin_dir)
+
+    assert reg.find('markdown')['value'] == \
+        'docthing.plugins.exporter.markdown:MarkdownExporter'
+    assert reg.find('named')['class'] == 'NamedPlugin'
+    assert reg.find('missing') is None
+    assert [spec['class'] for spec in reg.get_unnamed()] == ['DynamicPlugin']
+
+
+def test_manifest_is_cached_by_mtime(plugin_dir, tmp_path, scans):
+    cache_path = tmp_path / 'cache' / 'plugins.json'
+
+    PluginRegistry('exporter', plugin_dir, cache_path).get_manifest()
+    assert scans == ['plugin.py']
+    assert cache_path.exists()
+
+    # Unchanged files are not scanned again
+    PluginRegistry('exporter', plugin_dir, cache_path).get_manifest()
+    assert scans == ['plugin.py']
+
+    # Changed and new files are
+    (plugin_dir / 'plugin.py').write_text(PLUGIN_SOURCE + '\n# changed\n')
+    (plugin_dir / 'other.py').write_text(
+        'class Other:\n    def get_name(self):\n        return "other"\n')
+    reg = PluginRegistry('exporter', plugin_dir, cache_path)
+    assert reg.find('other') is not None
+    assert sorted(scans) == ['other.py', 'plugin.py', 'plugin.py']
+
+
+def test_entry_points_are_cached(plugin_dir, tmp_path, monkeypatch):
+    calls = []
+
+    class EntryPoint():
+        name = 'ep'
+        value = 'docthing.plugins.exporter.markdown:MarkdownExporter'
+
+    class EntryPoints(list):
+        def select(self, group):
+            calls.append(group)
+            return [EntryPoint()]
+
+    monkeypatch.setattr('importlib.metadata.entry_points',
+                        lambda: EntryPoints())
+    cache_path = tmp_path / 'cache' / 'plugins.json'
+
+    reg = PluginRegistry('exporter', plugin_dir, cache_path)
+    assert reg.find('ep')['value'] == EntryPoint.value
+    assert calls == ['docthing.exporter']
+
+    reg = PluginRegistry('exporter', plugin_dir, cache_path)
+    assert reg.find('ep') is not None
+    assert calls == ['docthing.exporter']
+
+
+def test_load_class(plugin_dir):
+    reg = PluginRegistry('exporter', plugin_dir)
+
+    from docthing.plugins.exporter.markdown import MarkdownExporter
+    assert reg.load_class(reg.find('markdown')) is MarkdownExporter
+
+    named = reg.load_class(reg.find('named'))
+    assert named.__name__ == 'NamedPlugin'
+    # The file is executed only once
+    assert reg.load_class(reg.get_unnamed()[0]).__module__ == named.__module__
+    assert len(reg.modules) == 1
+
+
+def test_scan_plugin_file_inheritance(tmp_path):
+    (tmp_path / 'plugins.py').write_text('''
+from docthing.plugins.plugin_interface import PluginInterface
+from elsewhere import Base
+
+
+class Plain:
+    pass
+
+
+class Named(PluginInterface):
+    def get_name(self):
+        return "named"
+
+
+class Inherited(Named):
+    pass
+
+
+class Unknown(Base):
+    pass
+''')
+    assert scan_plugin_file(str(tmp_path / 'plugins.py')) == [
+        {'class': 'Named', 'name': 'named'},
+        {'class': 'Inherited', 'name': 'named'},
+        {'class': 'Unknown', 'name': None},
+    ]
+
+
+def test_plugin_dir_overrides_builtin(plugin_dir):
+    (plugin_dir / 'markdown.py').write_text(
+        'class Markdown:\n    def get_name(self):\n        return "markdown"\n')
+    reg = PluginRegistry('exporter', plugin_dir)
+
+    assert reg.find('markdown')['class'] == 'Markdown'
+    assert [spec.get('value') for spec in reg.find_all('markdown')] == \
+        [None, 'docthing.plugins.exporter.markdown:MarkdownExporter']
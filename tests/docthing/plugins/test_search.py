@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: MIT
+
+import io
+import json
+import time
+
+import pytest
+
+from docthing.export_driver import ExportDriver
+from docthing.plugins.exporter.markdown import MarkdownExporter
+from docthing.plugins.exporter.search import INDEX_FILE, TITLE_WEIGHT
+from docthing.plugins.exporter.search import SearchIndex, SearchIndexExporter, tokenize
+from docthing.plugins.meta_interpreter.nav import MarkdownNAVInterpreter
+
+
+@pytest.fixture
+def project_files(project_files):
+    project_files['a.md'] = 'Parsing of <b>index</b> files, see [here](parser.md).\n'
+    project_files['b.md'] = 'The parser parses the parser output.\n'
+    return project_files
+
+
+def _postings(index, term):
+    '''
+    Decodes the postings of `term` to a dict: path -> score.
+    '''
+    res = {}
+    doc_id = 0
+    encoded = index['terms'][term]
+    for delta, score in zip(encoded[::2], encoded[1::2]):
+        doc_id += delta
+        res[index['docs'][doc_id][0]] = score
+    return res
+
+
+def test_tokenize():
+    assert tokenize('The <span class="x">Parser</span> [parses](a/b.md) a_b x') == \
+        ['the', 'parser', 'parses', 'a_b']
+
+
+def test_search_index_exporter(blob, tmp_path):
+    nav = MarkdownNAVInterpreter()
+    nav.interpret(blob)
+
+    exporter = SearchIndexExporter()
+    ExportDriver([MarkdownExporter(), exporter], str(tmp_path / 'out')).export(blob)
+
+    index = json.loads((tmp_path / 'out' / 'search' / INDEX_FILE).read_text())
+    assert index['docs'] == [['Project/Quick Start', 'Quick Start'],
+                             ['Project/Modules/parser', 'parser'],
+                             ['Project/Modules/output', 'output']]
+    assert _postings(index, 'parser') == {
+        'Project/Modules/parser': TITLE_WEIGHT, 'Project/Modules/output': 2}
+    assert _postings(index, 'install') == {'Project/Quick Start': 1}
+    # Markup and navigation links are not indexed
+    assert 'md' not in index['terms']
+    assert 'nav' not in index['terms']
+    assert (tmp_path / 'out' / 'markdown' / 'Project' / 'Modules' / 'parser.md').exists()
+
+
+def test_search_index_any_order():
+    index = SearchIndex()
+    ids = [index.add_document(f'doc{i}', f'doc{i}') for i in range(3)]
+    for doc_id in reversed(ids):
+        index.index(doc_id, '', ['word'] * (doc_id + 1))
+
+    f = io.StringIO()
+    index.write(f)
+    assert json.loads(f.getvalue())['terms']['word'] == [0, 1, 1, 2, 1, 3]
+
+
+def test_search_index_scale():
+    index = SearchIndex()
+    words = [f'word{i}' for i in range(5000)]
+    start = time.perf_counter()
+    for i in range(100000):
+        doc_id = index.add_document(f'doc{i}', f'Document {i}')
+        index.index(doc_id, f'Document {i}',
+                    [' '.join(words[(i * 7 + j) % len(words)] for j in range(5)) + '\n'])
+    f = io.StringIO()
+    index.write(f)
+    elapsed = time.perf_counter() - start
+
+    res = json.loads(f.getvalue())
+    assert len(res['docs']) == 100000
+    assert sum(res['terms']['document'][::2]) == 99999
+    assert elapsed < 30
@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: MIT
+
+import json
+import sqlite3
+
+import pytest
+from schema import SchemaError
+
+from docthing.export_driver import ExportDriver
+from docthing.plugins.exporter.sqlite import DATABASE_FILE, SQLiteExporter
+
+
+@pytest.fixture
+def blob(blob, image_reference):
+    blob.unlazy()
+    # The same resource in two leaves
+    for leaf in blob.get_leaves()[1:]:
+        leaf.get_content().append_resource(image_reference(['diagram']))
+    return blob
+
+
+def _export(blob, tmp_path, config):
+    exporter = SQLiteExporter()
+    exporter.enable(config)
+    ExportDriver([exporter], str(tmp_path / 'out')).export(blob)
+    return sqlite3.connect(tmp_path / 'out' / 'sqlite' / DATABASE_FILE)
+
+
+def test_sqlite_exporter(blob, image_reference, tmp_path):
+    db = _export(blob, tmp_path, {})
+
+    nodes = db.execute('SELECT id, parent_id, path, depth, is_leaf FROM nodes ORDER BY id').fetchall()
+    assert nodes == [
+        (1, None, 'Project', 0, 0),
+        (2, 1, 'Project/Quick Start', 1, 1),
+        (3, 1, 'Project/Modules', 1, 0),
+        (4, 3, 'Project/Modules/parser', 2, 1),
+        (5, 3, 'Project/Modules/output', 2, 1),
+    ]
+    options, = db.execute('SELECT options FROM nodes WHERE id = 4').fetchone()
+    assert json.loads(options)['level'] == 0
+
+    text, = db.execute('SELECT text FROM content WHERE node_id = 4').fetchone()
+    resource = image_reference(['diagram'])
+    assert text == 'Parsing of index files.\n' + str(resource)
+
+    # Resources are stored once
+    assert db.execute('SELECT hash, type, ext, data FROM resources').fetchall() == \
+        [(resource.get_hash(), 'image', 'png', b'png:diagram')]
+    assert db.execute('SELECT node_id, position FROM node_resources').fetchall() == \
+        [(4, 0), (5, 0)]
+    assert db.execute("SELECT name FROM sqlite_master WHERE name = 'content_fts'").fetchall() == []
+
+
+def test_sqlite_exporter_fts(blob, tmp_path):
+    db = _export(blob, tmp_path, {'fts': True})
+
+    assert db.execute(
+        "SELECT path FROM content_fts JOIN nodes ON nodes.id = content_fts.rowid "
+        "WHERE content_fts MATCH 'install'").fetchall() == [('Project/Quick Start',)]
+
+
+def test_sqlite_exporter_rebuild(blob, tmp_path):
+    _export(blob, tmp_path, {}).close()
+    db = _export(blob, tmp_path, {})
+
+    assert db.execute('SELECT COUNT(*) FROM nodes').fetchone() == (5,)
+    assert [p.name for p in (tmp_path / 'out' / 'sqlite').iterdir()] == [DATABASE_FILE]
+
+
+def test_sqlite_exporter_unhashed_resources(blob, image_reference, tmp_path):
+    for leaf in blob.get_leaves():
+        leaf.get_content().append_resource(image_reference([leaf.get_title()], use_hash=False))
+    db = _export(blob, tmp_path, {})
+
+    assert db.execute(
+        'SELECT node_id, position, data FROM node_resources JOIN resources USING (hash) '
+        'WHERE type = ? ORDER BY node_id, position', ('image',)).fetchall() == [
+        (2, 0, b'png:Quick Start'),
+        (4, 0, b'png:diagram'), (4, 1, b'png:parser'),
+        (5, 0, b'png:diagram'), (5, 1, b'png:output')]
+
+
+def test_sqlite_exporter_invalid_config():
+    with pytest.raises(SchemaError):
+        SQLiteExporter().enable({'fts': 'yes'})
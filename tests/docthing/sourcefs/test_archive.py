@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: MIT
+
+import io
+import os
+import tarfile
+import zipfile
+import pytest
+
+from docthing.documentation_blob import DocumentationBlob
+from docthing.sourcefs.archive import ArchiveFS
+from docthing.sourcefs.sourcefs_interface import FILE, DIRECTORY
+
+
+FILES = {
+    'docthing.jsonc': '{"main-title": "Project", "quick": "README.md", "Docs": "docs"}',
+    'README.md': 'readme\n',
+    'docs/a.md': 'a\n',
+    'docs/sub/b.md': 'b\n',
+}
+
+
+def _write_zip(path, prefix=''):
+    with zipfile.ZipFile(path, 'w') as z:
+        for name, content in FILES.items():
+            z.writestr(prefix + name, content)
+
+
+def _write_tar(path, src_dir, prefix=''):
+    with tarfile.open(path, 'w:gz') as t:
+        for name in FILES:
+            t.add(os.path.join(src_dir, name), arcname=prefix + name)
+
+
+@pytest.fixture(params=['zip', 'tar', 'tar-with-prefix'])
+def archive(request, tmp_path):
+    src = tmp_path / 'src'
+    for name, content in FILES.items():
+        (src / name).parent.mkdir(parents=True, exist_ok=True)
+        (src / name).write_text(content)
+
+    if request.param == 'zip':
+        path = tmp_path / 'project.zip'
+        _write_zip(path)
+    else:
+        path = tmp_path / 'project.tar.gz'
+        prefix = 'project-1.0/' if request.param == 'tar-with-prefix' else ''
+        _write_tar(path, str(src), prefix)
+    return str(path)
+
+
+def test_archive_fs(archive, tmp_path):
+    mount = tmp_path / 'mount'
+    with ArchiveFS(archive, str(mount)) as fs:
+        assert fs.isfile(str(mount / 'README.md'))
+        assert fs.isdir(str(mount / 'docs' / 'sub'))
+        assert fs.isdir(str(mount))
+        assert not fs.exists(str(mount / 'missing.md'))
+        with fs.scandir(str(mount / 'docs')) as it:
+            assert sorted(e.name for e in it) == ['a.md', 'sub']
+        with fs.open(str(mount / 'docs' / 'sub' / 'b.md')) as f:
+            assert f.read() == 'b\n'
+        assert fs.stat_many([str(mount / 'README.md'),
+                             str(mount / 'docs'),
+                             str(mount / 'missing.md'),
+                             str(tmp_path / 'outside')]) == {
+            str(mount / 'README.md'): FILE,
+            str(mount / 'docs'): DIRECTORY,
+            str(mount / 'missing.md'): None,
+            str(tmp_path / 'outside'): None,
+        }
+
+
+def test_blob_from_archive(archive, tmp_path, monkeypatch):
+    mount = tmp_path / 'mount'
+    mount.mkdir()
+    monkeypatch.chdir(mount)
+    parser_config = {'extensions': ['md'], 'iexts': [], 'doc_level': 0}
+    with ArchiveFS(archive) as fs:
+        blob = DocumentationBlob('docthing.jsonc', parser_config, fs)
+        blob.unlazy()
+
+    quick, docs = blob.get_leaves()
+    assert quick.get_content().content == ['readme\n']
+    assert docs.get_content().content == ['a\n', 'b\n']
+
+
+@pytest.mark.parametrize('mode', ['w:gz', 'w:bz2', 'w:xz'])
+def test_archive_fs_compressed_tar_random_access(tmp_path, mode):
+    path = tmp_path / 'project.tar'
+    with tarfile.open(path, mode) as t:
+        for i in range(20):
+            data = f'file {i}\n'.encode()
+            info = tarfile.TarInfo(f'f{i}.md')
+            info.size = len(data)
+            t.addfile(info, io.BytesIO(data))
+
+    with ArchiveFS(str(path), str(tmp_path)) as fs:
+        # Members are read from the decompressed copy, not from the stream
+        assert fs.archive.fileobj is fs.decompressed
+        for i in reversed(range(20)):
+            with fs.open(str(tmp_path / f'f{i}.md')) as f:
+                assert f.read() == f'file {i}\n'
+
+
+def test_archive_fs_invalid(tmp_path):
+    path = tmp_path / 'not-an-archive.txt'
+    path.write_text('hello')
+    with pytest.raises(ValueError):
+        ArchiveFS(str(path))
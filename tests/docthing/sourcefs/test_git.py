@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+import subprocess as sp
+import sys
+
+import pytest
+
+import docthing
+from docthing.documentation_blob import DocumentationBlob
+from docthing.sourcefs.git import GitRevisionFS
+
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None,
+                                reason='git is not available')
+
+
+def _git(repo, *args):
+    sp.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+           + list(args), cwd=repo, check=True, stdout=sp.PIPE)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, 'init', '-q')
+    (tmp_path / 'docthing.jsonc').write_text(
+        '{"main-title": "Project", "quick": "README.md", "Docs": "docs"}')
+    (tmp_path / 'README.md').write_text('old readme\n')
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'a.md').write_text('old a\n')
+    (tmp_path / 'docs' / 'sub').mkdir()
+    (tmp_path / 'docs' / 'sub' / 'b.md').write_text('old b\n')
+    _git(tmp_path, 'add', '-A')
+    _git(tmp_path, 'commit', '-q', '-m', 'first')
+    _git(tmp_path, 'tag', 'v1')
+
+    (tmp_path / 'README.md').write_text('new readme\n')
+    (tmp_path / 'docs' / 'sub' / 'b.md').unlink()
+    (tmp_path / 'docs' / 'c.md').write_text('new c\n')
+    return tmp_path
+
+
+def test_git_revision_fs_stat_and_listing(repo):
+    with GitRevisionFS('v1', str(repo)) as fs:
+        assert fs.isfile(str(repo / 'README.md'))
+        assert fs.isdir(str(repo / 'docs'))
+        assert fs.isdir(str(repo))
+        assert not fs.exists(str(repo / 'docs' / 'c.md'))
+        assert fs.isfile(str(repo / 'docs' / 'sub' / 'b.md'))
+        with fs.scandir(str(repo / 'docs')) as it:
+            assert sorted(e.name for e in it) == ['a.md', 'sub']
+        with fs.open(str(repo / 'README.md')) as f:
+            assert f.readlines() == ['old readme\n']
+
+
+def test_git_revision_fs_outside_repository(repo, tmp_path_factory):
+    outside = tmp_path_factory.mktemp('outside')
+    with GitRevisionFS('v1', str(repo)) as fs:
+        assert not fs.exists(str(outside / 'file'))
+        with pytest.raises(FileNotFoundError):
+            fs.open(str(outside / 'file'))
+
+
+def test_git_revision_fs_invalid_revision(repo):
+    with pytest.raises(ValueError, match='unknown revision does-not-exist'):
+        GitRevisionFS('does-not-exist', str(repo))
+
+
+def test_cli_invalid_revision(repo):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(docthing.__file__))
+    completed_process = sp.run(
+        [sys.executable, '-m', 'docthing', '--rev', 'does-not-exist', str(repo)],
+        cwd=repo, stdout=sp.PIPE, stderr=sp.PIPE, env=env)
+
+    assert completed_process.returncode == 1
+    assert completed_process.stderr.decode() == 'Error: unknown revision does-not-exist.\n'
+
+
+def test_git_revision_fs_large_file(repo, monkeypatch):
+    # Spooled to a temporary file instead of memory
+    monkeypatch.setattr('docthing.sourcefs.git._SPOOL_SIZE', 4)
+    monkeypatch.setattr('docthing.sourcefs.git._BLOCK_SIZE', 3)
+    with GitRevisionFS('v1', str(repo)) as fs:
+        with fs.open(str(repo / 'README.md')) as f:
+            assert f.read() == 'old readme\n'
+        assert fs.isfile(str(repo / 'docs' / 'a.md'))
+
+
+def test_blob_from_revision(repo):
+    parser_config = {'extensions': ['md'], 'iexts': [], 'doc_level': 0}
+    with GitRevisionFS('v1', str(repo)) as fs:
+        cwd = os.getcwd()
+        os.chdir(repo)
+        try:
+            blob = DocumentationBlob(str(repo / 'docthing.jsonc'),
+                                     parser_config, fs)
+            blob.unlazy()
+        finally:
+            os.chdir(cwd)
+
+    quick, docs = blob.get_leaves()
+    assert quick.get_content().content == ['old readme\n']
+    assert docs.get_content().content == ['old a\n', 'old b\n']
+
+
+def test_git_revision_fs_ignore_files_up_to_repository_root(repo):
+    # The repository root is the top level even if trees have no `.git`
+    (repo / '.gitignore').write_text('b.md\n')
+    _git(repo, 'add', '.gitignore')
+    _git(repo, 'commit', '-q', '-m', 'ignore')
+    with GitRevisionFS('HEAD', str(repo)) as fs:
+        assert fs.is_repository_root(str(repo))
+        assert not fs.is_repository_root(str(repo / 'docs'))
+        matcher = fs.get_ignore_cache().for_directory(str(repo / 'docs'))
+        assert matcher.is_ignored(str(repo / 'docs' / 'sub' / 'b.md'))
+        assert matcher.parent.parent is None
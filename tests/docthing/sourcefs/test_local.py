@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: MIT
+
+import os
+
+from docthing.sourcefs.local import LocalFS
+from docthing.sourcefs.sourcefs_interface import FILE, DIRECTORY
+
+
+def test_local_stat_many_lists_each_parent_once(tmp_path, monkeypatch):
+    (tmp_path / 'a.md').write_text('')
+    (tmp_path / 'b.md').write_text('')
+    (tmp_path / 'dir').mkdir()
+    (tmp_path / 'dir' / 'c.md').write_text('')
+
+    scanned = []
+    original_scandir = os.scandir
+
+    def _scandir(path):
+        scanned.append(path)
+        return original_scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', _scandir)
+    paths = [str(tmp_path / 'a.md'), str(tmp_path / 'b.md'),
+             str(tmp_path / 'dir'), str(tmp_path / 'missing'),
+             str(tmp_path / 'dir' / 'c.md')]
+
+    assert LocalFS().stat_many(paths) == {
+        str(tmp_path / 'a.md'): FILE,
+        str(tmp_path / 'b.md'): FILE,
+        str(tmp_path / 'dir'): DIRECTORY,
+        str(tmp_path / 'missing'): None,
+        str(tmp_path / 'dir' / 'c.md'): FILE,
+    }
+    assert scanned == [str(tmp_path)]
+
+
+def test_local_stat_many_parent_not_listed(tmp_path, monkeypatch):
+    (tmp_path / 'a.md').write_text('')
+    (tmp_path / 'dir').mkdir()
+
+    def _scandir(path):
+        raise PermissionError(path)
+
+    # The paths are checked one by one instead
+    monkeypatch.setattr(os, 'scandir', _scandir)
+    assert LocalFS().stat_many([str(tmp_path / 'a.md'), str(tmp_path / 'dir'),
+                                str(tmp_path / 'missing')]) == {
+        str(tmp_path / 'a.md'): FILE,
+        str(tmp_path / 'dir'): DIRECTORY,
+        str(tmp_path / 'missing'): None,
+    }
+
+
+def test_local_stat_many_name_not_listed(tmp_path, monkeypatch):
+    (tmp_path / 'a.md').write_text('')
+    (tmp_path / 'b.md').write_text('')
+
+    # As on a case-insensitive file system where `a.md` is listed as `A.md`
+    monkeypatch.setattr(LocalFS, '_list_types', lambda self, directory: {'A.md': FILE})
+    assert LocalFS().stat_many([str(tmp_path / 'a.md'), str(tmp_path / 'b.md'),
+                                str(tmp_path / 'missing')]) == {
+        str(tmp_path / 'a.md'): FILE,
+        str(tmp_path / 'b.md'): FILE,
+        str(tmp_path / 'missing'): None,
+    }
@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: MIT
+
+from docthing.documentation_blob import DocumentationBlob, DocumentationNode
+from docthing.sourcefs.local import LocalFS
+from docthing.sourcefs.sourcefs_interface import FILE, DIRECTORY
+from docthing.sourcefs.stat_cache import StatCache
+
+
+class CountingFS(LocalFS):
+    '''
+    A `LocalFS` recording the paths checked.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.checked = []
+
+    def stat_many(self, paths):
+        self.batches.append(sorted(paths))
+        return super().stat_many(paths)
+
+    def isfile(self, path):
+        self.checked.append(path)
+        return super().isfile(path)
+
+    def isdir(self, path):
+        self.checked.append(path)
+        return super().isdir(path)
+
+
+def test_stat_cache(tmp_path):
+    (tmp_path / 'a.md').write_text('')
+    (tmp_path / 'dir').mkdir()
+    source_fs = CountingFS()
+    cache = StatCache(source_fs)
+
+    cache.prefetch([str(tmp_path / 'a.md'), str(tmp_path / 'dir')])
+    assert cache.isfile(str(tmp_path / 'a.md'))
+    assert cache.isdir(str(tmp_path / 'dir'))
+    assert cache.get_type(str(tmp_path / 'dir')) == DIRECTORY
+    assert len(source_fs.batches) == 1
+
+    assert cache.get_type(str(tmp_path / 'missing')) is None
+    assert not cache.isfile(str(tmp_path / 'missing'))
+    assert len(source_fs.batches) == 2
+
+
+def test_stat_cache_parent_not_listed(tmp_path, monkeypatch):
+    (tmp_path / 'a.md').write_text('')
+    (tmp_path / 'dir').mkdir()
+    monkeypatch.setattr(LocalFS, '_list_types', lambda self, directory: None)
+    cache = StatCache(LocalFS())
+
+    cache.prefetch([str(tmp_path / 'a.md'), str(tmp_path / 'dir')])
+    assert cache.isfile(str(tmp_path / 'a.md'))
+    assert cache.isdir(str(tmp_path / 'dir'))
+
+
+def test_blob_checks_leaves_once(tmp_path):
+    (tmp_path / 'README.md').write_text('quick\n')
+    (tmp_path / 'doc').mkdir()
+    (tmp_path / 'doc' / 'a.md').write_text('a\n')
+    (tmp_path / 'doc' / 'b.md').write_text('b\n')
+    (tmp_path / 'docthing.jsonc').write_text(f'''{{
+        "main-title": "Project",
+        "quick": "{tmp_path / 'README.md'}",
+        "Docs": {{"A": "{tmp_path / 'doc' / 'a.md'}", "B": "{tmp_path / 'doc' / 'b.md'}"}},
+        "All": "{tmp_path / 'doc'}"
+    }}''')
+    source_fs = CountingFS()
+
+    blob = DocumentationBlob(str(tmp_path / 'docthing.jsonc'),
+                             {'extensions': ['md'], 'iexts': [], 'doc_level': 0},
+                             source_fs)
+    assert [leaf.content_type for leaf in blob.get_leaves()] == [FILE, FILE, FILE, DIRECTORY]
+    assert len(source_fs.batches) == 1
+    # Paths sharing a parent directory are checked with a single listing
+    assert source_fs.checked == []
+
+    blob.unlazy()
+    assert len(source_fs.batches) == 1
+    assert [leaf.get_content().content for leaf in blob.get_leaves()] == \
+        [['quick\n'], ['a\n'], ['b\n'], ['a\n', 'b\n']]
+
+
+def test_leaf_records_content_type(tmp_path):
+    (tmp_path / 'a.md').write_text('')
+    cache = StatCache()
+    leaf = DocumentationNode(None, 'A', str(tmp_path / 'a.md'),
+                             parser_config={'extensions': ['md'], 'iexts': []},
+                             stat_cache=cache)
+    assert leaf.content_type == FILE
+    assert leaf.is_lazy()
@@ -5,6 +5,7 @@ from unittest.mock import patch, mock_open
 from docthing.config import _variable_replace_single, merge_configs, load_config
 from docthing.config import validate_config, _combine_values, _split_sections_key
 from docthing.config import _go_into_scope, _get_var_value, get_as_dot_config
+from docthing.config import _VariableResolver, compile_config
 
 
 def test_combine_values():
@@ -179,6 +180,69 @@ def test_load_config():
     assert config == expected_config
 
 
+def test_variable_resolver_order_independent():
+    config = {
+        'main': {'a': '{b}/x', 'b': '{other.c}'},
+        'other': {'c': 'c'},
+    }
+    resolver = _VariableResolver(config)
+
+    assert resolver.resolve_all() == {
+        'main': {'a': 'c/x', 'b': 'c'},
+        'other': {'c': 'c'},
+    }
+    # Resolved values are memoized and the configuration is left untouched
+    assert resolver.resolved[('other', 'c')] == 'c'
+    assert config['main']['a'] == '{b}/x'
+
+
+def test_variable_resolver_cycle():
+    config = {'main': {'a': '{b}', 'b': '{a}'}}
+
+    with pytest.raises(ValueError):
+        _VariableResolver(config).resolve_all()
+
+
+def test_compile_config(tmp_path):
+    config_path = tmp_path / 'docthing.conf'
+    config_path.write_text('[main]\nmeta = \n[output]\ntype = markdown\n')
+    command_line_config = {'main': {'index_file': 'docthing.jsonc'},
+                           'output': {'dir': 'out'}}
+    cache_dir = tmp_path / 'cache'
+
+    config = compile_config(str(config_path), command_line_config,
+                            cache_dir=str(cache_dir))
+    assert config['main']['index_file'] == 'docthing.jsonc'
+    assert config['output']['dir'] == 'out'
+    assert 'parser' in config
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # Repeat runs skip parsing and validation
+    with patch('docthing.config.validate_config') as validate, \
+            patch('docthing.config._parse_config_lines') as parse:
+        assert compile_config(str(config_path), command_line_config,
+                              cache_dir=str(cache_dir)) == config
+    validate.assert_not_called()
+    parse.assert_not_called()
+
+    # Changing the command line or the file invalidates the cache
+    compile_config(str(config_path), {**command_line_config, 'output': {'dir': 'other'}},
+                   cache_dir=str(cache_dir))
+    config_path.write_text('[main]\nmeta = \n[output]\ntype = markdown\n\n')
+    compile_config(str(config_path), command_line_config, cache_dir=str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 3
+
+
+def test_compile_config_without_file(tmp_path):
+    command_line_config = {'main': {'index_file': 'docthing.jsonc'},
+                           'output': {'dir': 'out'}}
+
+    config = compile_config(str(tmp_path / 'missing.conf'), command_line_config)
+
+    assert config['main']['index_file'] == 'docthing.jsonc'
+    assert config['output']['type'] == 'markdown'
+
+
 def test_validate_config():
     valid_config = {
         'main': {
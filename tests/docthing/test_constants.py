@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MIT
 
+import sys
 from unittest.mock import patch
 from docthing.constants import DEFAULT_CONFIG, PREDEFINED_VARIABLES, index_file_dir, _c_like_languages_parser_config
 
@@ -59,7 +60,8 @@ def test_index_file_dir_no_main_section():
         result = index_file_dir(config)
         assert result == '{index-file-dir}'
         mock_print.assert_called_once_with(
-            'Warning: using variable index-file-dir before defining `main` section in config file')
+            'Warning: using variable index-file-dir before defining `main` section in config file',
+            file=sys.stderr)
 
 # Test index_file_dir when index_file is missing in the main section
 
@@ -70,7 +72,8 @@ def test_index_file_dir_no_index_file():
         result = index_file_dir(config)
         assert result == '{index-file-dir}'
         mock_print.assert_called_once_with(
-            'Warning: using variable index-file-dir before defining `index_file` in `main` section in config file')
+            'Warning: using variable index-file-dir before defining `index_file` in `main` section in config file',
+            file=sys.stderr)
 
 # Test index_file_dir with a valid index_file path
 
@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+from docthing.dependencies import DependencyResolver, path_fingerprint
+from docthing.plugins.meta_interpreter.plantuml import PlantUMLInterpreter
+
+
+@pytest.fixture
+def bin_dir(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    tool = bin_dir / 'tool'
+    tool.write_text('#!/bin/sh\n')
+    tool.chmod(0o755)
+    monkeypatch.setenv('PATH', str(bin_dir))
+    return bin_dir
+
+
+@pytest.fixture
+def which_calls(monkeypatch):
+    import shutil
+    calls = []
+    which = shutil.which
+
+    def _which(name):
+        calls.append(name)
+        return which(name)
+
+    monkeypatch.setattr(shutil, 'which', _which)
+    return calls
+
+
+def test_resolve_is_memoized(bin_dir, which_calls):
+    resolver = DependencyResolver()
+
+    assert resolver.resolve('tool') == str(bin_dir / 'tool')
+    assert resolver.resolve('tool') == str(bin_dir / 'tool')
+    assert resolver.resolve('missing') is None
+    assert resolver.resolve('missing') is None
+    assert which_calls == ['tool', 'missing']
+
+
+def test_resolve_after_path_change(bin_dir, tmp_path, which_calls, monkeypatch):
+    resolver = DependencyResolver()
+    assert resolver.resolve('tool') is not None
+
+    monkeypatch.setenv('PATH', str(tmp_path))
+    assert resolver.resolve('tool') is None
+    assert which_calls == ['tool', 'tool']
+
+
+def test_resolved_paths_are_shared_through_the_cache(bin_dir, tmp_path, which_calls):
+    cache_path = str(tmp_path / 'cache' / 'dependencies.json')
+
+    assert DependencyResolver(cache_path).resolve('tool') is not None
+    assert DependencyResolver(cache_path).resolve('tool') == str(bin_dir / 'tool')
+    assert which_calls == ['tool']
+
+    # Installing a program changes the fingerprint of PATH
+    os.utime(bin_dir, ns=(0, 0))
+    assert DependencyResolver(cache_path).resolve('tool') is not None
+    assert which_calls == ['tool', 'tool']
+
+
+def test_path_fingerprint(bin_dir, tmp_path):
+    missing = str(tmp_path / 'missing')
+    fingerprint = path_fingerprint(str(bin_dir) + os.pathsep + missing)
+    assert fingerprint == [[str(bin_dir), os.stat(bin_dir).st_mtime_ns],
+                           [missing, None]]
+
+
+def test_plantuml_reference_gets_absolute_path(bin_dir, monkeypatch):
+    plantuml = bin_dir / 'plantuml'
+    plantuml.write_text('#!/bin/sh\n')
+    plantuml.chmod(0o755)
+
+    interpreter = PlantUMLInterpreter()
+    reference = interpreter.generate_resource(['@startuml\n', '@enduml\n'])
+    assert reference.executable == str(plantuml)
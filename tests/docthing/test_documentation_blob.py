@@ -5,7 +5,7 @@ import os
 from unittest.mock import MagicMock  # , patch
 from typing import Union
 
-from docthing.documentation_blob import DocumentationNode  # , DocumentationBlob
+from docthing.documentation_blob import DocumentationNode, DocumentationBlob
 from docthing.documentation_content import Document, ResourceReference
 
 
@@ -151,6 +151,16 @@ def test_replace_resources_with_imports(mock_config):
     mock_import.assert_called()
 
 
+def test_str_summarizes_content(mock_config):
+    node = DocumentationNode(
+        parent=None,
+        title="Summary",
+        content=Document(['# Summary\n', '\n', MockReference("resource.ext")]),
+        parser_config=mock_config
+    )
+    assert str(node) == 'DocumentationNode(Summary, 2 lines, 1 resources)'
+
+
 # Documentation Blob
 
 # @patch("builtins.open", create=True)
@@ -210,3 +220,43 @@ def test_replace_resources_with_imports(mock_config):
 
 #     with pytest.raises(ValueError):
 #         DocumentationBlob(mock_index_file, mock_config)
+
+
+def test_unlazy_content_directory_recursive(tmp_path):
+    (tmp_path / "a.md").write_text("first\n")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "b.md").write_text("second\n")
+    (tmp_path / "nested" / "b.test.md").write_text("ignored\n")
+    node = DocumentationNode(
+        parent=None,
+        title="Directory Node",
+        content=str(tmp_path),
+        parser_config={"extensions": ["md"], "iexts": ["test.md"]}
+    )
+
+    node._unlazy_content()
+
+    assert isinstance(node.get_content(), Document)
+    assert node.get_content().content == ["first\n", "second\n"]
+
+
+def test_directory_leaf_ignores_only_project_rules(tmp_path):
+    # `tmp_path` is not in a repository: its `.gitignore` is not the project's
+    (tmp_path / ".gitignore").write_text("*.md\n")
+    project = tmp_path / "project"
+    (project / "docs").mkdir(parents=True)
+    (project / "docs" / "a.md").write_text("first\n")
+    (project / "docs" / ".gitignore").write_text("b.md\n")
+    (project / "docs" / "b.md").write_text("ignored\n")
+    (project / "docthing.jsonc").write_text(
+        '{"main-title": "Project", "quick": "docs/a.md", "Docs": "docs"}')
+    cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        blob = DocumentationBlob(str(project / "docthing.jsonc"),
+                                 {"extensions": ["md"], "iexts": []})
+        blob.unlazy()
+    finally:
+        os.chdir(cwd)
+
+    assert blob.get_leaves()[1].get_content().content == ["first\n"]
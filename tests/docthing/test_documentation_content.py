@@ -4,6 +4,7 @@ import pytest
 import re
 
 from docthing.documentation_content import ResourceReference, Document
+from docthing.instrumentation import PROFILER
 from docthing.util import sha256sum
 
 
@@ -17,6 +18,18 @@ class MockResourceReference(ResourceReference):
         return 'compiled_content'
 
 
+class EmptyResourceReference(MockResourceReference):
+    '''
+    A resource producing no data, counting its compilations.
+    '''
+
+    compilations = 0
+
+    def compile(self):
+        self.compilations += 1
+        return None
+
+
 # Tests for ResourceReference
 
 class TestResourceReferenceClass:
@@ -66,6 +79,19 @@ class TestResourceReferenceClass:
         ref = MockResourceReference(['line1'], 'type1', use_hash=False)
         assert str(ref) == '@ref(type1)-->[.txt]\n'
 
+    def test_get_compiled_compiles_once(self):
+        ref = EmptyResourceReference(['line1'], 'type1')
+        PROFILER.enable()
+        try:
+            # None is a valid result: it is not compiled again
+            assert ref.get_compiled() is None
+            assert ref.get_compiled() is None
+            assert ref.compilations == 1
+            assert PROFILER.report()['counters'] == {'resources.compiled': 1}
+        finally:
+            PROFILER.disable()
+            PROFILER.reset()
+
 
 # Tests for Document
 
@@ -114,6 +140,21 @@ class TestDocument:
         assert doc.content == [
             'imported_@ref(type1)-->[path/to/resource]', 'normal line']
 
+    def test_with_resources_replaced(self):
+        ref = MockResourceReference(['source'], 'type1')
+        doc = Document(['line1\n', ref, 'line2\n'])
+
+        replaced = doc.with_resources_replaced('title', lambda t, r: f'import {t}\n')
+
+        assert replaced.content == ['line1\n', 'import title\n', 'line2\n']
+        # The original document is untouched and lines are shared
+        assert doc.content[1] is ref
+        assert replaced.content[0] is doc.content[0]
+
+    def test_with_resources_replaced_nothing_to_replace(self):
+        doc = Document(['line1\n', 'line2\n'])
+        assert doc.with_resources_replaced('title', None) is doc
+
     def test_prepend_resource(self):
         doc = Document(['line1', 'line2'])
         doc.prepend_resource('new line')
@@ -0,0 +1,187 @@
+# SPDX-License-Identifier: MIT
+
+import os
+import stat
+import tarfile
+import threading
+import time
+import zipfile
+
+import pytest
+
+from docthing.documentation_blob import DocumentationBlob
+from docthing.documentation_content import ResourceReference
+from docthing.export_driver import ExportDriver
+from docthing.plugins.exporter.markdown import MarkdownExporter
+from docthing.plugins.exporter_interface import Exporter
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    for i in range(4):
+        (tmp_path / f'doc{i}.md').write_text(f'# Doc {i}\n\ncontent {i}\n')
+    (tmp_path / 'docthing.jsonc').write_text('''
+        {
+            "main-title": "Project",
+            "quick": "doc0.md",
+            "intro": "doc1.md",
+            "Chapter": {"doc2": "doc2.md", "doc3": "doc3.md"}
+        }
+    ''')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def blob(project):
+    config = {
+        'begin_doc': 'BEGIN FILE DOCUMENTATION',
+        'end_doc': 'END FILE DOCUMENTATION',
+        'doc_level': 1,
+        'extensions': [],
+        'iexts': [],
+        'peek_lines': 1,
+    }
+    blob = DocumentationBlob(str(project / 'docthing.jsonc'), config)
+    blob.unlazy()
+    return blob
+
+
+class SlowExporter(MarkdownExporter):
+    '''
+    A markdown exporter recording how many leaves it exports at the same time.
+    '''
+
+    def __init__(self, name, thread_safe):
+        super().__init__()
+        self.name = name
+        self.thread_safe = thread_safe
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def get_name(self):
+        return self.name
+
+    def is_thread_safe(self):
+        return self.thread_safe
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        super().export_leaf(leaf, plugin_out_dir, relative_path)
+        with self.lock:
+            self.running -= 1
+
+
+def test_export_driver_all_exporters(project, blob):
+    exporters = [SlowExporter('first', True), SlowExporter('second', True)]
+
+    ExportDriver(exporters, str(project / 'out')).export(blob)
+
+    for name in ('first', 'second'):
+        assert (project / 'out' / name / 'Project' / 'Chapter' / 'doc2.md').read_text() == \
+            '# Doc 2\n\ncontent 2\n'
+
+
+def test_export_driver_relative_path_once(project, blob, monkeypatch):
+    calls = []
+    get_leaf_relative_path = Exporter.get_leaf_relative_path
+
+    def counting(leaf):
+        calls.append(leaf)
+        return get_leaf_relative_path(leaf)
+
+    monkeypatch.setattr(Exporter, 'get_leaf_relative_path', staticmethod(counting))
+    exporters = [SlowExporter('first', True), SlowExporter('second', False)]
+
+    ExportDriver(exporters, str(project / 'out')).export(blob)
+
+    assert len(calls) == len(blob.get_leaves())
+
+
+def test_export_driver_thread_safety(project, blob):
+    safe = SlowExporter('safe', True)
+    unsafe = SlowExporter('unsafe', False)
+
+    ExportDriver([safe, unsafe], str(project / 'out'), workers=4).export(blob)
+
+    assert unsafe.max_running == 1
+    assert safe.max_running > 1
+
+
+class FailingExporter(MarkdownExporter):
+    '''
+    A markdown exporter failing on the third leaf.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.exported = 0
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        self.exported += 1
+        if self.exported == 3:
+            raise RuntimeError('broken leaf')
+        super().export_leaf(leaf, plugin_out_dir, relative_path)
+
+
+def test_export_driver_failure_discards_archive(project, blob):
+    exporter = FailingExporter()
+    exporter.archive = 'zip'
+
+    with pytest.raises(RuntimeError):
+        ExportDriver([exporter], str(project / 'out')).export(blob)
+    # No temporary archive is left behind
+    assert os.listdir(project / 'out') == []
+
+
+def test_export_driver_archive_mode(project, blob):
+    exporter = MarkdownExporter()
+    exporter.archive = 'tar.gz'
+    umask = os.umask(0o022)
+    try:
+        ExportDriver([exporter], str(project / 'out')).export(blob)
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(project / 'out' / 'markdown.tar.gz').st_mode) == 0o644
+
+
+class SharedImage(ResourceReference):
+    def __init__(self):
+        super().__init__(['diagram'], 'image')
+
+    def get_ext(self):
+        return 'png'
+
+    def compile(self):
+        return b'png:diagram'
+
+
+@pytest.mark.parametrize('archive_format, stored', [('tar.gz', 1), ('zip', 2)])
+def test_export_driver_archive_deduplication(project, blob, archive_format, stored):
+    # The same resource in two leaves: only tar archives store it once
+    for leaf in blob.get_leaves()[2:]:
+        leaf.get_content().append_resource(SharedImage())
+    exporter = MarkdownExporter()
+    exporter.archive = archive_format
+    ExportDriver([exporter], str(project / 'out')).export(blob)
+
+    path = str(project / 'out' / f'markdown.{archive_format}')
+    if archive_format == 'zip':
+        with zipfile.ZipFile(path) as archive:
+            images = [name for name in archive.namelist() if name.endswith('.png')]
+            assert all(archive.read(name) == b'png:diagram' for name in images)
+    else:
+        with tarfile.open(path) as archive:
+            images = [m.name for m in archive.getmembers() if m.name.endswith('.png')]
+            assert [m.name for m in archive.getmembers() if m.islnk()] == images[1:]
+    assert len(images) == 2
+    assert exporter.output_writer.skipped == 2 - stored
+
+
+def test_export_driver_invalid_workers():
+    with pytest.raises(ValueError):
+        ExportDriver([], 'out', workers=0)
@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: MIT
+
+import os
+import pytest
+
+from docthing.ignore import IgnorePatterns, IgnoreCache
+from docthing.walker import SuffixMatcher, walk_files
+
+
+@pytest.mark.parametrize("patterns, path, is_dir, expected", [
+    (["*.log"], "a.log", False, True),
+    (["*.log"], "deep/dir/a.log", False, True),
+    (["*.log", "!keep.log"], "keep.log", False, False),
+    (["build/"], "build", True, True),
+    (["build/"], "build", False, None),
+    (["/root.txt"], "root.txt", False, True),
+    (["/root.txt"], "sub/root.txt", False, None),
+    (["doc/*.md"], "doc/a.md", False, True),
+    (["doc/*.md"], "doc/sub/a.md", False, None),
+    (["**/gen"], "a/b/gen", True, True),
+    (["a/**/z"], "a/z", False, True),
+    (["a/**/z"], "a/b/c/z", False, True),
+    (["a/**"], "a/b/c", False, True),
+    (["file?.[ch]"], "file1.c", False, True),
+    (["file[!0-9].c"], "file1.c", False, None),
+    (["# comment", "", "\\#hash"], "#hash", False, True),
+])
+def test_ignore_patterns(patterns, path, is_dir, expected):
+    assert IgnorePatterns('/base', patterns).match(path, is_dir) is expected
+
+
+def test_last_pattern_wins():
+    patterns = IgnorePatterns('/base', ["!important.log", "*.log"])
+    assert patterns.match("important.log") is True
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / '.git').mkdir()
+    (tmp_path / '.gitignore').write_text('node_modules/\n*.gen.ts\n')
+    for path in ['src/a.ts', 'src/b.gen.ts', 'src/vendor/v.ts',
+                 'src/node_modules/dep/index.ts', 'src/keep/k.ts']:
+        full = tmp_path / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_text('')
+    (tmp_path / 'src' / '.docthingignore').write_text('vendor\n')
+    return tmp_path
+
+
+def test_walk_files_honors_ignore_files(project):
+    cache = IgnoreCache()
+    files = [os.path.relpath(f, project / 'src')
+             for f in walk_files(str(project / 'src'), SuffixMatcher(['ts']),
+                                 ignore_cache=cache)]
+    assert files == ['a.ts', os.path.join('keep', 'k.ts')]
+
+
+def test_ignored_directories_are_not_walked(project, monkeypatch):
+    cache = IgnoreCache()
+    scanned = []
+    original_scandir = os.scandir
+
+    def _scandir(path):
+        scanned.append(os.path.basename(path))
+        return original_scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', _scandir)
+    list(walk_files(str(project / 'src'), SuffixMatcher(['ts']),
+                    ignore_cache=cache))
+
+    assert 'node_modules' not in scanned
+    assert 'vendor' not in scanned
+
+
+def test_ignore_cache_per_directory(project):
+    cache = IgnoreCache()
+    matcher = cache.for_directory(str(project / 'src'))
+    assert cache.for_directory(str(project / 'src')) is matcher
+    # The repository root (containing .git) is the last parent
+    assert matcher.parent.directory == str(project)
+    assert matcher.parent.parent is None
+
+
+def test_ignore_cache_stops_at_project_root(tmp_path):
+    # No repository: the ignore files above the project root do not apply
+    (tmp_path / '.gitignore').write_text('*.ts\n')
+    (tmp_path / 'project' / 'src').mkdir(parents=True)
+    (tmp_path / 'project' / 'src' / 'a.ts').write_text('')
+    cache = IgnoreCache(root=str(tmp_path / 'project'))
+    files = [os.path.relpath(f, tmp_path / 'project')
+             for f in walk_files(str(tmp_path / 'project'),
+                                 SuffixMatcher(['ts']), ignore_cache=cache)]
+    assert files == [os.path.join('src', 'a.ts')]
+    assert cache.for_directory(str(tmp_path / 'project')).parent is None
+
+
+def test_ignore_cache_project_in_repository(project):
+    # The project root is in a repository: the rules up to its root apply
+    cache = IgnoreCache(root=str(project / 'src'))
+    matcher = cache.for_directory(str(project / 'src'))
+    assert matcher.parent.directory == str(project)
+    assert matcher.is_ignored(str(project / 'src' / 'b.gen.ts'))
@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+from docthing.documentation_blob import DocumentationBlob
+from docthing.index_loader import IndexLoader, find_included_indexes
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    (tmp_path / 'README.md').write_text('readme\n')
+    for name in ['a', 'b', 'shared']:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'doc.md').write_text(f'{name}\n')
+    (tmp_path / 'shared' / 'docthing.jsonc').write_text(f'''
+        // Included by both projects
+        {{"main-title": "Shared", "Doc": "{tmp_path / 'shared' / 'doc.md'}"}}
+    ''')
+    for name in ['a', 'b']:
+        (tmp_path / name / 'docthing.jsonc').write_text(f'''
+            {{
+                "main-title": "{name}",
+                "Doc": "{tmp_path / name / 'doc.md'}",
+                "Deps": {{"__index__": "{tmp_path / 'shared' / 'docthing.jsonc'}"}}
+            }}
+        ''')
+    (tmp_path / 'docthing.jsonc').write_text(f'''
+        {{
+            "main-title": "Monorepo",
+            "intro": "{tmp_path / 'README.md'}",
+            "Projects": [
+                {{"__index__": "{tmp_path / 'a' / 'docthing.jsonc'}"}},
+                {{"__index__": "{tmp_path / 'b' / 'docthing.jsonc'}"}}
+            ]
+        }}
+    ''')
+    return tmp_path
+
+
+def test_find_included_indexes():
+    index = {
+        'main-title': 'T',
+        '__index__': 'a.jsonc',
+        'S': {'x': 'x.md', 'L': [{'__index__': 'b.jsonc'}, 'y.md']},
+        'T': {'__index__': 'c.jsonc'},
+    }
+    assert find_included_indexes(index) == ['a.jsonc', 'b.jsonc', 'c.jsonc']
+
+
+def test_load_parses_each_index_once(monorepo, monkeypatch):
+    loader = IndexLoader()
+    parsed = []
+    parse = loader._parse
+    monkeypatch.setattr(loader, '_parse', lambda p: parsed.append(p) or parse(p))
+
+    root = loader.load(str(monorepo / 'docthing.jsonc'))
+
+    assert root == os.path.realpath(monorepo / 'docthing.jsonc')
+    assert sorted(parsed) == sorted(os.path.realpath(monorepo / p / 'docthing.jsonc')
+                                    for p in ['', 'a', 'b', 'shared'])
+    assert loader.get(str(monorepo / 'shared' / 'docthing.jsonc'))['main-title'] == 'Shared'
+
+
+def test_load_detects_cycles(tmp_path):
+    (tmp_path / 'a.jsonc').write_text(
+        f'{{"main-title": "A", "B": {{"__index__": "{tmp_path / "b.jsonc"}"}}}}')
+    (tmp_path / 'b.jsonc').write_text(
+        f'{{"main-title": "B", "A": {{"__index__": "{tmp_path / "a.jsonc"}"}}}}')
+
+    with pytest.raises(ValueError, match='Circular inclusion'):
+        IndexLoader(workers=2).load(str(tmp_path / 'a.jsonc'))
+
+
+def test_blob_from_included_indexes(monorepo):
+    blob = DocumentationBlob(str(monorepo / 'docthing.jsonc'),
+                             {'extensions': ['md'], 'iexts': [], 'doc_level': 0})
+
+    titles = [leaf.get_title() for leaf in blob.get_leaves()]
+    # The shared index is included (and turned into nodes) once per project
+    assert titles == ['Introduction', 'Doc', 'Doc', 'Doc', 'Doc']
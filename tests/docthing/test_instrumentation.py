@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: MIT
+
+import json
+
+import pytest
+
+from docthing.documentation_blob import DocumentationBlob
+from docthing.instrumentation import Profiler, PROFILER
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    profiler.enable()
+    return profiler
+
+
+@pytest.fixture
+def global_profiler():
+    PROFILER.enable()
+    yield PROFILER
+    PROFILER.disable()
+    PROFILER.reset()
+
+
+def test_span_aggregates_calls(profiler):
+    for _ in range(3):
+        with profiler.span('stage'):
+            pass
+
+    stats = profiler.report()['spans']['stage']
+    assert stats['calls'] == 3
+    assert stats['total'] >= stats['max'] >= 0
+
+
+def test_count_sums_values(profiler):
+    profiler.count('files.read')
+    profiler.count('files.read', 2)
+    assert profiler.report()['counters'] == {'files.read': 3}
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.span('stage'):
+        profiler.count('files.read')
+    report = profiler.report()
+    assert report['spans'] == {}
+    assert report['counters'] == {}
+
+
+def test_write_report_and_summary_table(profiler, tmp_path):
+    with profiler.span('export.markdown'):
+        profiler.count('resources.compiled')
+
+    path = tmp_path / 'report.json'
+    profiler.write_report(str(path))
+    report = json.loads(path.read_text())
+    assert report['spans']['export.markdown']['calls'] == 1
+    assert report['counters']['resources.compiled'] == 1
+
+    table = profiler.summary_table()
+    assert 'export.markdown' in table
+    assert 'resources.compiled' in table
+    assert 'wall time' in table
+
+
+def test_blob_stages_are_measured(global_profiler, tmp_path, monkeypatch):
+    (tmp_path / 'README.md').write_text('quick\n')
+    (tmp_path / 'mod.py').write_text(
+        "''' BEGIN FILE DOCUMENTATION (level: 1)\n" +
+        'module\n' +
+        "END FILE DOCUMENTATION '''\n")
+    (tmp_path / 'docthing.jsonc').write_text(
+        '{"main-title": "Project", "quick": "README.md", "chapter": "mod.py"}')
+    monkeypatch.chdir(tmp_path)
+
+    blob = DocumentationBlob('docthing.jsonc', {
+        'begin_doc': 'BEGIN FILE DOCUMENTATION',
+        'end_doc': 'END FILE DOCUMENTATION',
+        'doc_level': 1,
+        'extensions': ['py'],
+        'iexts': [],
+        'peek_lines': 1,
+        'py': {'begin_ml_comment': "'''", 'end_ml_comment': "'''", 'sl_comment': '#'},
+    })
+    blob.prune_doc()
+
+    report = global_profiler.report()
+    assert {'blob.build', 'blob.unlazy', 'blob.prune'} <= set(report['spans'])
+    assert report['counters']['files.read'] == 2
+    assert report['counters']['lines.scanned'] >= 2
+
+
+def test_trace_records_complete_events(tmp_path):
+    profiler = Profiler()
+    profiler.enable(trace=True)
+    with profiler.span('extract', leaf='Intro'):
+        pass
+
+    path = tmp_path / 'trace.json'
+    profiler.write_trace(str(path))
+    trace = json.loads(path.read_text())
+
+    events = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+    assert len(events) == 1
+    assert events[0]['name'] == 'extract'
+    assert events[0]['args'] == {'leaf': 'Intro'}
+    assert events[0]['dur'] >= 0
+    threads = [e for e in trace['traceEvents'] if e['name'] == 'thread_name']
+    assert threads[0]['tid'] == events[0]['tid']
+
+
+def test_trace_not_recorded_when_only_profiling(profiler):
+    with profiler.span('extract', leaf='Intro'):
+        pass
+    assert profiler.trace()['traceEvents'][1:] == []
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: MIT
+
+import io
+import json
+import time
+
+import pytest
+
+from docthing import jsonc
+
+
+def test_loads_plain_json():
+    doc = '{"b": [1, 2.5, -3e2, true, false, null], "a": {"x": "\\u00e8\\n"}}'
+    assert jsonc.loads(doc) == json.loads(doc)
+    # Keys keep their order
+    assert list(jsonc.loads(doc).keys()) == ['b', 'a']
+
+
+def test_loads_comments_and_trailing_commas():
+    doc = '''
+    // Index file
+    {
+        "main-title": "Title", /* inline */
+        "url": "https://example.com/*not a comment*/",
+        "Chapter": {
+            "a": "a.md", // trailing comma
+            "b": ["b.md", "c.md",],
+        },
+    }
+    '''
+    assert jsonc.loads(doc) == {
+        'main-title': 'Title',
+        'url': 'https://example.com/*not a comment*/',
+        'Chapter': {'a': 'a.md', 'b': ['b.md', 'c.md']},
+    }
+
+
+@pytest.mark.parametrize('doc, lineno, colno, msg', [
+    ('{\n  "a": 1\n  "b": 2\n}', 3, 3, "Expecting ',' delimiter"),
+    ('{\n  "a" 1\n}', 2, 7, "Expecting ':' delimiter"),
+    ('{\n  // comment\n  a: 1\n}', 3, 3, 'Expecting property name'),
+    ('[1, 2,, 3]', 1, 7, 'Expecting value'),
+    ('{"a": 1} /* unterminated', 1, 10, 'Unterminated comment'),
+    ('{"a": 1} 2', 1, 10, 'Extra data'),
+    ('{"a": "\nb"}', 1, 8, 'Invalid control character'),
+])
+def test_loads_errors(doc, lineno, colno, msg):
+    with pytest.raises(jsonc.JSONCDecodeError) as e:
+        jsonc.loads(doc)
+    assert (e.value.lineno, e.value.colno) == (lineno, colno)
+    assert e.value.msg.startswith(msg)
+
+
+def test_load_names_the_file_in_errors():
+    f = io.StringIO('{\n  "a": }')
+    f.name = 'index.jsonc'
+    with pytest.raises(ValueError, match='^index.jsonc:2:8: Expecting value'):
+        jsonc.load(f)
+
+
+def _best_time(function, arg, repeat=3):
+    res = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(arg)
+        res = min(res, time.perf_counter() - start)
+    return res
+
+
+def test_benchmark_against_json():
+    # A generated multi-megabyte index file
+    index = {'main-title': 'Monorepo'}
+    for i in range(4000):
+        index[f'Project {i}'] = {f'Module {j}': f'projects/p{i}/src/m{j}.py' for j in range(20)}
+    stripped = json.dumps(index, indent=4)
+    commented = '// generated\n' + stripped.replace('    },\n', '    }, // project\n')
+    assert len(stripped) > 3 * 1024 * 1024
+
+    json_time = _best_time(json.loads, stripped)
+    jsonc_time = _best_time(jsonc.loads, commented)
+
+    assert jsonc.loads(commented) == index
+    # Close to the C accelerated parser of the standard library (generous
+    #   bound to keep the test stable on slow machines)
+    assert jsonc_time < 10 * json_time + 0.05
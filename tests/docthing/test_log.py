@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+from docthing import log
+from docthing.tree import Tree, TreeNode
+
+
+class Node(TreeNode):
+    def __str__(self):
+        return 'Node()'
+
+
+@pytest.fixture(autouse=True)
+def restore_level():
+    level = log.get_level()
+    yield
+    log.set_level(level)
+
+
+def test_default_level_prints_warnings_and_info(capsys):
+    log.warning('careful')
+    log.info('progress')
+    log.debug('details')
+    captured = capsys.readouterr()
+    assert captured.out == 'progress\n'
+    # Warnings and errors go to the standard error
+    assert captured.err == 'Warning: careful\n'
+
+
+def test_quiet_prints_only_errors(capsys):
+    log.set_level(log.ERROR)
+    log.warning('careful')
+    log.info('progress')
+    log.error('broken')
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert captured.err == 'Error: broken\n'
+
+
+def test_verbose_prints_debug(capsys):
+    log.set_level(log.DEBUG)
+    log.debug('details')
+    assert capsys.readouterr().out == 'details\n'
+
+
+def test_invalid_level():
+    with pytest.raises(ValueError):
+        log.set_level(42)
+
+
+def test_dump_tree_only_when_debugging(capsys):
+    root = Node()
+    root.add_child(Node())
+    tree = Tree(root)
+
+    log.dump_tree('tree', tree, '|| ')
+    assert capsys.readouterr().out == ''
+
+    log.set_level(log.DEBUG)
+    log.dump_tree('tree', tree, '|| ')
+    assert capsys.readouterr().out == 'tree\n|| Node()\n|| └── Node()\n'
@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: MIT
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import docthing
+
+# Maximum time (in microseconds) the command-line interface may take to be
+# imported: generous on purpose, it only has to catch heavy imports creeping in
+IMPORT_TIME_BUDGET = 150000
+
+# Modules that are not needed for `--help`, `--version` and `--config-dump`
+HEAVY_MODULES = [
+    'schema',
+    'docthing.index_loader',
+    'subprocess',
+    'urllib',
+    'docthing.documentation_blob',
+    'docthing.plugins.manager',
+    'docthing.plugins.exporter.markdown',
+    'docthing.plugins.meta_interpreter.plantuml',
+]
+
+
+def _run_with_importtime(*args):
+    '''
+    Run python with `-X importtime` and return the imported modules mapped to
+    their cumulative import time together with the standard output.
+    '''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(docthing.__file__))
+    completed_process = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + list(args),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, check=True)
+
+    modules = {}
+    for line in completed_process.stderr.decode().splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules, completed_process.stdout.decode()
+
+
+def test_cli_import_time_budget():
+    modules, _ = _run_with_importtime('-c', 'import docthing.__main__')
+    assert modules['docthing.__main__'] < IMPORT_TIME_BUDGET
+
+
+@pytest.mark.parametrize('option', ['--help', '--version', '--config-dump'])
+def test_trivial_invocations_skip_heavy_imports(option):
+    modules, output = _run_with_importtime('-m', 'docthing', option)
+    assert output != ''
+    heavy_modules = HEAVY_MODULES
+    if option == '--version':
+        # Reading the package metadata needs `urllib.parse`
+        heavy_modules = [m for m in HEAVY_MODULES if m != 'urllib']
+    assert [m for m in heavy_modules if m in modules] == []
+
+
+def test_package_exports_are_lazy():
+    _, output = _run_with_importtime(
+        '-c', 'import sys, docthing; docthing.Document; ' +
+        'print(sorted(m for m in sys.modules if m.startswith("docthing.d")))')
+    assert output.strip() == "['docthing.documentation_content']"
+
+    with pytest.raises(AttributeError):
+        docthing.NotAnExport
@@ -0,0 +1,306 @@
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import stat
+import tarfile
+import zipfile
+
+import pytest
+
+from docthing.output import OutputWriter, file_digest, manifest_path, same_content
+from docthing.output import ArchiveWriter, create_staging, commit_staging, remove_stale_staging
+from docthing.output import _exchange, _renameat2
+
+
+@pytest.fixture(autouse=True)
+def manifest_dir(tmp_path_factory, monkeypatch):
+    directory = tmp_path_factory.mktemp('manifests')
+    monkeypatch.setattr('docthing.output._manifest_dir', str(directory))
+    return directory
+
+
+def test_same_content(tmp_path, monkeypatch):
+    monkeypatch.setattr('docthing.output._BLOCK_SIZE', 4)
+    path = tmp_path / 'f'
+    path.write_bytes(b'0123456789')
+
+    assert same_content(path, b'0123456789')
+    assert not same_content(path, b'0123456780')
+    assert not same_content(path, b'012345678')
+    assert not same_content(path, b'0123456789a')
+
+
+def test_output_writer_skips_unchanged(tmp_path):
+    path = str(tmp_path / 'a.md')
+
+    writer = OutputWriter(str(tmp_path))
+    assert writer.write(path, 'a')
+    assert writer.write(str(tmp_path / 'b.png'), b'b')
+    writer.save()
+    assert (writer.written, writer.skipped) == (2, 0)
+
+    # The manifest is not in the output directory
+    assert sorted(os.listdir(tmp_path)) == ['a.md', 'b.png']
+    with open(manifest_path(str(tmp_path))) as f:
+        manifest = json.load(f)
+    assert sorted(manifest['files']) == ['a.md', 'b.png']
+
+    mtime = os.stat(path).st_mtime_ns
+    writer = OutputWriter(str(tmp_path))
+    assert not writer.write(path, 'a')
+    assert writer.write(str(tmp_path / 'b.png'), b'c')
+    assert (writer.written, writer.skipped) == (1, 1)
+    assert os.stat(path).st_mtime_ns == mtime
+    assert (tmp_path / 'b.png').read_bytes() == b'c'
+
+
+def test_output_writer_without_manifest(tmp_path):
+    (tmp_path / 'a.md').write_text('a')
+    (tmp_path / 'b.md').write_text('b')
+
+    writer = OutputWriter(str(tmp_path))
+    # Same bytes: compared with the file on disk
+    assert not writer.write(str(tmp_path / 'a.md'), 'a')
+    # Same size but different bytes
+    assert writer.write(str(tmp_path / 'b.md'), 'c')
+    assert (tmp_path / 'b.md').read_text() == 'c'
+
+
+def test_output_writer_detects_external_changes(tmp_path):
+    path = tmp_path / 'a.md'
+    writer = OutputWriter(str(tmp_path))
+    writer.write(str(path), 'a')
+    writer.save()
+
+    # Modified after the build: the manifest can not be trusted
+    path.write_text('bb')
+    writer = OutputWriter(str(tmp_path))
+    assert writer.write(str(path), 'a')
+    assert path.read_text() == 'a'
+
+
+def test_staging(tmp_path):
+    final_dir = tmp_path / 'markdown'
+    final_dir.mkdir()
+    (final_dir / 'a.md').write_text('a')
+    (final_dir / 'b.md').write_text('b')
+    writer = OutputWriter(str(final_dir))
+    writer.write(str(final_dir / 'a.md'), 'a')
+    writer.save()
+
+    staging_dir = create_staging(str(final_dir))
+    assert os.path.dirname(staging_dir) == str(tmp_path)
+    writer = OutputWriter(staging_dir, str(final_dir))
+    assert writer.is_staging()
+    assert not writer.write(os.path.join(staging_dir, 'a.md'), 'a')
+    assert writer.write(os.path.join(staging_dir, 'c.md'), 'c')
+    writer.save()
+    # Nothing changed in the output directory yet
+    assert sorted(os.listdir(final_dir)) == ['a.md', 'b.md']
+
+    inode = os.stat(final_dir / 'a.md').st_ino
+    writer.sync()
+    commit_staging(staging_dir, str(final_dir))
+
+    assert sorted(os.listdir(final_dir)) == ['a.md', 'c.md']
+    # The unchanged file is the same file (a hard link)
+    assert os.stat(final_dir / 'a.md').st_ino == inode
+    assert os.listdir(tmp_path) == ['markdown']
+
+
+def test_commit_staging_without_exchange(tmp_path, monkeypatch):
+    monkeypatch.setattr('docthing.output._exchange', lambda path, other_path: False)
+    (tmp_path / 'markdown').mkdir()
+    (tmp_path / 'markdown' / 'a.md').write_text('old')
+    staging_dir = create_staging(str(tmp_path / 'markdown'))
+    (tmp_path / staging_dir / 'a.md').write_text('new')
+
+    commit_staging(staging_dir, str(tmp_path / 'markdown'))
+    assert (tmp_path / 'markdown' / 'a.md').read_text() == 'new'
+    assert os.listdir(tmp_path) == ['markdown']
+
+
+@pytest.mark.skipif(_renameat2() is None, reason='renameat2 is not available')
+def test_commit_staging_exchanges_directories(tmp_path, monkeypatch):
+    (tmp_path / 'markdown').mkdir()
+    (tmp_path / 'markdown' / 'a.md').write_text('old')
+    staging_dir = create_staging(str(tmp_path / 'markdown'))
+    (tmp_path / staging_dir / 'a.md').write_text('new')
+    # Swapped twice: only checks that the file system supports it
+    if not _exchange(staging_dir, str(tmp_path / 'markdown')):
+        pytest.skip('the file system does not support RENAME_EXCHANGE')
+    _exchange(staging_dir, str(tmp_path / 'markdown'))
+
+    def _replace(*args):
+        raise AssertionError('the output directory is never moved aside')
+
+    monkeypatch.setattr(os, 'replace', _replace)
+    commit_staging(staging_dir, str(tmp_path / 'markdown'))
+    assert (tmp_path / 'markdown' / 'a.md').read_text() == 'new'
+    assert os.listdir(tmp_path) == ['markdown']
+
+
+def test_remove_stale_staging_restores_old_directory(tmp_path, monkeypatch):
+    # A build crashed after moving the output directory aside
+    (tmp_path / '.markdown.old-1').mkdir()
+    (tmp_path / '.markdown.old-1' / 'a.md').write_text('a')
+    (tmp_path / '.markdown.staging-1').mkdir()
+    monkeypatch.setattr('docthing.output._is_running', lambda pid: False)
+
+    remove_stale_staging(str(tmp_path / 'markdown'))
+    assert os.listdir(tmp_path) == ['markdown']
+    assert (tmp_path / 'markdown' / 'a.md').read_text() == 'a'
+
+
+def test_remove_stale_staging(tmp_path, monkeypatch):
+    (tmp_path / 'markdown').mkdir()
+    (tmp_path / '.markdown.staging-1').mkdir()
+    (tmp_path / '.markdown.old-2').mkdir()
+    (tmp_path / f'.markdown.staging-{os.getpid()}').mkdir()
+    (tmp_path / '.other.staging-1').mkdir()
+    monkeypatch.setattr('docthing.output._is_running', lambda pid: pid == os.getpid())
+
+    remove_stale_staging(str(tmp_path / 'markdown'))
+
+    assert sorted(os.listdir(tmp_path)) == \
+        [f'.markdown.staging-{os.getpid()}', '.other.staging-1', 'markdown']
+
+
+def test_output_writer_without_manifest_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr('docthing.output._manifest_dir', None)
+    path = str(tmp_path / 'a.md')
+    writer = OutputWriter(str(tmp_path))
+    writer.write(path, 'a')
+    writer.save()
+
+    # Unchanged files are found comparing their content
+    mtime = os.stat(path).st_mtime_ns
+    writer = OutputWriter(str(tmp_path))
+    assert not writer.write(path, 'a')
+    assert os.stat(path).st_mtime_ns == mtime
+    assert os.listdir(tmp_path) == ['a.md']
+
+
+def test_output_writer_write_file(tmp_path):
+    root = tmp_path / 'out'
+    root.mkdir()
+    tmp = root / 'bundle.tmp'
+
+    tmp.write_text('content')
+    writer = OutputWriter(str(root))
+    assert writer.write_file(str(root / 'bundle.md'), str(tmp))
+    writer.save()
+    assert (root / 'bundle.md').read_text() == 'content'
+    assert not tmp.exists()
+    mtime = os.stat(root / 'bundle.md').st_mtime_ns
+
+    tmp.write_text('content')
+    writer = OutputWriter(str(root))
+    assert not writer.write_file(str(root / 'bundle.md'), str(tmp))
+    assert os.stat(root / 'bundle.md').st_mtime_ns == mtime
+    assert not tmp.exists()
+    assert writer.manifest['bundle.md']['sha256'] == file_digest(str(root / 'bundle.md'))[0]
+
+
+def test_archive_writer_zip(tmp_path):
+    root = tmp_path / 'out' / 'markdown'
+    writer = ArchiveWriter(str(root), 'zip')
+    assert writer.write(str(root / 'a' / 'page.md'), '# Page\n')
+    assert writer.write(str(root / 'a' / 'page_1.png'), b'image')
+    # Zip archives store every copy (links are not extracted by most tools)
+    assert writer.write(str(root / 'b' / 'page_1.png'), b'image')
+    tmp = writer.temporary_path(str(root / 'bundle.md'))
+    with open(tmp, 'w') as f:
+        f.write('bundle')
+    assert writer.write_file(str(root / 'bundle.md'), tmp)
+    writer.save()
+
+    # Nothing but the archive is written
+    assert os.listdir(tmp_path / 'out') == ['markdown.zip']
+    with zipfile.ZipFile(tmp_path / 'out' / 'markdown.zip') as archive:
+        assert archive.namelist() == ['a/page.md', 'a/page_1.png', 'b/page_1.png', 'bundle.md']
+        assert archive.read('a/page.md') == b'# Page\n'
+        assert archive.read('bundle.md') == b'bundle'
+        assert archive.read('b/page_1.png') == b'image'
+        assert not stat.S_ISLNK(archive.getinfo('b/page_1.png').external_attr >> 16)
+    assert (writer.written, writer.skipped) == (4, 0)
+
+
+def test_archive_writer_tar(tmp_path):
+    root = tmp_path / 'markdown'
+    writer = ArchiveWriter(str(root), 'tar.gz')
+    writer.write(str(root / 'a' / 'page_1.png'), b'image')
+    writer.write(str(root / 'b' / 'page_1.png'), b'image')
+    writer.save()
+
+    with tarfile.open(tmp_path / 'markdown.tar.gz') as archive:
+        assert archive.extractfile('a/page_1.png').read() == b'image'
+        link = archive.getmember('b/page_1.png')
+        assert link.islnk() and link.linkname == 'a/page_1.png'
+        assert archive.extractfile(link).read() == b'image'
+
+
+def test_archive_writer_invalid_format(tmp_path):
+    with pytest.raises(ValueError):
+        ArchiveWriter(str(tmp_path / 'markdown'), 'rar')
+
+
+def test_output_writer_precompress(tmp_path):
+    import gzip
+
+    root = tmp_path / 'out'
+    root.mkdir()
+    page = 'text\n' * 1000
+
+    writer = OutputWriter(str(root), precompress=True)
+    writer.write(str(root / 'page.md'), page)
+    writer.write(str(root / 'small.md'), 'text\n')
+    writer.write(str(root / 'image.png'), b'\0' * 2048)
+    writer.save()
+
+    assert gzip.decompress((root / 'page.md.gz').read_bytes()) == page.encode()
+    # Small and non-text files are not compressed
+    assert not (root / 'small.md.gz').exists()
+    assert not (root / 'image.png.gz').exists()
+    assert 'page.md.gz' in writer.manifest
+    mtime = os.stat(root / 'page.md.gz').st_mtime_ns
+
+    # Unchanged files are not compressed again
+    writer = OutputWriter(str(root), precompress=True)
+    writer.write(str(root / 'page.md'), page)
+    writer.save()
+    assert writer.compressions == []
+    assert (writer.written, writer.skipped) == (0, 2)
+    assert os.stat(root / 'page.md.gz').st_mtime_ns == mtime
+
+    # Changed files are
+    writer = OutputWriter(str(root), precompress=True)
+    writer.write(str(root / 'page.md'), page * 2)
+    writer.save()
+    assert gzip.decompress((root / 'page.md.gz').read_bytes()) == page.encode() * 2
+
+
+def test_output_writer_precompress_removes_stale_copies(tmp_path):
+    root = tmp_path / 'out'
+    root.mkdir()
+    page = 'text\n' * 1000
+    writer = OutputWriter(str(root), precompress=True)
+    writer.write(str(root / 'page.md'), page)
+    writer.write(str(root / 'other.md'), page)
+    writer.save()
+
+    # The page shrinks below the threshold: its compressed copy is stale
+    writer = OutputWriter(str(root), precompress=True)
+    writer.write(str(root / 'page.md'), 'small')
+    writer.write(str(root / 'other.md'), page)
+    writer.save()
+    assert not (root / 'page.md.gz').exists()
+    assert 'page.md.gz' not in writer.manifest
+    assert (root / 'other.md.gz').exists()
+
+    # Without precompression the copies written by docthing are removed too
+    writer = OutputWriter(str(root))
+    writer.write(str(root / 'other.md'), page)
+    writer.save()
+    assert sorted(os.listdir(root)) == ['other.md', 'page.md']
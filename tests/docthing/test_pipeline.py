@@ -0,0 +1,211 @@
+# SPDX-License-Identifier: MIT
+
+import os
+import zipfile
+
+import pytest
+
+from docthing.documentation_blob import DocumentationBlob
+from docthing.documentation_content import Document
+from docthing.pipeline import StreamingPipeline
+from docthing.plugins.exporter.markdown import MarkdownExporter
+from docthing.plugins.meta_interpreter.nav import MarkdownNAVInterpreter, MarkdownNAVReference
+
+
+@pytest.fixture
+def parser_config():
+    return {
+        'begin_doc': 'BEGIN FILE DOCUMENTATION',
+        'end_doc': 'END FILE DOCUMENTATION',
+        'doc_level': 1,
+        'extensions': ['py'],
+        'iexts': [],
+        'peek_lines': 1,
+        'py': {
+            'begin_ml_comment': "'''",
+            'end_ml_comment': "'''",
+            'sl_comment': '#',
+        },
+    }
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'README.md').write_text('# Quick\n\nquick start\n')
+    (tmp_path / 'INTRO.md').write_text('intro\n')
+    for i, level in enumerate([1, 2, 1, 1, 1]):
+        (tmp_path / f'mod{i}.py').write_text(
+            f"''' BEGIN FILE DOCUMENTATION (level: {level})\n" +
+            f'module {i}\n' +
+            "END FILE DOCUMENTATION '''\n")
+    (tmp_path / 'docthing.jsonc').write_text('''
+        {
+            "main-title": "Project",
+            "quick": "README.md",
+            "intro": "INTRO.md",
+            "Modules": {
+                "mod0": "mod0.py",
+                "mod1": "mod1.py",
+                "mod2": "mod2.py",
+                "mod3": "mod3.py",
+                "mod4": "mod4.py"
+            }
+        }
+    ''')
+    return tmp_path
+
+
+class RecordingExporter(MarkdownExporter):
+    '''
+    Records how many leaves of the blob are in memory when each leaf is exported.
+    '''
+
+    def __init__(self, blob):
+        super().__init__()
+        self.blob = blob
+        self.resident = []
+
+    def export_leaf(self, leaf, plugin_out_dir, relative_path=None):
+        self.resident.append(len([
+            lf for lf in self.blob.get_leaves()
+            if isinstance(lf.get_content(), Document)]))
+        super().export_leaf(leaf, plugin_out_dir, relative_path)
+
+
+def test_pipeline_exports_and_prunes(project, parser_config, monkeypatch):
+    monkeypatch.chdir(project)
+    blob = DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
+    outdir = project / 'documentation'
+
+    StreamingPipeline(blob, [MarkdownNAVInterpreter()], [MarkdownExporter()],
+                      str(outdir), window=2).run()
+
+    modules = outdir / 'markdown' / 'Project' / 'Modules'
+    assert (modules / 'mod0.md').exists()
+    assert not (modules / 'mod1.md').exists()
+    assert 'module 2' in (modules / 'mod2.md').read_text()
+    # Navigation skips the pruned leaf
+    assert 'mod2.md' in (modules / 'mod0.md').read_text()
+    # Content is released once exported
+    assert all(leaf.get_content() is None for leaf in blob.get_leaves())
+
+
+def test_pipeline_rebuild_skips_unchanged(project, parser_config, monkeypatch):
+    monkeypatch.chdir(project)
+    outdir = project / 'documentation'
+
+    def _build():
+        blob = DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
+        exporter = MarkdownExporter()
+        StreamingPipeline(blob, [MarkdownNAVInterpreter()], [exporter],
+                          str(outdir), window=2).run()
+        return exporter.output_writer
+
+    first = _build()
+    assert first.written > 0 and first.skipped == 0
+
+    (project / 'mod2.py').write_text(
+        "''' BEGIN FILE DOCUMENTATION (level: 1)\nchanged\nEND FILE DOCUMENTATION '''\n")
+    second = _build()
+    assert second.written == 1
+    assert second.skipped == first.written - 1
+
+
+def test_pipeline_atomic(project, parser_config, monkeypatch):
+    monkeypatch.chdir(project)
+    outdir = project / 'documentation'
+
+    def _build():
+        blob = DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
+        exporter = MarkdownExporter()
+        exporter.atomic = True
+        StreamingPipeline(blob, [], [exporter], str(outdir), window=2).run()
+
+    _build()
+    mod0 = outdir / 'markdown' / 'Project' / 'Modules' / 'mod0.md'
+    inode = os.stat(mod0).st_ino
+    _build()
+
+    assert os.listdir(outdir) == ['markdown']
+    assert os.stat(mod0).st_ino == inode
+
+
+def test_pipeline_output_archive(project, parser_config, monkeypatch):
+    monkeypatch.chdir(project)
+    blob = DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
+    exporter = MarkdownExporter()
+    exporter.archive = 'zip'
+    outdir = project / 'out'
+
+    StreamingPipeline(blob, [MarkdownNAVInterpreter()], [exporter], str(outdir),
+                      window=2).run()
+
+    assert os.listdir(outdir) == ['markdown.zip']
+    with zipfile.ZipFile(outdir / 'markdown.zip') as archive:
+        assert 'Project/Modules/mod0.md' in archive.namelist()
+        assert b'module 0' in archive.read('Project/Modules/mod0.md')
+
+
+class NamedMarkdownExporter(MarkdownExporter):
+    '''
+    A markdown exporter with a different name recording the imported resources.
+    '''
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.imported = []
+
+    def get_name(self):
+        return self.name
+
+    def import_function(self, leaf_title, resource):
+        self.imported.append(resource)
+        return super().import_function(leaf_title, resource)
+
+
+def test_pipeline_exporters_share_leaves(project, parser_config, monkeypatch):
+    monkeypatch.chdir(project)
+    blob = DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
+    exporters = [NamedMarkdownExporter('first'), NamedMarkdownExporter('second')]
+
+    StreamingPipeline(blob, [MarkdownNAVInterpreter()], exporters,
+                      str(project / 'out'), window=2).run()
+
+    # Both exporters see the resources of each leaf, not the imports of the other
+    for exporter in exporters:
+        assert exporter.imported
+        assert all(isinstance(r, MarkdownNAVReference) for r in exporter.imported)
+    assert (project / 'out' / 'first' / 'Project' / 'Modules' / 'mod0.md').read_text() == \
+        (project / 'out' / 'second' / 'Project' / 'Modules' / 'mod0.md').read_text()
+
+
+def test_pipeline_bounded_window(project, parser_config, monkeypatch):
+    monkeypatch.chdir(project)
+    blob = DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
+    exporter = RecordingExporter(blob)
+
+    StreamingPipeline(blob, [], [exporter], str(project / 'out'),
+                      window=2).run()
+
+    assert len(exporter.resident) == 6
+    assert max(exporter.resident) <= 2
+
+
+def test_pipeline_invalid_window(parser_config):
+    with pytest.raises(ValueError):
+        StreamingPipeline(None, [], [], 'out', window=0)
+
+
+def test_nav_prepare_precomputes_neighbours(project, parser_config, monkeypatch):
+    monkeypatch.chdir(project)
+    blob = DocumentationBlob(str(project / 'docthing.jsonc'), parser_config)
+    leaves = blob.get_leaves()
+    interpreter = MarkdownNAVInterpreter()
+    interpreter.prepare(leaves)
+
+    assert interpreter.neighbours[leaves[0]] == (None, leaves[1])
+    assert interpreter.neighbours[leaves[-1]] == (leaves[-2], None)
+    refs = [r for r in interpreter.generate_resource(leaves[1])
+            if isinstance(r, MarkdownNAVReference)]
+    assert len(refs) == 2
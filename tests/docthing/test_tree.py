@@ -363,3 +363,34 @@ def test_tree_class():
     assert tree.get_height() == 0  # No children yet
     assert tree.get_size() == 1  # Only root
     assert tree.get_path() == [root]
+
+# Test tree dumps
+
+
+def test_write_and_to_string():
+    root = MockTreeNode()
+    child1 = MockTreeNode()
+    child2 = MockTreeNode()
+    grandchild = MockTreeNode()
+    root.add_child(child1)
+    root.add_child(child2)
+    child1.add_child(grandchild)
+
+    expected = ('> MockTreeNode()\n'
+                '> ├── MockTreeNode()\n'
+                '> │   └── MockTreeNode()\n'
+                '> └── MockTreeNode()\n')
+
+    lines = []
+
+    class Writer():
+        def write(self, line):
+            lines.append(line)
+
+    Tree(root=root).write(Writer(), '> ')
+    assert ''.join(lines) == expected
+    assert len(lines) == 4
+    assert root.to_string('> ') == expected
+
+    with pytest.raises(ValueError):
+        root.to_string(position='invalid')
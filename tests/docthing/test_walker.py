@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+
+import os
+import pytest
+
+from docthing.walker import SuffixMatcher, walk_files
+
+
+@pytest.fixture
+def source_tree(tmp_path):
+    for path in ['b.ts', 'a.ts', 'a.test.ts', 'README.md',
+                 'sub/z.js', 'sub/y.test.js', 'sub/deeper/x.ts',
+                 'other/w.ts', '.git/hook.ts']:
+        full = tmp_path / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_text('')
+    return tmp_path
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("main.ts", True),
+    ("main.js", True),
+    ("main.test.ts", False),
+    ("main.test.js", False),
+    ("main.py", False),
+    # A file name equal to a suffix matches it
+    ("test.ts", False),
+    ("ts", True),
+])
+def test_suffix_matcher(filename, expected):
+    matcher = SuffixMatcher(['js', 'ts'], ['test.js', 'test.ts'])
+    assert matcher.matches(filename) == expected
+
+
+def test_suffix_matcher_without_extensions():
+    assert SuffixMatcher().matches('anything.bin')
+    assert not SuffixMatcher(None, 'bin').matches('anything.bin')
+
+
+def test_suffix_matcher_whole_file_name():
+    matcher = SuffixMatcher(['py'], ['__init__.py'])
+    assert not matcher.matches('__init__.py')
+    assert matcher.matches('main.py')
+    assert matcher.matches('my__init__.py')
+    assert SuffixMatcher(['Makefile']).matches('Makefile')
+
+
+def test_suffix_matcher_from_parser_config_is_cached():
+    config = {'extensions': ['ts'], 'iexts': 'test.ts'}
+    assert SuffixMatcher.from_parser_config(config) is \
+        SuffixMatcher.from_parser_config(dict(config))
+
+
+def test_walk_files_order_and_filters(source_tree):
+    matcher = SuffixMatcher(['js', 'ts'], ['test.js', 'test.ts'])
+    files = [os.path.relpath(f, source_tree)
+             for f in walk_files(str(source_tree), matcher)]
+    assert files == [
+        'a.ts',
+        'b.ts',
+        os.path.join('other', 'w.ts'),
+        os.path.join('sub', 'z.js'),
+        os.path.join('sub', 'deeper', 'x.ts'),
+    ]
+
+
+def test_walk_files_custom_prune(source_tree):
+    matcher = SuffixMatcher(['ts'])
+    files = list(walk_files(str(source_tree), matcher,
+                            prune_directory=lambda entry: entry.name == 'sub'))
+    assert os.path.join(str(source_tree), '.git', 'hook.ts') in files
+    assert not any(os.sep + 'sub' + os.sep in f for f in files)